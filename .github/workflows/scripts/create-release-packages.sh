@@ -18,6 +18,14 @@ fi
 
 echo "Building release packages for $NEW_VERSION"
 
+# The archives are built by the Python builder (d3_kit.release), which renders
+# each template once and zips the variants in parallel. Set
+# D3_RELEASE_LEGACY=1 to use the original shell implementation below.
+if [[ -z "${D3_RELEASE_LEGACY:-}" ]]; then
+  REPO_SRC="$(cd "$(dirname "${BASH_SOURCE[0]}")/../../.." && pwd)/src"
+  PYTHONPATH="$REPO_SRC${PYTHONPATH:+:$PYTHONPATH}" exec python3 -m d3_kit.release "$NEW_VERSION" --out .genreleases
+fi
+
 # Create and use .genreleases directory for all build artifacts
 GENRELEASES_DIR=".genreleases"
 mkdir -p "$GENRELEASES_DIR"
@@ -235,6 +235,14 @@ else
 fi
 
 # Determine branch number
+if [ -z "$BRANCH_NUMBER" ] && command -v d3 >/dev/null 2>&1; then
+    # Prefer the indexed allocator: one locked lookup instead of scanning every
+    # feature directory and branch, and safe against concurrent runs
+    if [ "$HAS_GIT" = true ]; then
+        git fetch --all --prune 2>/dev/null || true
+    fi
+    BRANCH_NUMBER=$(d3 feature-number --repo-root "$REPO_ROOT" 2>/dev/null || echo "")
+fi
 if [ -z "$BRANCH_NUMBER" ]; then
     if [ "$HAS_GIT" = true ]; then
         # Check existing branches on remotes
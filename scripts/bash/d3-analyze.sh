@@ -15,6 +15,14 @@ if [[ -z "$FEATURE_DIR" ]] || [[ ! -d "$FEATURE_DIR" ]]; then
   exit 1
 fi
 
+# Prefer the d3 CLI: it also builds requirement -> task -> contract coverage
+# maps and caches per-file results in .d3/analyze-cache.json
+if command -v d3 >/dev/null 2>&1 && \
+    ANALYSIS=$(d3 analyze "$FEATURE_DIR" --repo-root "$REPO_ROOT" --json 2>/dev/null); then
+  output_json "success" "Analysis complete" "$(echo "$ANALYSIS" | jq '.features[0]')"
+  exit 0
+fi
+
 # Check what artifacts exist
 SPEC_FILE="$FEATURE_DIR/spec.md"
 PLAN_FILE="$FEATURE_DIR/plan.md"
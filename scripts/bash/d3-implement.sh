@@ -38,9 +38,12 @@ fi
 # Extract feature name from directory
 FEATURE_NAME=$(basename "$FEATURE_DIR" | sed 's/^[0-9]*-//')
 
-# Create implementation log file
+# Create implementation log file (kept if it exists; task progress is
+# recorded in journal.jsonl with `d3 journal` / `d3 implement`)
 IMPL_LOG="$FEATURE_DIR/implementation-log.md"
+JOURNAL_FILE="$FEATURE_DIR/journal.jsonl"
 
+if [[ ! -f "$IMPL_LOG" ]]; then
 cat > "$IMPL_LOG" <<'EOF'
 # Implementation Log
 
@@ -117,6 +120,7 @@ cat > "$IMPL_LOG" <<'EOF'
 ---
 Started: $(date +%Y-%m-%d)
 EOF
+fi
 
 # Prepare JSON response
 JSON_DATA=$(cat <<EOF
@@ -125,7 +129,8 @@ JSON_DATA=$(cat <<EOF
   "feature_name": "$FEATURE_NAME",
   "implementation_log": "$IMPL_LOG",
   "tasks_file": "$TASKS_FILE",
-  "message": "Implementation workflow initialized. Follow the tasks in tasks.md and log progress in implementation-log.md"
+  "journal_file": "$JOURNAL_FILE",
+  "message": "Implementation workflow initialized. Follow the tasks in tasks.md and record progress with: d3 journal <task-id> start|finish|block"
 }
 EOF
 )
@@ -25,6 +25,20 @@ fi
 # Extract feature name from directory
 FEATURE_NAME=$(basename "$FEATURE_DIR" | sed 's/^[0-9]*-//')
 
+# Create the issues through the d3 CLI when it is installed; its errors
+# (stderr and exit code) are passed through rather than masked by the
+# template fallback below
+if command -v d3 >/dev/null 2>&1; then
+  STATUS=0
+  RESULT=$(d3 taskstoissues "$FEATURE_DIR" --repo-root "$REPO_ROOT" --json) || STATUS=$?
+  if (( STATUS != 0 )); then
+    [[ -n "$RESULT" ]] && printf '%s\n' "$RESULT"
+    exit "$STATUS"
+  fi
+  output_json "success" "GitHub issues created or updated" "$RESULT"
+  exit 0
+fi
+
 # Check if git and gh are available
 if ! command -v git &> /dev/null; then
   output_json "error" "git command not found"
@@ -34,19 +34,24 @@ get_repo_root() {
 }
 
 # Output JSON response
+# Uses only builtins (no cat/date forks) on bash >= 4.2; the message is
+# escaped so quotes and backslashes cannot break the JSON
 output_json() {
   local status=$1
   local message=$2
   local data=${3:-"{}"}
-  
-  cat <<EOF
-{
-  "status": "$status",
-  "message": "$message",
-  "timestamp": "$(date -u +%Y-%m-%dT%H:%M:%SZ)",
-  "data": $data
-}
-EOF
+  local timestamp
+
+  if (( BASH_VERSINFO[0] > 4 || (BASH_VERSINFO[0] == 4 && BASH_VERSINFO[1] >= 2) )); then
+    TZ=UTC0 printf -v timestamp '%(%Y-%m-%dT%H:%M:%SZ)T' -1
+  else
+    timestamp=$(date -u +%Y-%m-%dT%H:%M:%SZ)
+  fi
+  message=${message//\\/\\\\}
+  message=${message//\"/\\\"}
+
+  printf '{\n  "status": "%s",\n  "message": "%s",\n  "timestamp": "%s",\n  "data": %s\n}\n' \
+    "$status" "$message" "$timestamp" "$data"
 }
 
 # Generate feature name from description (2-4 words, kebab-case)
@@ -63,6 +68,15 @@ generate_feature_name() {
 get_next_feature_number() {
   local short_name=$1
   local repo_root=$(get_repo_root)
+
+  # Use the indexed, lock-protected allocator when the d3 CLI is installed
+  if command -v d3 &> /dev/null; then
+    local allocated
+    if allocated=$(d3 feature-number --repo-root "$repo_root" 2>/dev/null); then
+      echo "$allocated"
+      return 0
+    fi
+  fi
   
   local max_num=0
   
@@ -123,42 +137,27 @@ load_template() {
    cat "$template_file"
 }
 
-# Replace placeholder in content
+# Replace placeholder in content (pure bash, no sed fork per placeholder)
 replace_placeholder() {
   local content="$1"
-  local placeholder=$2
+  local placeholder="{$2}"
   local value=$3
-  
-  # Escape special characters in value for sed
-  value=$(printf '%s\n' "$value" | sed -e 's/[\/&]/\\&/g')
-  
-  echo "$content" | sed "s/{$placeholder}/$value/g"
+
+  # bash 5.2+ would otherwise expand & in the replacement to the match
+  shopt -u patsub_replacement 2>/dev/null || true
+  printf '%s\n' "${content//"$placeholder"/"$value"}"
 }
 
 # Extract YAML frontmatter
 extract_frontmatter() {
   local content="$1"
-  echo "$content" | awk '/^---$/{if(++count==1) next; if(count==2) exit} count==1'
+  printf '%s\n' "$content" | awk '/^---$/{if(++count==1) next; if(count==2) exit} count==1'
 }
 
-# Extract body (content after frontmatter)
+# Extract body (content after frontmatter) in a single awk pass
 extract_body() {
   local content="$1"
-  local in_frontmatter=0
-  local seen_closing=0
-  
-  while IFS= read -r line; do
-    if [[ "$line" == "---" ]]; then
-      if [[ $in_frontmatter -eq 0 ]]; then
-        in_frontmatter=1
-      elif [[ $in_frontmatter -eq 1 ]]; then
-        seen_closing=1
-        continue
-      fi
-    elif [[ $seen_closing -eq 1 ]]; then
-      echo "$line"
-    fi
-  done <<< "$content"
+  printf '%s\n' "$content" | awk 'seen >= 2 { print; next } /^---$/ { seen++ }'
 }
 
 # Format date
@@ -141,73 +141,83 @@ fi
 # Create context file
 CONTEXT_PATH="$REPO_ROOT/$CONTEXT_FILE"
 
-# Start with header
-cat > "$CONTEXT_PATH" << 'EOF'
+# Prefer the incremental builder from the d3 CLI: it only re-reads changed
+# artifacts and writes the context file atomically in one pass
+USED_D3_CLI=false
+if command -v d3 >/dev/null 2>&1 && \
+    d3 context "$FEATURE_DIR" --repo-root "$REPO_ROOT" --context-file "$CONTEXT_PATH" >/dev/null; then
+    USED_D3_CLI=true
+fi
+
+if [ "$USED_D3_CLI" = false ]; then
+    # Start with header
+    cat > "$CONTEXT_PATH" << 'EOF'
 # D3 Feature Context
 
 Auto-generated from feature specifications. Last updated: $(date)
 
 EOF
 
-# Add spec content if it exists
-if [ -f "$FEATURE_DIR/spec.md" ]; then
-    echo "## Feature Specification" >> "$CONTEXT_PATH"
-    echo "" >> "$CONTEXT_PATH"
-    cat "$FEATURE_DIR/spec.md" >> "$CONTEXT_PATH"
-    echo "" >> "$CONTEXT_PATH"
-fi
+    # Add spec content if it exists
+    if [ -f "$FEATURE_DIR/spec.md" ]; then
+        echo "## Feature Specification" >> "$CONTEXT_PATH"
+        echo "" >> "$CONTEXT_PATH"
+        cat "$FEATURE_DIR/spec.md" >> "$CONTEXT_PATH"
+        echo "" >> "$CONTEXT_PATH"
+    fi
 
-# Add plan content if it exists
-if [ -f "$FEATURE_DIR/plan.md" ]; then
-    echo "## Implementation Plan" >> "$CONTEXT_PATH"
-    echo "" >> "$CONTEXT_PATH"
-    cat "$FEATURE_DIR/plan.md" >> "$CONTEXT_PATH"
-    echo "" >> "$CONTEXT_PATH"
-fi
+    # Add plan content if it exists
+    if [ -f "$FEATURE_DIR/plan.md" ]; then
+        echo "## Implementation Plan" >> "$CONTEXT_PATH"
+        echo "" >> "$CONTEXT_PATH"
+        cat "$FEATURE_DIR/plan.md" >> "$CONTEXT_PATH"
+        echo "" >> "$CONTEXT_PATH"
+    fi
 
-# Add data model content if it exists
-if [ -f "$FEATURE_DIR/data-model.md" ]; then
-    echo "## Data Model" >> "$CONTEXT_PATH"
-    echo "" >> "$CONTEXT_PATH"
-    cat "$FEATURE_DIR/data-model.md" >> "$CONTEXT_PATH"
-    echo "" >> "$CONTEXT_PATH"
-fi
+    # Add data model content if it exists
+    if [ -f "$FEATURE_DIR/data-model.md" ]; then
+        echo "## Data Model" >> "$CONTEXT_PATH"
+        echo "" >> "$CONTEXT_PATH"
+        cat "$FEATURE_DIR/data-model.md" >> "$CONTEXT_PATH"
+        echo "" >> "$CONTEXT_PATH"
+    fi
 
-# Add quickstart content if it exists
-if [ -f "$FEATURE_DIR/quickstart.md" ]; then
-    echo "## Quickstart Guide" >> "$CONTEXT_PATH"
-    echo "" >> "$CONTEXT_PATH"
-    cat "$FEATURE_DIR/quickstart.md" >> "$CONTEXT_PATH"
-    echo "" >> "$CONTEXT_PATH"
-fi
+    # Add quickstart content if it exists
+    if [ -f "$FEATURE_DIR/quickstart.md" ]; then
+        echo "## Quickstart Guide" >> "$CONTEXT_PATH"
+        echo "" >> "$CONTEXT_PATH"
+        cat "$FEATURE_DIR/quickstart.md" >> "$CONTEXT_PATH"
+        echo "" >> "$CONTEXT_PATH"
+    fi
 
-# Add task content if it exists
-if [ -f "$FEATURE_DIR/tasks.md" ]; then
-    echo "## Task List" >> "$CONTEXT_PATH"
-    echo "" >> "$CONTEXT_PATH"
-    cat "$FEATURE_DIR/tasks.md" >> "$CONTEXT_PATH"
-    echo "" >> "$CONTEXT_PATH"
-fi
+    # Add task content if it exists
+    if [ -f "$FEATURE_DIR/tasks.md" ]; then
+        echo "## Task List" >> "$CONTEXT_PATH"
+        echo "" >> "$CONTEXT_PATH"
+        cat "$FEATURE_DIR/tasks.md" >> "$CONTEXT_PATH"
+        echo "" >> "$CONTEXT_PATH"
+    fi
 
-# Add contracts if they exist
-if [ -d "$FEATURE_DIR/contracts" ]; then
-    echo "## API Contracts" >> "$CONTEXT_PATH"
-    echo "" >> "$CONTEXT_PATH"
-    for contract in "$FEATURE_DIR/contracts"/*.md; do
-        if [ -f "$contract" ]; then
-            echo "### $(basename "$contract" .md)" >> "$CONTEXT_PATH"
-            echo "" >> "$CONTEXT_PATH"
-            cat "$contract" >> "$CONTEXT_PATH"
-            echo "" >> "$CONTEXT_PATH"
-        fi
-    done
-fi
+    # Add contracts if they exist
+    if [ -d "$FEATURE_DIR/contracts" ]; then
+        echo "## API Contracts" >> "$CONTEXT_PATH"
+        echo "" >> "$CONTEXT_PATH"
+        for contract in "$FEATURE_DIR/contracts"/*.md; do
+            if [ -f "$contract" ]; then
+                echo "### $(basename "$contract" .md)" >> "$CONTEXT_PATH"
+                echo "" >> "$CONTEXT_PATH"
+                cat "$contract" >> "$CONTEXT_PATH"
+                echo "" >> "$CONTEXT_PATH"
+            fi
+        done
+    fi
 
-# Add footer
-cat >> "$CONTEXT_PATH" << 'EOF'
+    # Add footer
+    cat >> "$CONTEXT_PATH" << 'EOF'
 
 <!-- AUTO-GENERATED CONTENT - DO NOT EDIT MANUALLY -->
 EOF
+fi
 
 if [ ! $QUIET_MODE ]; then
     log_info "Updated context file: $CONTEXT_PATH"
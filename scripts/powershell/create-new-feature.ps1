@@ -194,6 +194,17 @@ if ($ShortName) {
 }
 
 # Determine branch number
+if (!$Number -and (Get-Command d3 -ErrorAction SilentlyContinue)) {
+    # Prefer the indexed allocator: one locked lookup instead of scanning every
+    # feature directory and branch, and safe against concurrent runs
+    if ($hasGit) {
+        try { git fetch --all --prune 2>$null | Out-Null } catch { }
+    }
+    $allocated = d3 feature-number --repo-root $repoRoot 2>$null
+    if ($LASTEXITCODE -eq 0 -and $allocated) {
+        $Number = [int]$allocated
+    }
+}
 if (!$Number) {
     if ($hasGit) {
         # Check existing branches on remotes
@@ -66,6 +66,29 @@ D3_COMMANDS = {
     },
 }
 
+# Agent configuration
+AGENT_CONFIG = {
+    "amp": {"name": "Amp", "folder": ".agents/"},
+    "claude": {"name": "Claude Code", "folder": ".claude/"},
+    "cursor-agent": {"name": "Cursor", "folder": ".cursor/"},
+    "copilot": {"name": "GitHub Copilot", "folder": ".github/"},
+    "gemini": {"name": "Gemini CLI", "folder": ".gemini/"},
+    "qwen": {"name": "Qwen Code", "folder": ".qwen/"},
+    "opencode": {"name": "opencode", "folder": ".opencode/"},
+    "windsurf": {"name": "Windsurf", "folder": ".windsurf/"},
+    "kilocode": {"name": "Kilo Code", "folder": ".kilocode/"},
+    "auggie": {"name": "Auggie CLI", "folder": ".augment/"},
+    "roo": {"name": "Roo Code", "folder": ".roo/"},
+    "q": {"name": "Amazon Q Developer", "folder": ".amazonq/"},
+    "shai": {"name": "SHAI", "folder": ".shai/"},
+    "bob": {"name": "IBM Bob", "folder": ".bob/"},
+    "codebuddy": {"name": "CodeBuddy", "folder": ".codebuddy/"},
+    "qoder": {"name": "Qoder CLI", "folder": ".qoder/"},
+    "codex": {"name": "Codex CLI", "folder": ".codex/"},
+}
+
+SCRIPT_TYPE_CHOICES = {"sh": "POSIX Shell (bash/zsh)", "ps": "PowerShell"}
+
 D3_KIT_PRINCIPLES = [
     "Intent-First Development",
     "Executable Specifications",
@@ -0,0 +1,360 @@
+"""Cross-artifact consistency and coverage analysis.
+
+Python counterpart of ``scripts/bash/d3-analyze.sh``. Every artifact of a
+feature (spec, plan, tasks and each contract) is tokenized in a single pass
+into a small dict of facts: requirement IDs, user stories, clarification
+markers, task references and contract endpoints. Facts are cached in
+``.d3/analyze-cache.json`` per file, keyed by mtime and size with a SHA-256
+fallback, so a re-run only re-reads files that changed; changed files are
+scanned in a process pool when there are enough of them to pay for it.
+The facts of each feature are then joined into requirement -> task ->
+contract coverage maps and a list of issues.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+from .utils import atomic_write_text
+
+CACHE_FILENAME = "analyze-cache.json"
+CACHE_VERSION = 1
+DEFAULT_WORKERS = 8
+# Below this many changed files a process pool costs more than it saves
+POOL_THRESHOLD = 64
+
+ARTIFACTS = [("spec", "spec.md"), ("plan", "plan.md"), ("tasks", "tasks.md")]
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*$")
+_BULLET = re.compile(r"^\s*[-*]\s+(?:\[[ xX]\]\s+)?(?P<text>.+)$")
+_REQ_ID = re.compile(r"\b(?:FR|NFR|REQ)-\d+\b")
+_REQ_LABEL = re.compile(r"\bRequirement\s+(\d+)\b", re.IGNORECASE)
+_STORY = re.compile(r"\bUser Story (\d+)\b|\[US(\d+)\]")
+_CLARIFY = re.compile(r"\[NEEDS CLARIFICATION|\[CLARIFY\b")
+_ENDPOINT = re.compile(r"\b(GET|POST|PUT|PATCH|DELETE|HEAD|OPTIONS)\s+(/[^\s`)\]]*)")
+_CONTRACT_PATH = re.compile(r"contracts/([\w.-]+\.md)")
+
+
+def requirement_refs(text: str) -> list[str]:
+    """Requirement IDs mentioned in text; ``Requirement 3`` reads as FR-003."""
+    refs = set(_REQ_ID.findall(text))
+    refs.update(f"FR-{int(n):03d}" for n in _REQ_LABEL.findall(text))
+    return sorted(refs)
+
+
+def _stories(text: str) -> list[int]:
+    return sorted({int(a or b) for a, b in _STORY.findall(text)})
+
+
+def _scan_spec(text: str) -> dict[str, Any]:
+    requirements: dict[str, str] = {}
+    in_requirements = False
+    for line in text.splitlines():
+        heading = _HEADING.match(line)
+        if heading:
+            in_requirements = "requirement" in heading.group(2).lower()
+            continue
+        bullet = _BULLET.match(line) if in_requirements else None
+        if not bullet or bullet.group("text").strip() in ("...", "[ ... ]"):
+            continue
+        item = bullet.group("text").strip()
+        ids = requirement_refs(item)
+        req_id = ids[0] if ids else f"FR-{len(requirements) + 1:03d}"
+        requirements.setdefault(req_id, item)
+    return {
+        "requirements": requirements,
+        "stories": _stories(text),
+        "clarifications": len(_CLARIFY.findall(text)),
+    }
+
+
+def _scan_plan(text: str) -> dict[str, Any]:
+    return {
+        "requirements": requirement_refs(text),
+        "stories": _stories(text),
+        "clarifications": len(_CLARIFY.findall(text)),
+    }
+
+
+def _scan_tasks(text: str) -> dict[str, Any]:
+    from .tasks import TaskCycleError, parse_tasks
+
+    graph = parse_tasks(text)
+    tasks = []
+    for task in graph.tasks.values():
+        body = "\n".join(task.body)
+        tasks.append(
+            {
+                "id": task.id,
+                "story": task.story,
+                "parallel": task.parallel,
+                "done": task.done,
+                "requirements": requirement_refs(body),
+                "contracts": sorted(set(_CONTRACT_PATH.findall(body))),
+                "endpoints": sorted({path for _, path in _ENDPOINT.findall(body)}),
+            }
+        )
+    try:
+        graph.topological_order()
+        cycle: list[str] = []
+    except TaskCycleError as e:
+        cycle = e.cycle
+    return {"tasks": tasks, "cycle": cycle, "missing": graph.missing}
+
+
+def _scan_contract(text: str) -> dict[str, Any]:
+    return {
+        "endpoints": sorted({f"{m} {p}" for m, p in _ENDPOINT.findall(text)}),
+        "requirements": requirement_refs(text),
+    }
+
+
+_SCANNERS = {
+    "spec": _scan_spec,
+    "plan": _scan_plan,
+    "tasks": _scan_tasks,
+    "contract": _scan_contract,
+}
+
+
+def scan_file(
+    kind: str, path: str, known_sha256: Optional[str] = None
+) -> tuple[str, Optional[dict[str, Any]]]:
+    """Hash and tokenize one artifact; facts are None if the hash is known.
+
+    Module-level so it can run in a worker process.
+    """
+    data = Path(path).read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == known_sha256:
+        return digest, None
+    return digest, _SCANNERS[kind](data.decode("utf-8", errors="replace"))
+
+
+def _scan_star(args: tuple[str, str, Optional[str]]):
+    return scan_file(*args)
+
+
+def feature_artifacts(feature_dir: Path) -> list[tuple[str, str, Path]]:
+    """List (kind, unit, path) for every artifact present in a feature."""
+    units = []
+    for kind, filename in ARTIFACTS:
+        path = feature_dir / filename
+        if path.is_file():
+            units.append((kind, filename, path))
+    contracts = feature_dir / "contracts"
+    if contracts.is_dir():
+        for contract in sorted(contracts.glob("*.md")):
+            units.append(("contract", f"contracts/{contract.name}", contract))
+    return units
+
+
+def build_report(feature_dir: Path, facts: dict[str, Any]) -> dict[str, Any]:
+    """Join per-file facts into coverage maps and issues for one feature."""
+    spec = facts.get("spec.md")
+    plan = facts.get("plan.md")
+    tasks_facts = facts.get("tasks.md")
+    contracts = {
+        unit.split("/", 1)[1]: data
+        for unit, data in facts.items()
+        if unit.startswith("contracts/")
+    }
+    tasks = tasks_facts["tasks"] if tasks_facts else []
+    issues: list[str] = []
+
+    for unit, hint in (
+        ("spec.md", "run /d3.intend first"),
+        ("plan.md", "run /d3.plan first"),
+        ("tasks.md", "run /d3.tasks after plan"),
+    ):
+        if unit not in facts:
+            issues.append(f"Missing {unit} - {hint}")
+
+    requirements: dict[str, Any] = {}
+    for req_id, text in (spec["requirements"] if spec else {}).items():
+        requirements[req_id] = {"text": text, "tasks": [], "contracts": []}
+    for name, data in contracts.items():
+        for req_id in data["requirements"]:
+            if req_id in requirements:
+                requirements[req_id]["contracts"].append(name)
+
+    endpoint_owner = {
+        endpoint.split(" ", 1)[1]: name
+        for name, data in contracts.items()
+        for endpoint in data["endpoints"]
+    }
+    task_contracts: dict[str, list[str]] = {}
+    untraced: list[str] = []
+    for task in tasks:
+        linked = set(task["contracts"])
+        linked.update(
+            endpoint_owner[p] for p in task["endpoints"] if p in endpoint_owner
+        )
+        task_contracts[task["id"]] = sorted(linked)
+        if not task["requirements"]:
+            untraced.append(task["id"])
+        for req_id in task["requirements"]:
+            if req_id in requirements:
+                requirements[req_id]["tasks"].append(task["id"])
+            else:
+                issues.append(f"{task['id']} references unknown requirement {req_id}")
+    for req in requirements.values():
+        for tid in req["tasks"]:
+            req["contracts"].extend(task_contracts[tid])
+        req["contracts"] = sorted(set(req["contracts"]))
+
+    uncovered = [r for r, data in requirements.items() if not data["tasks"]]
+    if uncovered:
+        issues.append(f"{len(uncovered)} requirement(s) without tasks")
+    used_contracts = {c for linked in task_contracts.values() for c in linked}
+    for name in sorted(set(contracts) - used_contracts):
+        issues.append(f"Contract {name} is not referenced by any task")
+
+    task_stories = {t["story"] for t in tasks if t["story"] is not None}
+    plan_stories = set(plan["stories"]) if plan else set()
+    if plan:
+        for story in sorted(task_stories - plan_stories):
+            issues.append(f"User Story {story} has tasks but no plan section")
+        for story in sorted(plan_stories - task_stories):
+            if tasks:
+                issues.append(f"User Story {story} is planned but has no tasks")
+
+    clarifications = sum(
+        data["clarifications"] for data in (spec, plan) if data is not None
+    )
+    if clarifications:
+        issues.append(f"{clarifications} unresolved clarification(s)")
+    if tasks_facts and tasks_facts["cycle"]:
+        issues.append("Task dependency cycle: " + " -> ".join(tasks_facts["cycle"]))
+    for tid, refs in (tasks_facts["missing"] if tasks_facts else {}).items():
+        issues.append(f"{tid} depends on unknown task(s) {', '.join(refs)}")
+
+    covered = len(requirements) - len(uncovered)
+    return {
+        "feature_dir": str(feature_dir),
+        "feature_name": feature_dir.name,
+        "artifacts_present": sorted(facts),
+        "requirements": requirements,
+        "task_contracts": task_contracts,
+        "uncovered_requirements": uncovered,
+        "untraced_tasks": untraced,
+        "coverage": round(covered / len(requirements), 3) if requirements else None,
+        "issues": issues,
+        "is_complete": not issues,
+    }
+
+
+class Analyzer:
+    """Analyze features of one repository, reusing cached per-file facts."""
+
+    def __init__(self, repo_root: Path, cache_path: Optional[Path] = None):
+        self.repo_root = repo_root
+        self.cache_path = cache_path or repo_root / ".d3" / CACHE_FILENAME
+        # Facts of every file seen so far; kept between runs of one instance
+        self._files: Optional[dict[str, Any]] = None
+
+    def _load_cache(self) -> dict[str, Any]:
+        if self._files is not None:
+            return self._files
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def run(
+        self, feature_dirs: list[Path], workers: int = DEFAULT_WORKERS
+    ) -> dict[str, Any]:
+        """Analyze feature_dirs and return per-feature reports plus totals."""
+        start = time.perf_counter()
+        cached = self._load_cache()
+        files: dict[str, Any] = {}
+        jobs: list[tuple[str, str, Optional[str]]] = []
+        job_keys: list[tuple[str, Any]] = []
+        layout: list[tuple[Path, list[tuple[str, str]]]] = []
+
+        for feature_dir in feature_dirs:
+            units = []
+            for kind, unit, path in feature_artifacts(feature_dir):
+                key = str(path)
+                units.append((unit, key))
+                stat = path.stat()
+                previous = cached.get(key)
+                if (
+                    previous is not None
+                    and previous["mtime_ns"] == stat.st_mtime_ns
+                    and previous["size"] == stat.st_size
+                ):
+                    files[key] = previous
+                    continue
+                entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+                jobs.append((kind, key, previous["sha256"] if previous else None))
+                job_keys.append((key, (entry, previous)))
+            layout.append((feature_dir, units))
+
+        if len(jobs) >= POOL_THRESHOLD and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunksize = max(1, len(jobs) // (workers * 4))
+                results = list(pool.map(_scan_star, jobs, chunksize=chunksize))
+        else:
+            results = [scan_file(*job) for job in jobs]
+
+        rescanned = 0
+        for (key, (entry, previous)), (digest, facts) in zip(job_keys, results):
+            if facts is None:
+                facts = previous["facts"]
+            else:
+                rescanned += 1
+            files[key] = dict(entry, sha256=digest, facts=facts)
+
+        reports = [
+            build_report(
+                feature_dir, {unit: files[key]["facts"] for unit, key in units}
+            )
+            for feature_dir, units in layout
+        ]
+
+        # Keep entries for features outside this run so --all stays warm, but
+        # drop files that were deleted, inside or outside the run
+        scanned = tuple(os.path.join(str(d), "") for d in feature_dirs)
+        pruned = [
+            key
+            for key in cached
+            if key not in files and (key.startswith(scanned) or not os.path.exists(key))
+        ]
+        self._files = dict(cached, **files)
+        for key in pruned:
+            del self._files[key]
+        if jobs or pruned or not self.cache_path.exists():
+            atomic_write_text(
+                self.cache_path,
+                json.dumps({"version": CACHE_VERSION, "files": self._files}),
+            )
+
+        requirements = sum(len(r["requirements"]) for r in reports)
+        uncovered = sum(len(r["uncovered_requirements"]) for r in reports)
+        return {
+            "features": reports,
+            "summary": {
+                "features": len(reports),
+                "complete": sum(1 for r in reports if r["is_complete"]),
+                "requirements": requirements,
+                "covered_requirements": requirements - uncovered,
+                "issues": sum(len(r["issues"]) for r in reports),
+            },
+            "files": {
+                "total": len(files),
+                "reused": len(files) - len(jobs),
+                "rehashed": len(jobs) - rescanned,
+                "scanned": rescanned,
+            },
+            "elapsed_seconds": round(time.perf_counter() - start, 3),
+        }
@@ -0,0 +1,150 @@
+"""Batch scaffolding of many D3-Kit projects from a manifest.
+
+A manifest lists projects as ``(project_name, ai, script)`` entries, either in
+TOML::
+
+    [[project]]
+    name = "billing-service"
+    ai = "claude"
+    script = "sh"
+
+or in JSON, as a list or under a ``"projects"`` key. Each distinct template
+archive is fetched once, concurrently, and the projects are then extracted
+in a thread pool.
+"""
+
+import asyncio
+import json
+import shutil
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional, Protocol, Sequence
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class Tracker(Protocol):
+    def start(self, key: str, detail: str = ""): ...
+
+    def complete(self, key: str, detail: str = ""): ...
+
+    def error(self, key: str, detail: str = ""): ...
+
+
+def load_manifest(
+    path: Path,
+    default_ai: Optional[str] = None,
+    default_script: Optional[str] = None,
+) -> list[dict[str, str]]:
+    """Parse a TOML or JSON manifest into normalized project entries.
+
+    Entries may use either ``name`` or ``project_name``; ``ai`` and ``script``
+    fall back to the given defaults. Raises ValueError on malformed input.
+    """
+    text = path.read_text(encoding="utf-8")
+    data: Any
+    try:
+        if path.suffix.lower() == ".json":
+            data = json.loads(text)
+        else:
+            data = tomllib.loads(text)
+    except (ValueError, tomllib.TOMLDecodeError) as e:
+        raise ValueError(f"Could not parse manifest {path}: {e}") from e
+
+    if isinstance(data, dict):
+        data = data.get("project", data.get("projects", []))
+    if not isinstance(data, list):
+        raise ValueError("Manifest must contain a list of projects")
+
+    entries = []
+    seen: set[str] = set()
+    for i, raw in enumerate(data, 1):
+        if not isinstance(raw, dict):
+            raise ValueError(f"Project #{i} must be a table/object")
+        name = raw.get("project_name") or raw.get("name")
+        ai = raw.get("ai") or default_ai
+        script = raw.get("script") or default_script
+        if not name or not ai or not script:
+            raise ValueError(f"Project #{i} needs a name, ai and script")
+        if name in seen:
+            raise ValueError(f"Project '{name}' is listed more than once")
+        seen.add(name)
+        entries.append({"project_name": name, "ai": ai, "script": script})
+    return entries
+
+
+async def _fetch_all(
+    groups: dict[tuple[str, str], list[int]],
+    fetch: Callable[[str, str], Path],
+    trackers: Sequence[Tracker],
+) -> dict[tuple[str, str], Any]:
+    """Fetch each distinct archive once; return a path or exception per key."""
+
+    async def fetch_one(key: tuple[str, str]) -> Any:
+        agent, script_type = key
+        for i in groups[key]:
+            trackers[i].start("download", f"{agent}-{script_type}")
+        try:
+            path = await asyncio.to_thread(fetch, agent, script_type)
+        except Exception as e:
+            for i in groups[key]:
+                trackers[i].error("download", str(e))
+            return e
+        shared = len(groups[key])
+        for i in groups[key]:
+            trackers[i].complete(
+                "download", f"shared by {shared}" if shared > 1 else ""
+            )
+        return path
+
+    keys = list(groups)
+    results = await asyncio.gather(*(fetch_one(key) for key in keys))
+    return dict(zip(keys, results))
+
+
+def scaffold_batch(
+    entries: list[dict[str, str]],
+    project_paths: list[Path],
+    trackers: Sequence[Tracker],
+    fetch: Callable[[str, str], Path],
+    extract: Callable[[Path, Path], Any],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> list[bool]:
+    """Fetch distinct archives concurrently, then extract every project.
+
+    Returns a success flag per entry; one project failing does not stop
+    the others.
+    """
+    groups: dict[tuple[str, str], list[int]] = {}
+    for i, entry in enumerate(entries):
+        groups.setdefault((entry["ai"], entry["script"]), []).append(i)
+
+    archives = asyncio.run(_fetch_all(groups, fetch, trackers))
+
+    def extract_one(i: int) -> bool:
+        entry, tracker = entries[i], trackers[i]
+        archive = archives[(entry["ai"], entry["script"])]
+        if isinstance(archive, Exception):
+            tracker.error("final", "download failed")
+            return False
+        tracker.start("extract")
+        try:
+            project_paths[i].mkdir(parents=True)
+        except OSError as e:
+            tracker.error("extract", str(e))
+            tracker.error("final", "directory conflict")
+            return False
+        try:
+            extract(archive, project_paths[i])
+        except Exception as e:
+            shutil.rmtree(project_paths[i], ignore_errors=True)
+            tracker.error("extract", str(e))
+            tracker.error("final", "extract failed")
+            return False
+        tracker.complete("extract")
+        tracker.complete("final")
+        return True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(extract_one, range(len(entries))))
@@ -0,0 +1,566 @@
+"""Startup benchmarks for the d3 CLI.
+
+Run with ``python -m d3_kit.bench``. Each command is timed in a fresh
+interpreter; the reported overhead is the median wall clock minus the median
+of a bare ``python -c pass``, so the budgets hold across machines with
+different interpreter start costs. The exit status is non-zero when any
+median exceeds its budget by more than the tolerance (``--tolerance``,
+absorbing noise on slow CI runners) or when importing ``d3_kit.cli`` pulls
+in a module that should only be loaded lazily.
+
+``--release REPO`` instead times building the release archives of a
+checkout with ``create-release-packages.sh`` in its legacy shell mode and
+with the Python builder.
+
+``d3 bench`` runs the wider suite (``run_suite``): a local HTTP stand-in
+for GitHub releases serves a synthetic template archive, and ``d3 init``
+(cold and warm cache), the phases of ``download_and_extract_template``,
+CLI startup and the ``scripts/bash`` workflows on a generated repository
+are each timed several times. Results are written as JSON with
+percentiles per metric, and ``compare_results`` flags metrics whose median
+regressed against a baseline file.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+CLI_ENTRY = "from d3_kit.cli import app; app()"
+
+# Commands that only echo text must not pay for the rendering stack
+PLACEHOLDER_BUDGET_MS = 100.0
+# --help and banner output render through Rich, which has a fixed import cost
+RICH_BUDGET_MS = 300.0
+# Includes typer/click, which every command needs
+IMPORT_BUDGET_MS = 100.0
+# Fraction a median may exceed its budget before the benchmark fails
+BUDGET_TOLERANCE = 0.25
+
+STARTUP_COMMANDS: list[tuple[list[str], float]] = [
+    (["--help"], RICH_BUDGET_MS),
+    (["check"], RICH_BUDGET_MS),
+    (["intend", "benchmark feature"], PLACEHOLDER_BUDGET_MS),
+    (["plan", "d3-features/001-benchmark"], PLACEHOLDER_BUDGET_MS),
+]
+
+# subprocess and zipfile are not listed: typer itself imports them
+LAZY_MODULES = [
+    "httpx",
+    "rich.console",
+    "rich.live",
+    "rich.progress",
+    "rich.tree",
+]
+
+
+def _time_samples(argv: list[str], runs: int, **kwargs: Any) -> list[float]:
+    """Wall-clock milliseconds for each of runs executions of argv."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _time_run(argv: list[str], runs: int) -> float:
+    """Median wall-clock milliseconds for running argv in a subprocess."""
+    return statistics.median(_time_samples(argv, runs))
+
+
+def import_time_ms(module: str = "d3_kit.cli", runs: int = 1) -> float:
+    """Median cumulative import time of module from ``-X importtime``."""
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+        )
+        for line in result.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() == module:
+                samples.append(int(parts[1]) / 1000)
+                break
+        else:
+            raise RuntimeError(f"{module} not found in -X importtime output")
+    return statistics.median(samples)
+
+
+def eagerly_imported(modules: list[str], module: str = "d3_kit.cli") -> list[str]:
+    """Return which of modules are already loaded right after importing module."""
+    code = (
+        f"import sys, json, {module}; "
+        f"print(json.dumps([m for m in {modules!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def measure_startup(runs: int = 7) -> dict:
+    """Time CLI startup for each benchmarked command."""
+    baseline = _time_run([sys.executable, "-c", "pass"], runs)
+    commands = []
+    for args, budget in STARTUP_COMMANDS:
+        median = _time_run([sys.executable, "-c", CLI_ENTRY, *args], runs)
+        commands.append(
+            {
+                "command": " ".join(["d3", *args]),
+                "median_ms": round(median, 1),
+                "overhead_ms": round(median - baseline, 1),
+                "budget_ms": budget,
+            }
+        )
+    return {
+        "baseline_ms": round(baseline, 1),
+        "import_ms": round(import_time_ms(runs=runs), 1),
+        "eager_modules": eagerly_imported(LAZY_MODULES),
+        "commands": commands,
+    }
+
+
+def measure_release(repo: Path, runs: int = 3) -> dict:
+    """Time the shell and Python release builders on a copy of repo."""
+    script = ".github/workflows/scripts/create-release-packages.sh"
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        shutil.copytree(repo / "D3-templates", work / "D3-templates")
+        shutil.copytree(repo / ".github", work / ".github")
+        shell_env = dict(os.environ, D3_RELEASE_LEGACY="1")
+        python_cmd = [sys.executable, "-m", "d3_kit.release", "v0.0.0"]
+        # Run this copy of d3_kit even when it is not installed
+        package_root = str(Path(__file__).resolve().parent.parent)
+        python_env = dict(os.environ, PYTHONPATH=package_root)
+        timings = {}
+        for label, argv, env in (
+            ("shell", ["bash", script, "v0.0.0"], shell_env),
+            ("python", python_cmd, python_env),
+        ):
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run(
+                    argv,
+                    cwd=work,
+                    env=env,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check=True,
+                )
+                samples.append((time.perf_counter() - start) * 1000)
+            timings[label] = round(statistics.median(samples), 1)
+        archives = len(list((work / ".genreleases").glob("*.zip")))
+    return {
+        "shell_ms": timings["shell"],
+        "python_ms": timings["python"],
+        "speedup": round(timings["shell"] / timings["python"], 1),
+        "archives": archives,
+    }
+
+
+# Suite -----------------------------------------------------------------------
+
+SUITE_VERSION = "v9.9.9"
+SUITE_AGENT = "claude"
+SUITE_SCRIPT = "sh"
+SUITE_GROUPS = ("init", "phases", "startup", "scripts")
+# Median slowdown tolerated by compare_results before reporting a regression
+DEFAULT_TOLERANCE = 0.2
+
+# Workflows run against the generated repository; {feature} is a feature dir
+SCRIPT_WORKFLOWS: list[tuple[str, list[str]]] = [
+    ("check-prerequisites", ["check-prerequisites.sh", "--json"]),
+    ("create-new-feature", ["create-new-feature.sh", "--json", "bench feature"]),
+    (
+        "update-agent-context",
+        ["update-agent-context.sh", "--json", "--feature-dir", "{feature}"],
+    ),
+    ("d3-analyze", ["d3-analyze.sh", "{feature}"]),
+    ("d3-tasks", ["d3-tasks.sh", "{feature}"]),
+]
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """Summary statistics of millisecond samples."""
+    ordered = sorted(samples)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p90, p95, p99 = cuts[49], cuts[89], cuts[94], cuts[98]
+    else:
+        p50 = p90 = p95 = p99 = ordered[0]
+    return {
+        "runs": len(ordered),
+        "min": round(ordered[0], 2),
+        "p50": round(p50, 2),
+        "p90": round(p90, 2),
+        "p95": round(p95, 2),
+        "p99": round(p99, 2),
+        "max": round(ordered[-1], 2),
+        "mean": round(statistics.fmean(ordered), 2),
+    }
+
+
+def synthetic_template_zip(files: int, total_bytes: int, seed: int = 0) -> bytes:
+    """A template-shaped archive of files spread over a few directories.
+
+    Contents are hex text, which compresses about as well as real markdown.
+    """
+    rng = random.Random(seed)
+    per_file = max(1, total_bytes // max(files, 1))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(files):
+            directory = (".d3/D3-templates", ".d3/scripts/bash", ".claude/commands")[
+                i % 3
+            ]
+            zf.writestr(
+                f"{directory}/bench-{i:05d}.md", rng.randbytes(per_file // 2).hex()
+            )
+    return buffer.getvalue()
+
+
+class ReleaseStandIn:
+    """Local HTTP server standing in for GitHub releases.
+
+    Serves ``/latest`` as release JSON and any asset under ``/download/<tag>/``
+    as the given archive, with ETags so conditional requests get a 304.
+    Point the CLI at it with ``D3_KIT_RELEASES_URL``.
+    """
+
+    def __init__(self, archive: bytes, version: str = SUITE_VERSION):
+        self.archive = archive
+        self.version = version
+        self.requests = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                stand_in.requests += 1
+                if self.path.rstrip("/").endswith("/latest"):
+                    body = json.dumps({"tag_name": stand_in.version}).encode()
+                    etag = f'"{stand_in.version}"'
+                elif "/download/" in self.path:
+                    body = stand_in.archive
+                    etag = f'"{len(body)}"'
+                else:
+                    self.send_error(404)
+                    return
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "ReleaseStandIn":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _package_env(**extra: str) -> dict[str, str]:
+    """Environment that runs this copy of d3_kit even when it is not installed."""
+    package_root = str(Path(__file__).resolve().parent.parent)
+    path = os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")]))
+    return dict(os.environ, PYTHONPATH=path, **extra)
+
+
+def measure_init(url: str, runs: int) -> dict[str, list[float]]:
+    """``d3 init`` end to end, with an empty and with a populated cache."""
+    samples: dict[str, list[float]] = {"init.cold": [], "init.warm": []}
+    argv = [sys.executable, "-c", CLI_ENTRY, "init", "proj"]
+    argv += ["--ai", SUITE_AGENT, "--script", SUITE_SCRIPT]
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(runs):
+            cache_dir = Path(tmp) / f"cache-{i}"
+            env = _package_env(D3_KIT_RELEASES_URL=url, D3_KIT_CACHE_DIR=str(cache_dir))
+            for metric in ("init.cold", "init.warm"):
+                work = Path(tempfile.mkdtemp(dir=tmp))
+                start = time.perf_counter()
+                subprocess.run(
+                    argv,
+                    cwd=work,
+                    env=env,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check=True,
+                )
+                samples[metric].append((time.perf_counter() - start) * 1000)
+                shutil.rmtree(work)
+    return samples
+
+
+@contextmanager
+def _environ(**values: str) -> Iterator[None]:
+    saved = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def measure_phases(url: str, runs: int) -> dict[str, list[float]]:
+    """Per-step timings of ``download_and_extract_template`` from a cold cache."""
+    from .cache import TemplateCache
+    from .cli import StepTracker, download_and_extract_template
+
+    samples: dict[str, list[float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(runs):
+            cache_dir = Path(tmp) / f"cache-{i}"
+            project = Path(tmp) / f"project-{i}"
+            project.mkdir()
+            tracker = StepTracker("bench")
+            with _environ(D3_KIT_RELEASES_URL=url, D3_KIT_CACHE_DIR=str(cache_dir)):
+                start = time.perf_counter()
+                ok = download_and_extract_template(
+                    project,
+                    SUITE_AGENT,
+                    SUITE_SCRIPT,
+                    tracker=tracker,
+                    cache=TemplateCache(cache_dir),
+                )
+                total = (time.perf_counter() - start) * 1000
+            if not ok:
+                failed = [s for s in tracker.steps if s["status"] == "error"]
+                raise RuntimeError(f"download_and_extract_template failed: {failed}")
+            samples.setdefault("phases.total", []).append(total)
+            for step in tracker.steps:
+                if step["start"] is not None and step["end"] is not None:
+                    elapsed = (step["end"] - step["start"]) * 1000
+                    samples.setdefault(f"phases.{step['key']}", []).append(elapsed)
+            shutil.rmtree(project)
+    return samples
+
+
+def make_feature_repo(root: Path, features: int) -> list[Path]:
+    """A git repository with the bash scripts, templates and N populated features."""
+    # Prefer the checkout's full script set over the subset bundled in the package
+    source = Path(__file__).resolve().parents[2]
+    if not (source / "scripts" / "bash").is_dir():
+        source = Path(__file__).resolve().parent
+    shutil.copytree(source / "scripts" / "bash", root / "scripts" / "bash")
+    shutil.copytree(source / "D3-templates", root / "D3-templates")
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    feature_dirs = []
+    for i in range(1, features + 1):
+        feature_dir = root / "d3-features" / f"{i:03d}-feature-{i}"
+        (feature_dir / "contracts").mkdir(parents=True)
+        (feature_dir / "spec.md").write_text(
+            f"# Feature {i}\n\n## Requirements\n\n"
+            + "".join(f"- **FR-{r:03d}**: Requirement {r}\n" for r in range(1, 11)),
+            encoding="utf-8",
+        )
+        (feature_dir / "plan.md").write_text(
+            f"# Plan {i}\n\n**Language/Version**: Python 3.11\n"
+            "**Primary Dependencies**: typer\n",
+            encoding="utf-8",
+        )
+        (feature_dir / "tasks.md").write_text(
+            "# Tasks\n\n"
+            + "".join(
+                f"- [ ] T{t:03d} [P] Implement FR-{t:03d}\n" for t in range(1, 11)
+            ),
+            encoding="utf-8",
+        )
+        (feature_dir / "contracts" / "api.md").write_text(
+            "# API\n\nCovers FR-001.\n", encoding="utf-8"
+        )
+        feature_dirs.append(feature_dir)
+    return feature_dirs
+
+
+def measure_scripts(features: int, runs: int) -> dict[str, list[float]]:
+    """Time the bash workflows against a generated repository."""
+    samples: dict[str, list[float]] = {}
+    if shutil.which("bash") is None:
+        return samples
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        feature_dirs = make_feature_repo(root, features)
+        target = str(feature_dirs[-1]) if feature_dirs else str(root)
+        for name, command in SCRIPT_WORKFLOWS:
+            script, *args = command
+            if not (root / "scripts" / "bash" / script).is_file():
+                continue
+            argv = ["bash", str(root / "scripts" / "bash" / script)]
+            argv += [arg.replace("{feature}", target) for arg in args]
+            # Warm-up run; a failing workflow would only time its error path
+            warmup = subprocess.run(
+                argv, cwd=root, env=_package_env(), capture_output=True, text=True
+            )
+            if warmup.returncode != 0:
+                raise RuntimeError(f"{script} failed: {warmup.stderr.strip()}")
+            samples[f"scripts.{name}"] = _time_samples(
+                argv, runs, cwd=root, env=_package_env()
+            )
+    return samples
+
+
+def run_suite(
+    runs: int = 5,
+    files: int = 200,
+    archive_bytes: int = 2 * 1024 * 1024,
+    features: int = 50,
+    groups: Optional[list[str]] = None,
+) -> dict[str, Any]:
+    """Run the selected benchmark groups; returns metadata and metrics."""
+    groups = list(groups or SUITE_GROUPS)
+    archive = synthetic_template_zip(files, archive_bytes)
+    samples: dict[str, list[float]] = {}
+    with ReleaseStandIn(archive) as stand_in:
+        if "init" in groups:
+            samples.update(measure_init(stand_in.url, runs))
+        if "phases" in groups:
+            samples.update(measure_phases(stand_in.url, runs))
+    if "startup" in groups:
+        for args, _ in STARTUP_COMMANDS:
+            argv = [sys.executable, "-c", CLI_ENTRY, *args]
+            samples[f"startup.{' '.join(args)}"] = _time_samples(
+                argv, runs, env=_package_env()
+            )
+        samples["startup.python"] = _time_samples([sys.executable, "-c", "pass"], runs)
+    if "scripts" in groups:
+        samples.update(measure_scripts(features, runs))
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "d3_on_path": shutil.which("d3") is not None,
+            "runs": runs,
+            "archive": {"files": files, "bytes": len(archive)},
+            "features": features,
+            "groups": groups,
+        },
+        "metrics": {name: percentiles(values) for name, values in samples.items()},
+    }
+
+
+def compare_results(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[str]:
+    """Metrics whose median is more than tolerance slower than the baseline."""
+    regressions = []
+    for name, stats in current["metrics"].items():
+        before = baseline.get("metrics", {}).get(name)
+        if not before or before["p50"] <= 0:
+            continue
+        ratio = stats["p50"] / before["p50"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{name}: p50 {before['p50']:.1f} -> {stats['p50']:.1f} ms "
+                f"(+{(ratio - 1):.0%})"
+            )
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark d3 CLI startup")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=BUDGET_TOLERANCE,
+        help="Fraction a median may exceed its budget (default %(default)s)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print raw results")
+    parser.add_argument(
+        "--release",
+        type=Path,
+        metavar="REPO",
+        help="Compare the shell and Python release builders on this checkout",
+    )
+    args = parser.parse_args(argv)
+
+    if args.release:
+        release = measure_release(args.release, args.runs)
+        if args.json:
+            print(json.dumps(release, indent=2))
+        else:
+            print(
+                f"shell {release['shell_ms']:.0f} ms, python {release['python_ms']:.0f} ms "
+                f"({release['speedup']}x, {release['archives']} archives)"
+            )
+        return 0
+
+    results = measure_startup(args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+    failures = []
+    slack = 1 + args.tolerance
+    if not args.json:
+        print(
+            f"{'import d3_kit.cli':<40} {results['import_ms']:>8.1f} ms "
+            f"(budget {args.import_budget_ms:.0f} ms)"
+        )
+    if results["import_ms"] > args.import_budget_ms * slack:
+        failures.append(
+            f"import d3_kit.cli took {results['import_ms']} ms "
+            f"(budget {args.import_budget_ms} ms)"
+        )
+    if results["eager_modules"]:
+        failures.append(
+            "imported eagerly by d3_kit.cli: " + ", ".join(results["eager_modules"])
+        )
+    for cmd in results["commands"]:
+        if not args.json:
+            print(
+                f"{cmd['command']:<40} {cmd['overhead_ms']:>8.1f} ms "
+                f"(budget {cmd['budget_ms']:.0f} ms)"
+            )
+        if cmd["overhead_ms"] > cmd["budget_ms"] * slack:
+            failures.append(
+                f"{cmd['command']} took {cmd['overhead_ms']} ms over interpreter "
+                f"start (budget {cmd['budget_ms']:.0f} ms)"
+            )
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
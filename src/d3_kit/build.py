@@ -0,0 +1,301 @@
+"""Hash-based incremental builds of feature artifacts (``d3 build``).
+
+The generated artifacts of a feature follow the pipeline in ``D3_COMMANDS``:
+spec -> research/data -> plan -> contracts -> tasks -> quickstart/checklist.
+Each step runs its ``scripts/bash/d3-<step>.sh`` and is described by the
+files it reads and writes; a step depends on the steps producing its inputs.
+The generator script and the template it renders count as inputs too.
+
+After a step runs, the SHA-256 of its inputs and outputs are recorded in
+``.d3/build-manifest.json``. A step is stale when it was never built, an
+output is missing or an input hash differs from the recorded one. Staleness
+is decided when the step becomes ready, after its upstream steps ran, so a
+rerun that reproduces identical output does not ripple further. Steps are
+scheduled with the task graph runner, so independent branches and features
+build in parallel.
+
+Outputs edited by hand are never overwritten silently: a stale step whose
+output no longer matches the recorded hash is kept (and reported) unless
+forced, and outputs that exist before their first build are adopted as up
+to date.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .fanout import run_script, script_path
+from .tasks import Task, TaskGraph, run_graph
+from .utils import atomic_write_text
+
+MANIFEST_FILENAME = "build-manifest.json"
+MANIFEST_VERSION = 1
+DEFAULT_WORKERS = 4
+
+# (step, script, template, inputs, outputs); paths relative to the feature
+BUILD_STEPS: list[tuple[str, str, Optional[str], list[str], list[str]]] = [
+    ("research", "d3-research.sh", None, ["spec.md"], ["research.md"]),
+    ("data", "d3-data.sh", None, ["spec.md"], ["data-model.md"]),
+    (
+        "plan",
+        "d3-plan.sh",
+        "d3-plan-template.md",
+        ["spec.md", "research.md", "data-model.md"],
+        ["plan.md"],
+    ),
+    ("contracts", "d3-contracts.sh", None, ["plan.md"], ["contracts/api.md"]),
+    (
+        "tasks",
+        "d3-tasks.sh",
+        "d3-tasks-template.md",
+        ["plan.md", "contracts/api.md"],
+        ["tasks.md"],
+    ),
+    ("quickstart", "d3-quickstart.sh", None, ["tasks.md"], ["quickstart.md"]),
+    (
+        "checklist",
+        "d3-checklist.sh",
+        "checklist-template.md",
+        ["tasks.md"],
+        ["checklists/requirements.md"],
+    ),
+]
+
+
+def template_path(repo_root: Path, name: str) -> Optional[Path]:
+    """Where the scripts' ``load_template`` finds a template."""
+    for base in (repo_root / ".d3" / "D3-templates", repo_root / "D3-templates"):
+        if (base / name).is_file():
+            return base / name
+    return None
+
+
+def _sha256(path: Path) -> Optional[str]:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+class Builder:
+    """Bring the generated artifacts of features up to date."""
+
+    def __init__(self, repo_root: Path, manifest_path: Optional[Path] = None):
+        self.repo_root = repo_root
+        self.manifest_path = manifest_path or repo_root / ".d3" / MANIFEST_FILENAME
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("steps", {})
+
+    def _generators(self, script: str, template: Optional[str]) -> dict[str, Path]:
+        """Generator files of a step keyed by their manifest name."""
+        found: dict[str, Path] = {}
+        path = script_path(self.repo_root, script)
+        if path:
+            found[f"@{script}"] = path
+        if template:
+            tpath = template_path(self.repo_root, template)
+            if tpath:
+                found[f"@{template}"] = tpath
+        return found
+
+    def _check(
+        self,
+        feature_dir: Path,
+        step: tuple[str, str, Optional[str], list[str], list[str]],
+        record: Optional[dict[str, Any]],
+        dirty_upstream: list[str],
+        force: bool,
+    ) -> tuple[str, list[str], dict[str, Optional[str]], dict[str, Optional[str]]]:
+        """Decide what to do with one step.
+
+        Returns (action, reasons, input hashes, output hashes); action is
+        run, fresh, adopt, keep or missing.
+        """
+        name, script, template, inputs, outputs = step
+        hashes: dict[str, Optional[str]] = {
+            rel: _sha256(feature_dir / rel) for rel in inputs
+        }
+        for key, path in self._generators(script, template).items():
+            hashes[key] = _sha256(path)
+        produced = {rel: _sha256(feature_dir / rel) for rel in outputs}
+
+        missing = [rel for rel in inputs if hashes[rel] is None]
+        if missing and not dirty_upstream:
+            return (
+                "missing",
+                [f"input {rel} missing" for rel in missing],
+                hashes,
+                produced,
+            )
+        if f"@{script}" not in hashes:
+            return "missing", [f"generator {script} not found"], hashes, produced
+        if force:
+            return "run", ["forced"], hashes, produced
+        if record is None:
+            if all(produced.values()):
+                return "adopt", ["existing outputs recorded as built"], hashes, produced
+            return "run", ["never built"], hashes, produced
+
+        reasons = [f"upstream {up} is stale" for up in dirty_upstream]
+        reasons += [f"output {rel} missing" for rel, sha in produced.items() if not sha]
+        recorded_inputs = record.get("inputs", {})
+        for key, sha in hashes.items():
+            if key not in recorded_inputs:
+                reasons.append(f"new input {key.lstrip('@')}")
+            elif recorded_inputs[key] != sha:
+                kind = "generator" if key.startswith("@") else "input"
+                reasons.append(f"{kind} {key.lstrip('@')} changed")
+        if not reasons:
+            return "fresh", [], hashes, produced
+        edited = [
+            rel
+            for rel, sha in produced.items()
+            if sha and sha != record.get("outputs", {}).get(rel)
+        ]
+        if edited:
+            reasons.append(
+                f"kept: {', '.join(edited)} edited since the last build "
+                "(use --force to regenerate)"
+            )
+            return "keep", reasons, hashes, produced
+        return "run", reasons, hashes, produced
+
+    def run(
+        self,
+        feature_dirs: list[Path],
+        workers: int = DEFAULT_WORKERS,
+        force: bool = False,
+        dry_run: bool = False,
+        on_step: Optional[Callable[[dict[str, Any]], None]] = None,
+    ) -> dict[str, Any]:
+        """Build the stale steps of feature_dirs; returns per-step outcomes.
+
+        With dry_run nothing is run or recorded; steps downstream of a stale
+        one are reported as stale too.
+        """
+        start = time.perf_counter()
+        manifest = self._load()
+        tasks: list[Task] = []
+        specs: dict[str, tuple[Path, tuple]] = {}
+        producers = {out: step[0] for step in BUILD_STEPS for out in step[4]}
+        for feature_dir in feature_dirs:
+            for step in BUILD_STEPS:
+                tid = f"{feature_dir.name}/{step[0]}"
+                task = Task(tid, len(tasks) + 1)
+                task.parallel = True
+                task.command = step[1]
+                task.depends_on = sorted(
+                    {
+                        f"{feature_dir.name}/{producers[rel]}"
+                        for rel in step[3]
+                        if rel in producers
+                    }
+                )
+                tasks.append(task)
+                specs[tid] = (feature_dir, step)
+        graph = TaskGraph(tasks)
+
+        outcomes: dict[str, dict[str, Any]] = {}
+        stale: set[str] = set()
+
+        def build_step(task: Task, cwd: Path, env: dict[str, str]) -> int:
+            feature_dir, step = specs[task.id]
+            with self._lock:
+                record = manifest.get(task.id)
+                dirty = [d.split("/", 1)[1] for d in task.depends_on if d in stale]
+            action, reasons, inputs, outputs = self._check(
+                feature_dir, step, record, dirty if dry_run else [], force
+            )
+            outcome: dict[str, Any] = {
+                "step": task.id,
+                "feature": feature_dir.name,
+                "action": action,
+                "reasons": reasons,
+                "seconds": 0.0,
+            }
+            code = 0
+            if action == "missing":
+                code = 1
+            elif action == "run" and dry_run:
+                outcome["action"] = "stale"
+                with self._lock:
+                    stale.add(task.id)
+            elif action == "run":
+                script = script_path(self.repo_root, step[1])
+                assert script is not None
+                result = run_script(script, feature_dir, self.repo_root)
+                outcome["seconds"] = result["seconds"]
+                if result["status"] == "error":
+                    outcome["action"] = "failed"
+                    outcome["reasons"] = reasons + [result["message"]]
+                    code = result["exit_code"] or 1
+                else:
+                    outcome["action"] = "rebuilt"
+                    outputs = {rel: _sha256(feature_dir / rel) for rel in step[4]}
+            if not dry_run and outcome["action"] in ("rebuilt", "adopt"):
+                with self._lock:
+                    manifest[task.id] = {
+                        "inputs": inputs,
+                        "outputs": outputs,
+                        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    }
+            outcome["action"] = {"adopt": "adopted", "keep": "kept"}.get(
+                outcome["action"], outcome["action"]
+            )
+            with self._lock:
+                outcomes[task.id] = outcome
+            if on_step:
+                on_step(outcome)
+            return code
+
+        run_graph(graph, self.repo_root, workers=workers, runner=build_step)
+
+        steps = []
+        for tid in graph.order:
+            if tid not in outcomes:
+                # Not reached: an upstream step failed or lacked inputs
+                outcomes[tid] = {
+                    "step": tid,
+                    "feature": specs[tid][0].name,
+                    "action": "blocked",
+                    "reasons": [
+                        f"upstream {dep.split('/', 1)[1]} did not complete"
+                        for dep in sorted(graph.deps[tid])
+                        if outcomes[dep]["action"] in ("missing", "failed", "blocked")
+                    ],
+                    "seconds": 0.0,
+                }
+            steps.append(outcomes[tid])
+
+        if not dry_run:
+            atomic_write_text(
+                self.manifest_path,
+                json.dumps(
+                    {"version": MANIFEST_VERSION, "steps": manifest},
+                    indent=1,
+                    sort_keys=True,
+                ),
+            )
+        counts: dict[str, int] = {}
+        for outcome in steps:
+            counts[outcome["action"]] = counts.get(outcome["action"], 0) + 1
+        return {
+            "dry_run": dry_run,
+            "features": len(feature_dirs),
+            "counts": counts,
+            "steps": steps,
+            "failed": [o["step"] for o in steps if o["action"] == "failed"],
+            "elapsed_seconds": round(time.perf_counter() - start, 3),
+        }
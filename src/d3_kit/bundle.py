@@ -0,0 +1,107 @@
+"""Templates and scripts bundled with the package, for init without network.
+
+The wheel force-includes the repository's ``D3-templates/`` and
+``scripts/`` as ``d3_kit/bundled/`` (see pyproject.toml); a source checkout
+reads them from the repository root instead. They are read through
+``importlib.resources`` and rendered per agent with the release builder, so
+an offline project gets the same layout as a release archive, plus the real
+scripts of the chosen variant instead of the release's placeholder. The
+rendered archive is kept in the template cache, keyed by a fingerprint of
+the bundled files, so later offline inits skip rendering too.
+"""
+
+import hashlib
+import importlib.resources
+from importlib.resources.abc import Traversable
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from . import __version__
+from .release import SCRIPT_PLACEHOLDERS, deterministic_zip, variant_files
+from .templates import COMMANDS_DIRNAME, TEMPLATES_DIRNAME, Template
+from .utils import atomic_write_bytes
+
+BUNDLE_DIRNAME = "bundled"
+SCRIPT_DIRS = {"sh": "bash", "ps": "powershell"}
+
+
+def bundle_root() -> Optional[Traversable]:
+    """Where the bundled templates live: the installed package or the checkout."""
+    packaged = importlib.resources.files("d3_kit") / BUNDLE_DIRNAME
+    if (packaged / TEMPLATES_DIRNAME).is_dir():
+        return packaged
+    checkout = Path(__file__).resolve().parents[2]
+    if (checkout / TEMPLATES_DIRNAME / COMMANDS_DIRNAME).is_dir():
+        return checkout
+    return None
+
+
+def _walk(node: Traversable, prefix: str = "") -> Iterator[tuple[str, Traversable]]:
+    """Every file below node as (relative posix path, resource), sorted."""
+    for child in sorted(node.iterdir(), key=lambda c: c.name):
+        rel = f"{prefix}{child.name}"
+        if child.is_dir():
+            yield from _walk(child, rel + "/")
+        elif child.is_file():
+            yield rel, child
+
+
+def load_bundled_sources(root: Traversable) -> dict[str, Any]:
+    """The bundled counterpart of ``release.load_sources``, plus the scripts."""
+    templates = root / TEMPLATES_DIRNAME
+    static = []
+    commands = []
+    for rel, resource in _walk(templates):
+        data = resource.read_bytes()
+        static.append((f".d3/{TEMPLATES_DIRNAME}/{rel}", data))
+        name = rel.rsplit("/", 1)[-1]
+        if rel.startswith(f"{COMMANDS_DIRNAME}/") and name.startswith("d3."):
+            template = Template(data.decode("utf-8"), name[: -len(".md")])
+            commands.append(
+                template.without_frontmatter_keys("scripts", "agent_scripts")
+            )
+    scripts: dict[str, list[tuple[str, bytes]]] = {}
+    for script, dirname in SCRIPT_DIRS.items():
+        directory = root / "scripts" / dirname
+        if directory.is_dir():
+            scripts[script] = [
+                (f".d3/scripts/{dirname}/{rel}", resource.read_bytes())
+                for rel, resource in _walk(directory)
+            ]
+    return {"commands": commands, "static": static, "scripts": scripts}
+
+
+def fingerprint(root: Traversable) -> str:
+    """Short digest of the bundled files, so edited checkouts re-render."""
+    digest = hashlib.sha256(__version__.encode())
+    for top in (TEMPLATES_DIRNAME, "scripts"):
+        if (root / top).is_dir():
+            for rel, resource in _walk(root / top):
+                digest.update(rel.encode())
+                digest.update(hashlib.sha256(resource.read_bytes()).digest())
+    return digest.hexdigest()[:12]
+
+
+def bundled_files(agent: str, script: str, sources: dict[str, Any]) -> dict[str, bytes]:
+    """All files of an agent/script project rendered from bundled sources."""
+    files = variant_files(agent, script, sources)
+    real_scripts = sources["scripts"].get(script)
+    if real_scripts:
+        files.pop(f".d3/{SCRIPT_PLACEHOLDERS[script][0]}", None)
+        files.update(real_scripts)
+    return files
+
+
+def bundled_archive(agent: str, script: str, cache_dir: Path) -> Path:
+    """Path to a template archive rendered from the bundle, built on first use."""
+    root = bundle_root()
+    if root is None:
+        raise RuntimeError("This installation does not include bundled templates")
+    key = fingerprint(root)
+    path = cache_dir / "bundled" / f"d3-kit-template-{agent}-{script}-{key}.zip"
+    if not path.is_file():
+        sources = load_bundled_sources(root)
+        atomic_write_bytes(
+            path, deterministic_zip(bundled_files(agent, script, sources))
+        )
+    return path
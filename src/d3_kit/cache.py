@@ -0,0 +1,235 @@
+"""Local content-addressed cache for D3-Kit release template archives.
+
+Archives are stored once under ``templates/<sha256>.zip`` and referenced from a
+small JSON index keyed by ``agent/script_type/version``. The index records the
+digest, size, ETag and access times used for integrity checks, conditional
+revalidation and LRU eviction.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from .utils import atomic_write_text, file_lock, sha256_file, user_cache_dir
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Release assets are immutable per tag, so a cached archive only needs an
+# occasional If-None-Match round trip to catch re-uploaded assets.
+DEFAULT_REVALIDATE_SECONDS = 24 * 60 * 60
+# LRU eviction does not need finer access times than this, so a cache hit
+# rewrites the index at most this often
+TOUCH_INTERVAL_SECONDS = 10 * 60
+STATE_FILENAME = "state.json"
+
+
+def read_state(root: Optional[Path] = None) -> dict[str, Any]:
+    """Load the small JSON state file kept next to the template cache."""
+    path = (root or user_cache_dir()) / STATE_FILENAME
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def write_state(state: dict[str, Any], root: Optional[Path] = None):
+    path = (root or user_cache_dir()) / STATE_FILENAME
+    atomic_write_text(path, json.dumps(state, indent=2, sort_keys=True))
+
+
+class TemplateCache:
+    """On-disk LRU cache of template archives keyed by (agent, script_type, version)."""
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        max_bytes: Optional[int] = None,
+        revalidate_seconds: Optional[float] = None,
+    ):
+        self.root = root or user_cache_dir()
+        self.blobs_dir = self.root / "templates"
+        self.index_path = self.root / "templates.json"
+        self.lock_path = self.root / "templates.lock"
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("D3_KIT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = (
+            DEFAULT_REVALIDATE_SECONDS
+            if revalidate_seconds is None
+            else revalidate_seconds
+        )
+        # Index read-modify-write cycles hold the RLock between threads and
+        # the lock file between processes (concurrent `d3 init` runs)
+        self._lock = threading.RLock()
+        self._depth = 0
+
+    @staticmethod
+    def key(agent: str, script_type: str, version: str) -> str:
+        return f"{agent}/{script_type}/{version}"
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold both locks; re-entrant within a thread."""
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            with file_lock(self.lock_path):
+                self._depth = 1
+                try:
+                    yield
+                finally:
+                    self._depth = 0
+
+    def _load_index(self) -> dict[str, dict[str, Any]]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save_index(self, index: dict[str, dict[str, Any]]):
+        atomic_write_text(self.index_path, json.dumps(index, indent=2, sort_keys=True))
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.blobs_dir / f"{sha256}.zip"
+
+    def lookup(
+        self, agent: str, script_type: str, version: str, verify: bool = False
+    ) -> Optional[dict[str, Any]]:
+        """Return the index entry for a cached archive, or None.
+
+        A hit costs one stat: the blob must still have its recorded size.
+        Its digest was checked when it was stored (and extraction checks
+        every member's CRC); verify re-hashes it as well. A missing or bad
+        blob drops the entry so the caller falls back to a fresh download.
+        The LRU timestamp is rewritten at most every TOUCH_INTERVAL_SECONDS.
+        """
+        key = self.key(agent, script_type, version)
+        entry = self._load_index().get(key)
+        if entry is None:
+            return None
+
+        path = self.blob_path(entry["sha256"])
+        try:
+            size: Optional[int] = path.stat().st_size
+        except OSError:
+            size = None
+        if size != entry.get("size") or (
+            verify and sha256_file(path) != entry["sha256"]
+        ):
+            self._drop(key, entry["sha256"])
+            return None
+
+        now = time.time()
+        if now - entry.get("last_used", 0) >= TOUCH_INTERVAL_SECONDS:
+            with self._locked():
+                index = self._load_index()
+                if key in index:
+                    index[key]["last_used"] = now
+                    self._save_index(index)
+            entry["last_used"] = now
+        return dict(entry, path=str(path))
+
+    def _drop(self, key: str, digest: str):
+        """Forget a broken entry, and its blob unless another entry shares it."""
+        with self._locked():
+            index = self._load_index()
+            if index.get(key, {}).get("sha256") != digest:
+                return
+            del index[key]
+            if not any(e["sha256"] == digest for e in index.values()):
+                self.blob_path(digest).unlink(missing_ok=True)
+            self._save_index(index)
+
+    def is_fresh(self, entry: dict[str, Any]) -> bool:
+        """Whether an entry was validated recently enough to skip the network."""
+        validated_at = entry.get("validated_at", 0)
+        return time.time() - validated_at < self.revalidate_seconds
+
+    def mark_validated(self, agent: str, script_type: str, version: str):
+        """Record a successful revalidation (e.g. HTTP 304) for an entry."""
+        with self._locked():
+            index = self._load_index()
+            entry = index.get(self.key(agent, script_type, version))
+            if entry is not None:
+                entry["validated_at"] = entry["last_used"] = time.time()
+                self._save_index(index)
+
+    def store(
+        self,
+        agent: str,
+        script_type: str,
+        version: str,
+        source: Path,
+        etag: Optional[str] = None,
+    ) -> Path:
+        """Move a downloaded archive into the cache and return its cached path."""
+        digest = sha256_file(source)
+        target = self.blob_path(digest)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            if target.exists():
+                source.unlink()
+            else:
+                os.replace(source, target)
+
+            now = time.time()
+            index = self._load_index()
+            index[self.key(agent, script_type, version)] = {
+                "agent": agent,
+                "script_type": script_type,
+                "version": version,
+                "sha256": digest,
+                "size": target.stat().st_size,
+                "etag": etag,
+                "last_used": now,
+                "validated_at": now,
+            }
+            self._evict(index, keep=digest)
+            self._save_index(index)
+        return target
+
+    def versions(self, agent: str, script_type: str) -> dict[str, float]:
+        """Cached versions of an agent/script pair with their last use."""
+        return {
+            entry["version"]: entry.get("last_used", 0)
+            for entry in self._load_index().values()
+            if entry.get("agent") == agent and entry.get("script_type") == script_type
+        }
+
+    def latest_version(self, agent: str, script_type: str) -> Optional[str]:
+        """Return the most recently used cached version for an agent/script pair."""
+        versions = self.versions(agent, script_type)
+        return max(versions, key=versions.__getitem__) if versions else None
+
+    def _evict(self, index: dict[str, dict[str, Any]], keep: str):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        blob_sizes: dict[str, int] = {}
+        for entry in index.values():
+            blob_sizes[entry["sha256"]] = entry.get("size", 0)
+        total = sum(blob_sizes.values())
+
+        for key, entry in sorted(index.items(), key=lambda kv: kv[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            digest = entry["sha256"]
+            if digest == keep:
+                continue
+            del index[key]
+            if any(e["sha256"] == digest for e in index.values()):
+                continue
+            total -= blob_sizes[digest]
+            path = self.blob_path(digest)
+            if path.exists():
+                path.unlink()
@@ -1,27 +1,46 @@
 #!/usr/bin/env python3
-"""D3-Kit: Developer-Driven Development Framework CLI"""
+"""D3-Kit: Developer-Driven Development Framework CLI
+
+Heavy dependencies (httpx, Rich's layout/live widgets, zipfile) are imported
+inside the commands that use them, so trivial commands and ``--help`` start
+quickly. Keep new module-level imports to the standard library essentials.
+"""
 
 import os
 import sys
-import shutil
-import zipfile
-import tempfile
-import subprocess
+import time
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Annotated, Any, Callable, NoReturn, Optional, Union
 
 import typer
-import httpx
-from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.text import Text
-from rich.live import Live
-from rich.align import Align
-from rich.tree import Tree
 from typer.core import TyperGroup
 
-console = Console()
+from . import AGENT_CONFIG, SCRIPT_TYPE_CHOICES, machine
+
+if TYPE_CHECKING:
+    from .cache import TemplateCache
+
+_console: Any = None
+
+
+def get_console():
+    """Return the shared Rich console, creating it on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
+
+
+class _LazyConsole:
+    """Stand-in for the Rich console that defers importing Rich until used."""
+
+    def __getattr__(self, name: str):
+        return getattr(get_console(), name)
+
+
+console = _LazyConsole()
 
 BANNER = """
   ___  ___  _  _  _ ___
@@ -32,42 +51,56 @@ BANNER = """
 
 TAGLINE = "Developer-Driven Development Framework"
 
-# Agent configuration
-AGENT_CONFIG = {
-    "amp": {"name": "Amp", "folder": ".agents/"},
-    "claude": {"name": "Claude Code", "folder": ".claude/"},
-    "cursor-agent": {"name": "Cursor", "folder": ".cursor/"},
-    "copilot": {"name": "GitHub Copilot", "folder": ".github/"},
-    "gemini": {"name": "Gemini CLI", "folder": ".gemini/"},
-    "qwen": {"name": "Qwen Code", "folder": ".qwen/"},
-    "opencode": {"name": "opencode", "folder": ".opencode/"},
-    "windsurf": {"name": "Windsurf", "folder": ".windsurf/"},
-    "kilocode": {"name": "Kilo Code", "folder": ".kilocode/"},
-    "auggie": {"name": "Auggie CLI", "folder": ".augment/"},
-    "roo": {"name": "Roo Code", "folder": ".roo/"},
-    "q": {"name": "Amazon Q Developer", "folder": ".amazonq/"},
-    "shai": {"name": "SHAI", "folder": ".shai/"},
-    "bob": {"name": "IBM Bob", "folder": ".bob/"},
-    "codebuddy": {"name": "CodeBuddy", "folder": ".codebuddy/"},
-    "qoder": {"name": "Qoder CLI", "folder": ".qoder/"},
-    "codex": {"name": "Codex CLI", "folder": ".codex/"},
-}
-
-SCRIPT_TYPE_CHOICES = {"sh": "POSIX Shell (bash/zsh)", "ps": "PowerShell"}
+
+def _format_size(num_bytes: int) -> str:
+    if num_bytes < 1024 * 1024:
+        return f"{num_bytes / 1024:.1f} KB"
+    return f"{num_bytes / (1024 * 1024):.1f} MB"
 
 
 class StepTracker:
-    """Track and render hierarchical steps."""
+    """Track and render hierarchical steps.
+
+    Besides status and detail, each step records monotonic start/end times
+    (``time.perf_counter``) and the bytes and files it processed, which
+    ``--trace`` exports as Chrome trace events. In machine mode every status
+    change is also emitted as an NDJSON ``step`` event.
+    """
 
     def __init__(self, title: str):
         self.title = title
-        self.steps: list[dict[str, str]] = []
+        self.steps: list[dict[str, Any]] = []
+        self._index: dict[str, dict[str, Any]] = {}
+        self._refresh_cb: Optional[Callable[[], None]] = None
+        self._emit = machine.enabled()
+        from .trace import active_recorder
+
+        recorder = active_recorder()
+        if recorder is not None:
+            recorder.register(self)
+
+    def attach_refresh(self, cb: Callable[[], None]):
+        """Register a callback invoked whenever a step changes (e.g. Live.update)."""
+        self._refresh_cb = cb
+
+    def _new_step(self, key: str, label: str) -> dict[str, Any]:
+        step = {
+            "key": key,
+            "label": label,
+            "status": "pending",
+            "detail": "",
+            "start": None,
+            "end": None,
+            "bytes": None,
+            "files": None,
+        }
+        self.steps.append(step)
+        self._index[key] = step
+        return step
 
     def add(self, key: str, label: str):
-        if key not in [s["key"] for s in self.steps]:
-            self.steps.append(
-                {"key": key, "label": label, "status": "pending", "detail": ""}
-            )
+        if key not in self._index:
+            self._new_step(key, label)
 
     def start(self, key: str, detail: str = ""):
         self._update(key, status="running", detail=detail)
@@ -81,19 +114,56 @@ class StepTracker:
     def skip(self, key: str, detail: str = ""):
         self._update(key, status="skipped", detail=detail)
 
-    def _update(self, key: str, status: str, detail: str):
-        for s in self.steps:
-            if s["key"] == key:
-                s["status"] = status
-                if detail:
-                    s["detail"] = detail
-                return
+    def progress(self, key: str, done: int, total: Optional[int] = None):
+        """Report byte progress for a running step."""
+        if total:
+            detail = f"{_format_size(done)} / {_format_size(total)}"
+        else:
+            detail = _format_size(done)
+        self._update(key, status="running", detail=detail, num_bytes=done)
 
-        self.steps.append(
-            {"key": key, "label": key, "status": status, "detail": detail}
-        )
+    def record(
+        self, key: str, num_bytes: Optional[int] = None, files: Optional[int] = None
+    ):
+        """Record how many bytes and files a step processed."""
+        self._update(key, num_bytes=num_bytes, files=files)
+
+    def _update(
+        self,
+        key: str,
+        status: Optional[str] = None,
+        detail: str = "",
+        num_bytes: Optional[int] = None,
+        files: Optional[int] = None,
+    ):
+        step = self._index.get(key)
+        if step is None:
+            step = self._new_step(key, key)
+        now = time.perf_counter()
+        previous = step["status"]
+        if status == "running":
+            if step["status"] != "running":
+                step["start"], step["end"] = now, None
+        elif status is not None:
+            if step["start"] is None:
+                step["start"] = now
+            step["end"] = now
+        if status is not None:
+            step["status"] = status
+        if detail:
+            step["detail"] = detail
+        if num_bytes is not None:
+            step["bytes"] = num_bytes
+        if files is not None:
+            step["files"] = files
+        if self._emit and status is not None and status != previous:
+            machine.step_event(self, step)
+        if self._refresh_cb:
+            self._refresh_cb()
 
     def render(self):
+        from rich.tree import Tree
+
         tree = Tree(f"[cyan]{self.title}[/cyan]", guide_style="grey50")
         for step in self.steps:
             label = step["label"]
@@ -148,7 +218,12 @@ app = typer.Typer(
 
 
 def show_banner():
-    """Display the ASCII art banner."""
+    """Display the ASCII art banner (not in machine mode)."""
+    if machine.enabled():
+        return
+    from rich.align import Align
+    from rich.text import Text
+
     banner_lines = BANNER.strip().split("\n")
     colors = ["bright_blue", "blue", "cyan", "bright_cyan", "white", "bright_white"]
 
@@ -162,92 +237,407 @@ def show_banner():
     console.print()
 
 
+def fail(message: str, code: int = 1) -> NoReturn:
+    """Report an error (an ``error`` event in machine mode) and exit."""
+    if machine.enabled():
+        machine.emit("error", message=message)
+    else:
+        from rich.markup import escape
+
+        console.print(f"[red]Error:[/red] {escape(message)}")
+    raise typer.Exit(code)
+
+
+def warn(message: str):
+    """Report a warning (a ``warning`` event in machine mode)."""
+    if machine.enabled():
+        machine.emit("warning", message=message)
+    else:
+        console.print(f"[yellow]Warning:[/yellow] {message}")
+
+
+def _json_flag(value: bool) -> bool:
+    return value or machine.requested()
+
+
+def json_option(help: str) -> Any:
+    """A command's --json flag; an explicit global ``d3 --json`` sets it too."""
+    return typer.Option(False, "--json", help=help, callback=_json_flag)
+
+
 @app.callback()
-def callback(ctx: typer.Context):
+def callback(
+    ctx: typer.Context,
+    trace: Optional[Path] = typer.Option(
+        None,
+        "--trace",
+        envvar="D3_TRACE",
+        metavar="FILE",
+        help="Write per-step timings as Chrome trace-event JSON to FILE",
+    ),
+    json_mode: Optional[bool] = typer.Option(
+        None,
+        "--json/--no-json",
+        envvar="D3_JSON",
+        help="Emit NDJSON events instead of Rich output (default: when stdout is not a terminal)",
+    ),
+):
     """Show banner when no subcommand is provided."""
+    machine.configure(json_mode)
+    if trace is not None:
+        from .trace import start_recording
+
+        recorder = start_recording()
+        command = ctx.invoked_subcommand or ""
+        ctx.call_on_close(lambda: recorder.write(trace, command))
     if (
         ctx.invoked_subcommand is None
         and "--help" not in sys.argv
         and "-h" not in sys.argv
+        and not machine.enabled()
     ):
+        from rich.align import Align
+
         show_banner()
         console.print(Align.center("[dim]Run 'd3 --help' for usage information[/dim]"))
         console.print()
 
 
+RELEASES_LATEST_URL = "https://api.github.com/repos/Nom-nom-hub/D3-Kit/releases/latest"
+RELEASES_DOWNLOAD_URL = "https://github.com/Nom-nom-hub/D3-Kit/releases/download"
+# A mirror (or the benchmark's stand-in) serving <url>/latest as release JSON
+# and assets under <url>/download/<tag>/
+RELEASES_URL_ENV = "D3_KIT_RELEASES_URL"
+FALLBACK_RELEASE_VERSION = "v1.0.4"
+# How long a resolved release tag is trusted before asking GitHub again
+VERSION_TTL_SECONDS = 60 * 60
+
+
 def get_latest_release_version() -> str:
-    """Get the latest D3-Kit release version from GitHub."""
+    """Get the latest D3-Kit release version from GitHub.
+
+    The tag is cached in the state file for VERSION_TTL_SECONDS (override with
+    D3_KIT_VERSION_TTL); after that it is revalidated with If-None-Match, which
+    GitHub answers with an empty 304 when nothing changed.
+    """
+    from .cache import read_state, write_state
+
+    state = read_state()
+    cached = state.get("latest_release") or {}
+    ttl = float(os.environ.get("D3_KIT_VERSION_TTL", VERSION_TTL_SECONDS))
+    if cached.get("tag") and time.time() - cached.get("checked_at", 0) < ttl:
+        return cached["tag"]
+
+    headers = {"Accept": "application/vnd.github+json"}
+    if cached.get("tag") and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+
     try:
-        with httpx.Client(follow_redirects=True) as client:
-            response = client.get(
-                "https://api.github.com/repos/Nom-nom-hub/D3-Kit/releases/latest",
-                timeout=10.0,
-            )
+        from .download import get_client
+
+        mirror = os.environ.get(RELEASES_URL_ENV)
+        url = f"{mirror.rstrip('/')}/latest" if mirror else RELEASES_LATEST_URL
+        response = get_client().get(url, headers=headers, timeout=10.0)
+        if response.status_code == 304:
+            tag = cached["tag"]
+        else:
             response.raise_for_status()
-            return response.json()["tag_name"]
+            tag = response.json()["tag_name"]
+            cached["etag"] = response.headers.get("etag")
     except Exception as e:
-        console.print(f"[yellow]Warning:[/yellow] Could not fetch latest release: {e}")
-        return "v1.0.4"
+        if cached.get("tag"):
+            return cached["tag"]
+        warn(f"Could not fetch latest release: {e}")
+        return FALLBACK_RELEASE_VERSION
+
+    cached.update(tag=tag, checked_at=time.time())
+    state["latest_release"] = cached
+    try:
+        write_state(state)
+    except OSError:
+        pass
+    return tag
 
 
 def download_and_extract_template(
     project_path: Path,
-    agent: str,
+    agent: Union[str, list[str]],
     script_type: str,
     tracker: Optional[StepTracker] = None,
     is_current_dir: bool = False,
-) -> bool:
-    """Download and extract the D3-Kit template from GitHub releases."""
-    version = get_latest_release_version()
-    zip_filename = f"d3-kit-template-{agent}-{script_type}-{version}.zip"
-    url = f"https://github.com/Nom-nom-hub/D3-Kit/releases/download/{version}/{zip_filename}"
+    offline: bool = False,
+    cache: Optional["TemplateCache"] = None,
+    dry_run: bool = False,
+    force: bool = False,
+) -> Optional[dict]:
+    """Download and extract the D3-Kit template from GitHub releases.
+
+    Archives are served from the local template cache when possible; a stale
+    entry is revalidated with If-None-Match, and with offline=True no network
+    request is made at all. With is_current_dir the archive is merged into
+    the existing tree (see ``extract_template_archive``). Several agents
+    share one release version; their archives are fetched concurrently and
+    extracted together, so the files they share are written once. Returns
+    the extraction result, or None on failure.
+    """
+    from concurrent.futures import ThreadPoolExecutor
 
-    try:
-        if tracker:
-            tracker.start("download")
+    from .cache import TemplateCache
 
-        with httpx.Client(follow_redirects=True) as client:
-            response = client.get(url, timeout=30.0)
-            response.raise_for_status()
+    cache = cache or TemplateCache()
+    agents = [agent] if isinstance(agent, str) else list(agent)
 
+    step = "version"
+    try:
+        if tracker:
+            tracker.start("version")
+
+        if offline:
+            version = resolve_template_version(agents, script_type, cache, True)
+            with ThreadPoolExecutor(max_workers=len(agents)) as pool:
+                zip_paths = list(
+                    pool.map(
+                        lambda a: offline_template_archive(
+                            a, script_type, version, cache
+                        ),
+                        agents,
+                    )
+                )
             if tracker:
-                tracker.complete("download")
-                tracker.start("extract")
+                tracker.complete("version", version)
+                source = "bundled" if version == "bundled" else "cached"
+                tracker.skip("download", f"{source}, no network")
+        else:
+            version = resolve_template_version(agents, script_type, cache)
 
-            zip_path = project_path.parent / zip_filename
-            with open(zip_path, "wb") as f:
-                f.write(response.content)
+            if tracker:
+                tracker.complete("version", version)
+                step = "download"
+                tracker.start("download")
+
+            # Byte progress is only meaningful for a single download
+            progress_tracker = tracker if len(agents) == 1 else None
+            with ThreadPoolExecutor(max_workers=len(agents)) as pool:
+                zip_paths = list(
+                    pool.map(
+                        lambda a: fetch_template_archive(
+                            a, script_type, version, cache, tracker=progress_tracker
+                        ),
+                        agents,
+                    )
+                )
 
-            # Extract ZIP
-            with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                zip_ref.extractall(str(project_path))
+            if tracker:
+                detail = (
+                    version
+                    if len(agents) == 1
+                    else f"{version}, {len(agents)} archives"
+                )
+                tracker.complete("download", detail)
 
-            # Flatten if extracted into a single subdirectory
-            items = list(project_path.iterdir())
-            if len(items) == 1 and items[0].is_dir():
-                single_dir = items[0]
-                for item in single_dir.iterdir():
-                    shutil.move(str(item), str(project_path / item.name))
-                single_dir.rmdir()
+        if tracker:
+            step = "extract"
+            tracker.start("extract")
+
+        result = extract_template_archive(
+            zip_paths,
+            project_path,
+            tracker=tracker,
+            merge=is_current_dir,
+            dry_run=dry_run,
+            overwrite=force,
+        )
 
-            if tracker:
-                tracker.complete("extract")
-                tracker.start("cleanup")
+        if tracker:
+            step = "cleanup"
+            tracker.start("cleanup")
 
-            # Clean up ZIP
-            if zip_path.exists():
-                zip_path.unlink()
+        # The archive itself stays in the cache for the next init
 
-            if tracker:
-                tracker.complete("cleanup")
+        if tracker:
+            tracker.complete("cleanup")
 
-            return True
+        return result
     except Exception as e:
         if tracker:
-            tracker.error("download", str(e))
+            tracker.error(step, str(e))
+        elif machine.enabled():
+            machine.emit("error", message=f"Error downloading template: {e}")
         else:
             console.print(f"[red]Error downloading template:[/red] {e}")
-        return False
+        return None
+
+
+def resolve_template_version(
+    agent: Union[str, list[str]],
+    script_type: str,
+    cache: "TemplateCache",
+    offline: bool = False,
+) -> str:
+    """Pick the one release every agent is installed from.
+
+    Online that is the latest tag. Offline it is the most recently used
+    release cached for all of the agents, else "bundled" (the templates
+    shipped with d3-kit), so a project is never assembled from mixed
+    releases.
+    """
+    if not offline:
+        return get_latest_release_version()
+    agents = [agent] if isinstance(agent, str) else agent
+    cached = [cache.versions(a, script_type) for a in agents]
+    common = set(cached[0]).intersection(*cached[1:])
+    if common:
+        return max(common, key=lambda v: max(c[v] for c in cached))
+
+    from .bundle import bundle_root
+
+    if bundle_root() is None:
+        raise RuntimeError(
+            f"No template release is cached for all of {', '.join(agents)} "
+            f"({script_type}) and this installation has no bundled templates; "
+            "run once without --offline to populate the cache"
+        )
+    return "bundled"
+
+
+def offline_template_archive(
+    agent: str, script_type: str, version: str, cache: "TemplateCache"
+) -> Path:
+    """The cached archive of version, or one rendered from the bundle."""
+    if version != "bundled":
+        return fetch_template_archive(agent, script_type, version, cache, offline=True)
+    from .bundle import bundled_archive
+
+    return bundled_archive(agent, script_type, cache.root)
+
+
+def extract_template_archive(
+    zip_path: Union[Path, list[Path]],
+    project_path: Path,
+    tracker: Optional[StepTracker] = None,
+    merge: bool = False,
+    dry_run: bool = False,
+    overwrite: bool = False,
+) -> dict:
+    """Extract a template archive into project_path.
+
+    A single top-level wrapper directory is stripped while writing, so each
+    file is written once in its final place. Given several archives (one
+    per agent), members they share are written once. With merge, only new
+    and changed files are written and local edits are kept as conflicts
+    unless overwrite is set. The .d3/ caches are then ignored in git. With a
+    tracker, completes its running "extract" step.
+    """
+    from .extract import extract_archive, merge_archive, save_gitignore
+
+    if not merge:
+        result = extract_archive(zip_path, project_path)
+        detail = f"{result['files']} files"
+        if result["shared"]:
+            detail += f", {result['shared']} shared skipped"
+    else:
+        result = merge_archive(zip_path, project_path, dry_run, overwrite)
+        detail = (
+            f"{len(result['created'])} new, {len(result['updated'])} updated, "
+            f"{len(result['unchanged'])} unchanged, "
+            f"{len(result['conflicts'])} conflicts"
+        )
+        if dry_run:
+            detail = f"plan: {detail}"
+    if not dry_run:
+        save_gitignore(project_path)
+    if tracker:
+        tracker.record("extract", num_bytes=result["bytes"], files=result["files"])
+        tracker.complete("extract", detail)
+    return result
+
+
+def _print_merge_report(result: dict):
+    """Summarize what a merge into an existing directory changed (or would)."""
+    verb = "Would write" if result["dry_run"] else "Wrote"
+    console.print(
+        f"\n{verb} [green]{len(result['created'])} new[/green] and "
+        f"[cyan]{len(result['updated'])} updated[/cyan] file(s); "
+        f"{len(result['unchanged'])} unchanged file(s) left untouched"
+    )
+    if result["dry_run"]:
+        for label, paths in (("new", result["created"]), ("update", result["updated"])):
+            for path in paths[:20]:
+                console.print(f"  [dim]{label:>6}[/dim] {path}")
+            if len(paths) > 20:
+                console.print(f"  [dim]... and {len(paths) - 20} more[/dim]")
+    if result["conflicts"]:
+        console.print(f"[yellow]{len(result['conflicts'])} conflict(s):[/yellow]")
+        for conflict in result["conflicts"]:
+            outcome = "overwritten" if conflict["overwritten"] else "kept"
+            console.print(
+                f"  {conflict['path']} [dim]({conflict['reason']}; {outcome})[/dim]"
+            )
+        if not result["dry_run"] and not any(
+            c["overwritten"] for c in result["conflicts"]
+        ):
+            console.print("[dim]Re-run with --force to replace them[/dim]")
+
+
+def fetch_template_archive(
+    agent: str,
+    script_type: str,
+    version: str,
+    cache: "TemplateCache",
+    offline: bool = False,
+    tracker: Optional[StepTracker] = None,
+) -> Path:
+    """Return a local path to the template archive, downloading only on a cache miss."""
+    import tempfile
+
+    import httpx
+
+    from .download import get_client, stream_download
+
+    entry = cache.lookup(agent, script_type, version)
+    if entry is not None and (offline or cache.is_fresh(entry)):
+        return Path(entry["path"])
+    if offline:
+        raise RuntimeError(f"No cached template for {agent}/{script_type} {version}")
+
+    zip_filename = f"d3-kit-template-{agent}-{script_type}-{version}.zip"
+    mirror = os.environ.get(RELEASES_URL_ENV)
+    base = f"{mirror.rstrip('/')}/download" if mirror else RELEASES_DOWNLOAD_URL
+    url = f"{base}/{version}/{zip_filename}"
+    headers = {}
+    if entry is not None and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+
+    def progress(done: int, total: Optional[int]):
+        if tracker:
+            tracker.progress("download", done, total)
+
+    cache.blobs_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=cache.blobs_dir, suffix=".part")
+    os.close(fd)
+    part_path = Path(tmp_name)
+    finished = False
+    try:
+        result = stream_download(
+            get_client(), url, part_path, headers=headers, progress=progress
+        )
+        finished = True
+    except httpx.HTTPError:
+        # Serve a stale-but-verified archive rather than failing outright
+        if entry is not None:
+            return Path(entry["path"])
+        raise
+    finally:
+        # Resuming happens within stream_download; a partial file left here
+        # (failure, Ctrl-C) would never be picked up again
+        if not finished:
+            part_path.unlink(missing_ok=True)
+
+    if result.not_modified and entry is not None:
+        part_path.unlink()
+        cache.mark_validated(agent, script_type, version)
+        return Path(entry["path"])
+    return cache.store(agent, script_type, version, part_path, result.etag)
 
 
 @app.command()
@@ -258,25 +648,63 @@ def init(
     ai_assistant: Optional[str] = typer.Option(
         None,
         "--ai",
-        help="AI assistant to use (e.g. claude, amp, copilot, cursor-agent)",
+        help="AI assistant(s) to use, comma-separated for several (e.g. claude or claude,copilot,cursor-agent)",
     ),
     script_variant: Optional[str] = typer.Option(
         None, "--script", help="Script variant to use: sh (bash/zsh) or ps (PowerShell)"
     ),
-    force: bool = typer.Option(False, "--force", help="Force merge when using --here"),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        help="With --here, skip confirmation and overwrite conflicting files",
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="With --here, show the merge plan without writing"
+    ),
     here: bool = typer.Option(False, "--here", help="Initialize in current directory"),
+    offline: bool = typer.Option(
+        False,
+        "--offline",
+        help="Use cached templates, or the ones bundled with d3-kit, without network access",
+    ),
+    batch: Optional[Path] = typer.Option(
+        None,
+        "--batch",
+        help="TOML/JSON manifest of projects (name, ai, script) to scaffold concurrently",
+        exists=True,
+        dir_okay=False,
+    ),
 ):
     """
     Initialize a new D3-Kit project from the latest template.
 
     This command will:
     1. Create a new project directory (or use current directory with --here)
-    2. Download the template from GitHub releases
+    2. Download the template from GitHub releases (or reuse the local cache;
+       with --offline, fall back to the templates bundled with d3-kit)
     3. Extract the template files
     4. Show next steps
+
+    With several agents (--ai claude,copilot), their archives are fetched
+    concurrently and the shared .d3/ files are written once, with each
+    agent's own folder (.claude/, .github/, ...) added on top.
+
+    With --batch, every project in the manifest is scaffolded without prompts;
+    --ai and --script then act as defaults for entries that omit them.
     """
 
+    import shutil
+
     show_banner()
+    emit = machine.enabled()
+
+    if batch is not None:
+        if project_name or here:
+            fail("--batch cannot be combined with a project name or --here")
+        if ai_assistant and "," in ai_assistant:
+            fail("--batch takes a single default --ai; list agents per entry")
+        init_batch(batch, ai_assistant, script_variant, offline)
+        return
 
     # Handle project name and path
     if project_name == ".":
@@ -284,36 +712,58 @@ def init(
         project_name = None
 
     if here and project_name:
-        console.print(
-            "[red]Error:[/red] Cannot specify both project name and --here flag"
-        )
-        raise typer.Exit(1)
+        fail("Cannot specify both project name and --here flag")
 
     if not here and not project_name:
-        console.print("[red]Error:[/red] Must specify a project name or use --here")
-        raise typer.Exit(1)
+        fail("Must specify a project name or use --here")
+
+    if dry_run and not here:
+        fail("--dry-run only applies with --here")
+
+    if emit and (ai_assistant is None or script_variant is None):
+        # Menus would be mixed into the event stream (and a piped stdout
+        # turns machine mode on by itself), so take the menus' defaults
+        if script_variant is None:
+            script_variant = list(SCRIPT_TYPE_CHOICES)[
+                1 if sys.platform == "win32" else 0
+            ]
+        if ai_assistant is None:
+            ai_assistant = next(iter(AGENT_CONFIG))
+        warn(
+            f"--ai/--script not given; using --ai {ai_assistant} "
+            f"--script {script_variant}"
+        )
 
     if here:
         project_name = Path.cwd().name
         project_path = Path.cwd()
 
         existing_items = list(project_path.iterdir())
-        if existing_items:
+        if existing_items and not emit:
             console.print(
                 f"[yellow]Warning:[/yellow] Current directory is not empty ({len(existing_items)} items)"
             )
             console.print(
                 "[yellow]Template files will be merged with existing content[/yellow]"
             )
-            if not force:
+            if not force and not dry_run:
                 response = typer.confirm("Do you want to continue?")
                 if not response:
                     console.print("[yellow]Operation cancelled[/yellow]")
                     raise typer.Exit(0)
+        elif existing_items and not force and not dry_run:
+            fail(
+                f"Current directory is not empty ({len(existing_items)} items); "
+                "pass --force to merge into it"
+            )
     else:
         assert project_name is not None
         project_path = Path(project_name).resolve()
         if project_path.exists():
+            if emit:
+                fail(f"Directory '{project_name}' already exists")
+            from rich.panel import Panel
+
             error_panel = Panel(
                 f"Directory '[cyan]{project_name}[/cyan]' already exists\n"
                 "Please choose a different project name or remove the existing directory.",
@@ -343,10 +793,9 @@ def init(
         script_type = script_choices[choice - 1][0]
     else:
         if script_variant not in SCRIPT_TYPE_CHOICES:
-            console.print(
-                f"[red]Error:[/red] Invalid script type '{script_variant}'. Choose from: {', '.join(SCRIPT_TYPE_CHOICES.keys())}"
+            fail(
+                f"Invalid script type '{script_variant}'. Choose from: {', '.join(SCRIPT_TYPE_CHOICES.keys())}"
             )
-            raise typer.Exit(1)
         script_type = script_variant
 
     # Determine AI assistant
@@ -360,58 +809,102 @@ def init(
         if choice < 1 or choice > len(agent_list):
             console.print("[red]Invalid choice[/red]")
             raise typer.Exit(1)
-        ai_assistant = agent_list[choice - 1][0]
+        agents = [agent_list[choice - 1][0]]
     else:
-        if ai_assistant not in AGENT_CONFIG:
-            console.print(
-                f"[red]Error:[/red] Invalid AI assistant '{ai_assistant}'. Choose from: {', '.join(AGENT_CONFIG.keys())}"
+        agents = list(
+            dict.fromkeys(a.strip() for a in ai_assistant.split(",") if a.strip())
+        )
+        unknown = [a for a in agents if a not in AGENT_CONFIG] or (
+            [] if agents else [ai_assistant]
+        )
+        if unknown:
+            fail(
+                f"Invalid AI assistant '{unknown[0]}'. Choose from: {', '.join(AGENT_CONFIG.keys())}"
             )
-            raise typer.Exit(1)
+    ai_label = ", ".join(agents)
+
+    # Initialize tracking
+    tracker = StepTracker("Initialize D3-Kit Project")
+    tracker.add("version", "Resolve version")
+    tracker.add("download", "Download template")
+    tracker.add("extract", "Extract template")
+    tracker.add("cleanup", "Cleanup")
+    tracker.add("final", "Finalize")
+
+    def run() -> Optional[dict]:
+        result = download_and_extract_template(
+            project_path,
+            agents,
+            script_type,
+            tracker=tracker,
+            is_current_dir=here,
+            offline=offline,
+            dry_run=dry_run,
+            force=force,
+        )
+        if not result:
+            if not here and project_path.exists():
+                shutil.rmtree(project_path)
+            tracker.error("final", "download failed")
+        else:
+            tracker.complete("final")
+        return result
+
+    if emit:
+        try:
+            success = run()
+        except Exception as e:
+            if not here and project_path.exists():
+                shutil.rmtree(project_path)
+            fail(f"Initialization failed: {e}")
+        if not success:
+            failed = next((s for s in tracker.steps if s["status"] == "error"), None)
+            fail(failed["detail"] if failed else "Initialization failed")
+        machine.emit(
+            "result",
+            command="init",
+            ok=True,
+            project=project_name,
+            path=str(project_path),
+            ai=",".join(agents),
+            agents=agents,
+            script=script_type,
+            here=here,
+            dry_run=dry_run,
+            extract=success,
+        )
+        return
+
+    from rich.live import Live
+    from rich.panel import Panel
 
     # Show setup info
     setup_lines = [
         "[cyan]D3-Kit Project Setup[/cyan]",
         "",
         f"{'Project':<15} [green]{project_name}[/green]",
-        f"{'AI Assistant':<15} [green]{ai_assistant}[/green]",
+        f"{'AI Assistant':<15} [green]{ai_label}[/green]",
         f"{'Script Type':<15} [green]{script_type}[/green]",
     ]
 
     console.print(Panel("\n".join(setup_lines), border_style="cyan", padding=(1, 2)))
     console.print()
 
-    # Initialize tracking
-    tracker = StepTracker("Initialize D3-Kit Project")
-    tracker.add("download", "Download template")
-    tracker.add("extract", "Extract template")
-    tracker.add("cleanup", "Cleanup")
-    tracker.add("final", "Finalize")
-
     try:
         with Live(
-            tracker.render(), console=console, refresh_per_second=4, transient=True
+            tracker.render(),
+            console=get_console(),
+            refresh_per_second=4,
+            transient=True,
         ) as live:
 
-            def refresh():
-                live.update(tracker.render())
+            tracker.attach_refresh(lambda: live.update(tracker.render()))
 
             # Download and extract
-            success = download_and_extract_template(
-                project_path,
-                ai_assistant,
-                script_type,
-                tracker=tracker,
-                is_current_dir=here,
-            )
-
+            success = run()
             if not success:
-                if not here and project_path.exists():
-                    shutil.rmtree(project_path)
-                tracker.error("final", "download failed")
                 raise typer.Exit(1)
 
-            tracker.complete("final")
-
     except Exception as e:
         console.print(
             Panel(f"Initialization failed: {e}", title="Failure", border_style="red")
@@ -421,6 +914,10 @@ def init(
         raise typer.Exit(1)
 
     console.print(tracker.render())
+    if here:
+        _print_merge_report(success)
+        if dry_run:
+            return
     console.print("\n[bold green]Project ready![/bold green]")
 
     # Show next steps
@@ -429,7 +926,7 @@ def init(
             f"[cyan]1. Go to your project:[/cyan]",
             f"   [bold]cd {project_name}[/bold]",
             "",
-            f"[cyan]2. Open in your {ai_assistant} agent[/cyan]",
+            f"[cyan]2. Open in your {ai_label} agent[/cyan]",
             "",
             f"[cyan]3. Use D3 commands:[/cyan]",
             "   • [bold]/d3.intend[/bold] - Specify features with intent",
@@ -441,7 +938,7 @@ def init(
         next_steps = [
             f"[cyan]1. Project initialized in current directory[/cyan]",
             "",
-            f"[cyan]2. Open this folder in your {ai_assistant} agent[/cyan]",
+            f"[cyan]2. Open this folder in your {ai_label} agent[/cyan]",
             "",
             f"[cyan]3. Use D3 commands:[/cyan]",
             "   • [bold]/d3.intend[/bold] - Specify features with intent",
@@ -457,6 +954,180 @@ def init(
     console.print(next_steps_panel)
 
 
+def init_batch(
+    manifest: Path,
+    default_ai: Optional[str],
+    default_script: Optional[str],
+    offline: bool,
+):
+    """Scaffold every project in a manifest, sharing downloads between them."""
+    from .batch import load_manifest, scaffold_batch
+    from .cache import TemplateCache
+
+    try:
+        entries = load_manifest(manifest, default_ai, default_script)
+    except ValueError as e:
+        fail(str(e))
+
+    for entry in entries:
+        if entry["ai"] not in AGENT_CONFIG:
+            fail(
+                f"Invalid AI assistant '{entry['ai']}' for {entry['project_name']}. "
+                f"Choose from: {', '.join(AGENT_CONFIG.keys())}"
+            )
+        if entry["script"] not in SCRIPT_TYPE_CHOICES:
+            fail(
+                f"Invalid script type '{entry['script']}' for {entry['project_name']}. "
+                f"Choose from: {', '.join(SCRIPT_TYPE_CHOICES.keys())}"
+            )
+
+    cache = TemplateCache()
+    version = None if offline else get_latest_release_version()
+
+    def fetch(agent: str, script_type: str) -> Path:
+        if version is None:
+            resolved = resolve_template_version(agent, script_type, cache, True)
+            return offline_template_archive(agent, script_type, resolved, cache)
+        return fetch_template_archive(agent, script_type, version, cache)
+
+    trackers = []
+    for entry in entries:
+        tracker = StepTracker(
+            f"{entry['project_name']} ({entry['ai']}, {entry['script']})"
+        )
+        tracker.add("download", "Download template")
+        tracker.add("extract", "Extract template")
+        tracker.add("final", "Finalize")
+        trackers.append(tracker)
+    project_paths = [Path(entry["project_name"]).resolve() for entry in entries]
+
+    if machine.enabled():
+        results = scaffold_batch(
+            entries, project_paths, trackers, fetch, extract_template_archive
+        )
+        machine.emit(
+            "result",
+            command="init",
+            ok=all(results),
+            projects=[
+                {"project": e["project_name"], "path": str(p), "ok": bool(ok)}
+                for e, p, ok in zip(entries, project_paths, results)
+            ],
+        )
+        if not all(results):
+            raise typer.Exit(1)
+        return
+
+    from rich.console import Group
+    from rich.live import Live
+
+    def render():
+        return Group(*(tracker.render() for tracker in trackers))
+
+    with Live(
+        render(), console=get_console(), refresh_per_second=4, transient=True
+    ) as live:
+        for tracker in trackers:
+            tracker.attach_refresh(lambda: live.update(render()))
+        results = scaffold_batch(
+            entries, project_paths, trackers, fetch, extract_template_archive
+        )
+
+    console.print(render())
+    failed = [e["project_name"] for e, ok in zip(entries, results) if not ok]
+    console.print(
+        f"\n[bold green]{len(entries) - len(failed)} of {len(entries)} projects ready[/bold green]"
+    )
+    if failed:
+        console.print(f"[red]Failed:[/red] {', '.join(failed)}")
+        raise typer.Exit(1)
+
+
+# --all/--features/--workers/--json, shared by the per-feature commands
+# that can fan out over d3-features/ (see run_feature_batch)
+AllFeatures = Annotated[
+    bool, typer.Option("--all", help="Run for every feature in d3-features/")
+]
+FeaturePattern = Annotated[
+    Optional[str],
+    typer.Option("--features", help="Run for features whose name matches GLOB"),
+]
+BatchWorkers = Annotated[
+    int, typer.Option("--workers", help="Features to process at once", min=1)
+]
+BatchJson = Annotated[
+    bool,
+    typer.Option(
+        "--json",
+        help="Output the combined report as JSON",
+        callback=_json_flag,
+    ),
+]
+
+
+def run_feature_batch(
+    command: str,
+    feature_dir: Optional[str],
+    all_features: bool,
+    pattern: Optional[str],
+    workers: int,
+    json_output: bool,
+) -> bool:
+    """Run command's script over many features for --all/--features.
+
+    Returns False when neither option was given, so the caller handles the
+    single feature itself.
+    """
+    if not all_features and pattern is None:
+        if feature_dir is None:
+            fail("a feature directory is required (or use --all/--features)")
+        return False
+    if feature_dir is not None:
+        fail("--all/--features cannot be combined with a feature")
+
+    import json
+
+    from .fanout import find_script, run_for_features, select_features
+    from .features import find_repo_root
+
+    repo_root = find_repo_root() or Path.cwd()
+    script = find_script(repo_root, command)
+    if script is None:
+        fail(f"no script for '{command}' in {repo_root}")
+    feature_dirs = select_features(repo_root, None if all_features else pattern)
+    if not feature_dirs:
+        fail("no matching feature directories")
+
+    live = not json_output and sys.stderr.isatty()
+
+    def progress(result: dict, done: int, total: int) -> None:
+        if live:
+            sys.stderr.write(
+                f"\r{command}: {done}/{total} ({result['feature_name']})\033[K"
+            )
+            sys.stderr.flush()
+
+    report = run_for_features(
+        command, script, feature_dirs, repo_root, workers=workers, on_result=progress
+    )
+    if live:
+        sys.stderr.write("\r\033[K")
+    if json_output:
+        typer.echo(json.dumps(report))
+    else:
+        for result in report["results"]:
+            if result["status"] == "error":
+                typer.echo(f"  FAILED {result['feature_name']}: {result['message']}")
+        typer.echo(
+            f"{command}: {report['features'] - len(report['failed'])}/"
+            f"{report['features']} feature(s) succeeded in "
+            f"{report['elapsed_seconds']:.2f}s"
+        )
+    if report["failed"]:
+        raise typer.Exit(1)
+    return True
+
+
 @app.command()
 def intend(
     feature_description: str = typer.Argument(
@@ -487,12 +1158,22 @@ def research(
 
 @app.command()
 def data(
-    feature_dir: str = typer.Argument(..., help="Feature directory to process"),
+    feature_dir: Optional[str] = typer.Argument(
+        None, help="Feature directory to process"
+    ),
     data_file: str = typer.Option(
         "data-model.md", "--output", "-o", help="Output data model file"
     ),
+    all_features: AllFeatures = False,
+    pattern: FeaturePattern = None,
+    workers: BatchWorkers = 4,
+    json_output: BatchJson = False,
 ):
     """Generate/update key entities & data models for the feature"""
+    if run_feature_batch(
+        "data", feature_dir, all_features, pattern, workers, json_output
+    ):
+        return
     typer.echo(f"Generating data models for feature: {feature_dir}")
     typer.echo(f"Output file: {data_file}")
     typer.echo("This is a placeholder for the D3-Kit data command.")
@@ -500,12 +1181,22 @@ def data(
 
 @app.command()
 def contracts(
-    feature_dir: str = typer.Argument(..., help="Feature directory to process"),
+    feature_dir: Optional[str] = typer.Argument(
+        None, help="Feature directory to process"
+    ),
     output_dir: str = typer.Option(
         "contracts/", "--output", "-o", help="Output contracts directory"
     ),
+    all_features: AllFeatures = False,
+    pattern: FeaturePattern = None,
+    workers: BatchWorkers = 4,
+    json_output: BatchJson = False,
 ):
     """Generate API/event contracts from the plan"""
+    if run_feature_batch(
+        "contracts", feature_dir, all_features, pattern, workers, json_output
+    ):
+        return
     typer.echo(f"Generating contracts for feature: {feature_dir}")
     typer.echo(f"Output directory: {output_dir}")
     typer.echo("This is a placeholder for the D3-Kit contracts command.")
@@ -513,10 +1204,20 @@ def contracts(
 
 @app.command()
 def plan(
-    feature_dir: str = typer.Argument(..., help="Feature directory to process"),
+    feature_dir: Optional[str] = typer.Argument(
+        None, help="Feature directory to process"
+    ),
     plan_file: str = typer.Option("plan.md", "--output", "-o", help="Output plan file"),
+    all_features: AllFeatures = False,
+    pattern: FeaturePattern = None,
+    workers: BatchWorkers = 4,
+    json_output: BatchJson = False,
 ):
     """Generate implementation plan for a feature based on its spec.md, mapping user stories to technical tasks"""
+    if run_feature_batch(
+        "plan", feature_dir, all_features, pattern, workers, json_output
+    ):
+        return
     typer.echo(f"Generating implementation plan for: {feature_dir}")
     typer.echo(f"Output file: {plan_file}")
     typer.echo("This is a placeholder for the D3-Kit plan command.")
@@ -524,12 +1225,22 @@ def plan(
 
 @app.command()
 def tasks(
-    feature_dir: str = typer.Argument(..., help="Feature directory to process"),
+    feature_dir: Optional[str] = typer.Argument(
+        None, help="Feature directory to process"
+    ),
     tasks_file: str = typer.Option(
         "tasks.md", "--output", "-o", help="Output tasks file"
     ),
+    all_features: AllFeatures = False,
+    pattern: FeaturePattern = None,
+    workers: BatchWorkers = 4,
+    json_output: BatchJson = False,
 ):
     """Generate an executable task list from the implementation plan, with parallelization"""
+    if run_feature_batch(
+        "tasks", feature_dir, all_features, pattern, workers, json_output
+    ):
+        return
     typer.echo(f"Generating tasks for feature: {feature_dir}")
     typer.echo(f"Output file: {tasks_file}")
     typer.echo("This is a placeholder for the D3-Kit tasks command.")
@@ -537,12 +1248,22 @@ def tasks(
 
 @app.command()
 def quickstart(
-    feature_dir: str = typer.Argument(..., help="Feature directory to process"),
+    feature_dir: Optional[str] = typer.Argument(
+        None, help="Feature directory to process"
+    ),
     quickstart_file: str = typer.Option(
         "quickstart.md", "--output", "-o", help="Output quickstart file"
     ),
+    all_features: AllFeatures = False,
+    pattern: FeaturePattern = None,
+    workers: BatchWorkers = 4,
+    json_output: BatchJson = False,
 ):
     """Produce a quickstart/validation guide to verify the feature independently"""
+    if run_feature_batch(
+        "quickstart", feature_dir, all_features, pattern, workers, json_output
+    ):
+        return
     typer.echo(f"Generating quickstart guide for: {feature_dir}")
     typer.echo(f"Output file: {quickstart_file}")
     typer.echo("This is a placeholder for the D3-Kit quickstart command.")
@@ -552,21 +1273,98 @@ def quickstart(
 def implement(
     feature_dir: str = typer.Argument(..., help="Feature directory to process"),
     tasks_file: str = typer.Option("tasks.md", "--tasks", help="Tasks file to execute"),
+    workers: int = typer.Option(
+        4, "--workers", help="Task commands to run concurrently", min=1
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Show the schedule and critical path only"
+    ),
+    rerun: bool = typer.Option(
+        False, "--rerun", help="Also run tasks already checked off in tasks.md"
+    ),
+    json_output: bool = json_option("Output in JSON format"),
 ):
     """Execute all tasks to build the feature according to the plan"""
-    typer.echo(f"Implementing feature: {feature_dir}")
-    typer.echo(f"Using tasks file: {tasks_file}")
-    typer.echo("This is a placeholder for the D3-Kit implement command.")
+    import json
+
+    from .context import resolve_feature_dir
+    from .features import find_repo_root
+    from .journal import RUN_EVENTS, append_events
+    from .tasks import TaskCycleError, load_tasks, plan_summary, run_graph
+
+    repo_root = find_repo_root() or Path.cwd()
+    feature_path = resolve_feature_dir(repo_root, feature_dir)
+    tasks_path = feature_path / tasks_file if feature_path else None
+    if tasks_path is None or not tasks_path.is_file():
+        fail(f"{tasks_file} not found for {feature_dir}")
+
+    graph = load_tasks(tasks_path)
+    try:
+        summary = plan_summary(graph)
+    except TaskCycleError as e:
+        fail(str(e))
+
+    if dry_run:
+        if json_output:
+            typer.echo(json.dumps(summary))
+            return
+        typer.echo(f"{summary['tasks']} task(s), {summary['parallel']} marked [P]")
+        for i, wave in enumerate(summary["waves"], 1):
+            typer.echo(f"  wave {i}: {', '.join(wave)}")
+        typer.echo(f"Critical path: {' -> '.join(summary['critical_path'])}")
+        for tid, refs in summary["missing_dependencies"].items():
+            warn(f"{tid} depends on unknown {', '.join(refs)}")
+        return
+
+    def report(tid: str, status: str, detail: str) -> None:
+        if status in RUN_EVENTS:
+            event = {"task": tid, "event": RUN_EVENTS[status]}
+            if detail:
+                event["note"] = detail
+            append_events(tasks_path.parent, [event])
+        if not json_output:
+            typer.echo(f"[{status}] {tid} {detail}".rstrip())
+
+    result = run_graph(
+        graph,
+        repo_root,
+        workers=workers,
+        on_event=report,
+        skip_done=not rerun,
+    )
+    if json_output:
+        typer.echo(json.dumps(result))
+    else:
+        typer.echo(
+            f"Ran {len(result['durations'])} command(s) in {result['wall_seconds']:.2f}s "
+            f"(serial {result['serial_seconds']:.2f}s, saved "
+            f"{result['saved_seconds']:.2f}s, parallelism {result['parallelism']}x, "
+            f"peak {result['peak_concurrency']})"
+        )
+        if result["critical_path"]:
+            typer.echo(f"Critical path: {' -> '.join(result['critical_path'])}")
+    if result["failed"]:
+        raise typer.Exit(1)
 
 
 @app.command()
 def clarify(
-    feature_dir: str = typer.Argument(..., help="Feature directory to process"),
+    feature_dir: Optional[str] = typer.Argument(
+        None, help="Feature directory to process"
+    ),
     spec_file: str = typer.Option(
         "spec.md", "--spec", help="Specification file to clarify"
     ),
+    all_features: AllFeatures = False,
+    pattern: FeaturePattern = None,
+    workers: BatchWorkers = 4,
+    json_output: BatchJson = False,
 ):
     """Clarify underspecified areas (recommended before /d3.plan)"""
+    if run_feature_batch(
+        "clarify", feature_dir, all_features, pattern, workers, json_output
+    ):
+        return
     typer.echo(f"Clarifying requirements for feature: {feature_dir}")
     typer.echo(f"Using specification file: {spec_file}")
     typer.echo("This is a placeholder for the D3-Kit clarify command.")
@@ -574,21 +1372,80 @@ def clarify(
 
 @app.command()
 def analyze(
-    feature_dir: str = typer.Argument(..., help="Feature directory to process"),
+    feature_dir: Optional[str] = typer.Argument(
+        None,
+        help="Feature directory or name (default: $D3_FEATURE, cwd, or most recent)",
+    ),
+    all_features: bool = typer.Option(
+        False, "--all", help="Analyze every feature in d3-features/"
+    ),
+    workers: int = typer.Option(
+        8, "--workers", help="Worker processes for changed files", min=1
+    ),
+    repo_root: Optional[Path] = typer.Option(
+        None, "--repo-root", help="Repository root (default: detected from cwd)"
+    ),
+    json_output: bool = json_option("Output in JSON format"),
 ):
     """Cross-artifact consistency & coverage analysis"""
-    typer.echo(f"Analyzing feature: {feature_dir}")
-    typer.echo("This is a placeholder for the D3-Kit analyze command.")
+    import json
+
+    from .analyze import Analyzer
+    from .context import resolve_feature_dir
+    from .features import find_repo_root, iter_feature_dirs
+
+    repo_root = repo_root or find_repo_root() or Path.cwd()
+    if all_features:
+        if feature_dir:
+            fail("--all cannot be combined with a feature")
+        feature_dirs = list(iter_feature_dirs(repo_root))
+    else:
+        resolved = resolve_feature_dir(repo_root, feature_dir)
+        if resolved is None:
+            fail("could not determine a feature directory")
+        feature_dirs = [resolved]
+
+    result = Analyzer(repo_root).run(feature_dirs, workers=workers)
+    if json_output:
+        typer.echo(json.dumps(result))
+        return
+
+    for report in result["features"]:
+        coverage = report["coverage"]
+        covered = (
+            f"{coverage:.0%} of {len(report['requirements'])} requirement(s) covered"
+            if coverage is not None
+            else "no requirements found"
+        )
+        typer.echo(f"{report['feature_name']}: {covered}")
+        for issue in report["issues"]:
+            typer.echo(f"  - {issue}")
+    summary, files = result["summary"], result["files"]
+    typer.echo(
+        f"{summary['complete']}/{summary['features']} feature(s) complete, "
+        f"{summary['issues']} issue(s); scanned {files['scanned']} of "
+        f"{files['total']} file(s) in {result['elapsed_seconds']:.2f}s"
+    )
 
 
 @app.command()
 def checklist(
-    feature_dir: str = typer.Argument(..., help="Feature directory to process"),
+    feature_dir: Optional[str] = typer.Argument(
+        None, help="Feature directory to process"
+    ),
     output_file: str = typer.Option(
         "checklist.md", "--output", "-o", help="Output checklist file"
     ),
+    all_features: AllFeatures = False,
+    pattern: FeaturePattern = None,
+    workers: BatchWorkers = 4,
+    json_output: BatchJson = False,
 ):
     """Generate custom quality checklists"""
+    if run_feature_batch(
+        "checklist", feature_dir, all_features, pattern, workers, json_output
+    ):
+        return
     typer.echo(f"Generating checklist for feature: {feature_dir}")
     typer.echo(f"Output file: {output_file}")
     typer.echo("This is a placeholder for the D3-Kit checklist command.")
@@ -607,9 +1464,617 @@ def constitution(
     typer.echo("This is a placeholder for the D3-Kit constitution command.")
 
 
+@app.command()
+def taskstoissues(
+    feature_dir: Optional[str] = typer.Argument(
+        None,
+        help="Feature directory or name (default: $D3_FEATURE, cwd, or most recent)",
+    ),
+    repo: Optional[str] = typer.Option(
+        None, "--repo", help="GitHub repository as owner/name (default: origin)"
+    ),
+    api_url: str = typer.Option(
+        "https://api.github.com",
+        "--api-url",
+        envvar="D3_GITHUB_API_URL",
+        help="Issues API base URL (e.g. GitHub Enterprise or a local mock)",
+    ),
+    concurrency: int = typer.Option(
+        4, "--concurrency", help="Maximum requests in flight", min=1
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Show what would be created or updated"
+    ),
+    repo_root: Optional[Path] = typer.Option(
+        None, "--repo-root", help="Repository root (default: detected from cwd)"
+    ),
+    json_output: bool = json_option("Output in JSON format"),
+):
+    """Create or update one GitHub issue per task"""
+    import json
+
+    import httpx
+
+    from .context import resolve_feature_dir
+    from .features import find_repo_root
+    from .issues import IssueSync, IssueSyncError, detect_repo, detect_token
+
+    repo_root = repo_root or find_repo_root() or Path.cwd()
+    resolved = resolve_feature_dir(repo_root, feature_dir)
+    if resolved is None or not (resolved / "tasks.md").is_file():
+        fail("could not find a feature with tasks.md")
+    repo = repo or detect_repo(repo_root)
+    if not repo:
+        fail("pass --repo owner/name (origin is not on GitHub)")
+    token = detect_token()
+    if token is None and not dry_run:
+        fail("set GITHUB_TOKEN or log in with 'gh auth login'")
+
+    def on_event(task_id: str, status: str, detail: str):
+        if not json_output:
+            typer.echo(f"  {task_id}: {status} {detail}")
+
+    sync = IssueSync(resolved, repo, token, api_url, concurrency, on_event=on_event)
+    try:
+        result = sync.run(dry_run=dry_run)
+    except (IssueSyncError, httpx.HTTPError) as e:
+        fail(str(e))
+
+    if json_output:
+        typer.echo(json.dumps(result))
+    else:
+        if dry_run:
+            for task_id, status in result["outcome"].items():
+                typer.echo(f"  {task_id}: {status}")
+        counts = ", ".join(f"{n} {s}" for s, n in sorted(result["counts"].items()))
+        typer.echo(f"{repo}: {counts or 'no tasks'}")
+        if result["rate_limit_wait_seconds"]:
+            typer.echo(
+                f"Waited {result['rate_limit_wait_seconds']:.1f}s for the rate limit"
+            )
+    if result["failed"]:
+        raise typer.Exit(1)
+
+
+@app.command()
+def context(
+    feature: Optional[str] = typer.Argument(
+        None,
+        help="Feature directory or name (default: $D3_FEATURE, cwd, or most recent)",
+    ),
+    context_file: str = typer.Option(
+        ".d3-context.md",
+        "--context-file",
+        help="Context file, relative to the repo root",
+    ),
+    max_bytes: Optional[int] = typer.Option(
+        None, "--max-bytes", help="Trim lowest-priority sections to fit this size"
+    ),
+    max_tokens: Optional[int] = typer.Option(
+        None, "--max-tokens", help="Approximate token budget (4 bytes per token)"
+    ),
+    force: bool = typer.Option(False, "--force", help="Rewrite even if unchanged"),
+    all_features: bool = typer.Option(
+        False, "--all", help="Summarize every feature in d3-features/ into one file"
+    ),
+    workers: int = typer.Option(
+        8, "--workers", help="Parallel readers for --all", min=1
+    ),
+    repo_root: Optional[Path] = typer.Option(
+        None, "--repo-root", help="Repository root (default: detected from cwd)"
+    ),
+    json_output: bool = json_option("Output in JSON format"),
+):
+    """Update the agent context file from a feature's artifacts, incrementally"""
+    import json
+
+    from .context import (
+        BYTES_PER_TOKEN,
+        ContextBuilder,
+        resolve_feature_dir,
+        write_project_context,
+    )
+    from .features import find_repo_root
+
+    repo_root = repo_root or find_repo_root() or Path.cwd()
+    if max_tokens is not None:
+        token_bytes = max_tokens * BYTES_PER_TOKEN
+        max_bytes = token_bytes if max_bytes is None else min(max_bytes, token_bytes)
+
+    if all_features:
+        if feature:
+            fail("--all cannot be combined with a feature")
+        summary = write_project_context(
+            repo_root, repo_root / context_file, max_bytes=max_bytes, workers=workers
+        )
+        if json_output:
+            typer.echo(json.dumps(summary))
+        else:
+            typer.echo(f"Context file updated: {summary['context_file']}")
+            typer.echo(
+                f"Included {len(summary['included'])} of {summary['features']} feature(s)"
+            )
+            if summary["omitted"]:
+                typer.echo(f"Omitted to fit budget: {len(summary['omitted'])}")
+        return
+
+    feature_dir = resolve_feature_dir(repo_root, feature)
+    if feature_dir is None or not (feature_dir / "spec.md").is_file():
+        fail(
+            "could not determine a feature directory with spec.md; "
+            "set D3_FEATURE or pass a feature directory"
+        )
+
+    builder = ContextBuilder(repo_root, feature_dir, repo_root / context_file)
+    result = builder.build(max_bytes=max_bytes, force=force)
+
+    if json_output:
+        typer.echo(json.dumps(result))
+    else:
+        status = "updated" if result["written"] else "unchanged"
+        typer.echo(f"Context file {status}: {result['context_file']}")
+        typer.echo(
+            f"Rendered {len(result['rendered'])} source(s), reused {len(result['reused'])}"
+        )
+        if result["trimmed"]:
+            typer.echo(f"Trimmed to fit budget: {', '.join(result['trimmed'])}")
+
+
+@app.command()
+def search(
+    query: list[str] = typer.Argument(..., help="Words to search for"),
+    feature: Optional[str] = typer.Option(
+        None, "--feature", "-f", help="Only search features whose name matches GLOB"
+    ),
+    limit: int = typer.Option(20, "--limit", "-n", help="Maximum hits", min=1),
+    raw: bool = typer.Option(
+        False, "--raw", help="Pass the query to SQLite FTS5 unchanged"
+    ),
+    reindex: bool = typer.Option(
+        False, "--reindex", help="Rebuild the search index from scratch"
+    ),
+    repo_root: Optional[Path] = typer.Option(
+        None, "--repo-root", help="Repository root (default: detected from cwd)"
+    ),
+    json_output: bool = json_option("Output in JSON format"),
+):
+    """Search feature artifacts section by section, using a local index"""
+    import json
+
+    from .features import find_repo_root
+    from .search import SearchError, SearchIndex
+
+    start = time.perf_counter()
+    repo_root = (repo_root or find_repo_root() or Path.cwd()).resolve()
+    index = SearchIndex(repo_root)
+    try:
+        indexed = index.update(rebuild=reindex)
+        hits = index.search(" ".join(query), limit=limit, feature=feature, raw=raw)
+    except SearchError as e:
+        fail(str(e))
+    finally:
+        index.close()
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    if json_output:
+        typer.echo(
+            json.dumps({"hits": hits, "index": indexed, "elapsed_ms": elapsed_ms})
+        )
+        return
+    for hit in hits:
+        location = f"{hit['path']}:{hit['line']}"
+        typer.echo(f"{location}  {hit['heading']}".rstrip())
+        snippet = " ".join(hit["snippet"].split())
+        if snippet:
+            typer.echo(f"    {snippet}")
+    typer.echo(
+        f"{len(hits)} hit(s) in {elapsed_ms:.1f} ms "
+        f"({indexed['files']} file(s) indexed, {indexed['indexed']} updated, "
+        f"{indexed['removed']} removed)"
+    )
+    if not hits:
+        raise typer.Exit(1)
+
+
+@app.command()
+def journal(
+    task: str = typer.Argument(..., help="Task ID from tasks.md (e.g. ID-003)"),
+    event: str = typer.Argument(
+        ..., help="Event: start, finish, fail, block or unblock"
+    ),
+    feature: Optional[str] = typer.Option(
+        None,
+        "--feature",
+        "-f",
+        help="Feature directory or name (default: $D3_FEATURE, cwd, or most recent)",
+    ),
+    note: Optional[str] = typer.Option(None, "--note", help="Reason or detail"),
+    repo_root: Optional[Path] = typer.Option(
+        None, "--repo-root", help="Repository root (default: detected from cwd)"
+    ),
+    json_output: bool = json_option("Output in JSON format"),
+):
+    """Record task progress in the feature's append-only journal"""
+    import json
+
+    from .context import resolve_feature_dir
+    from .features import find_repo_root
+    from .journal import EVENTS, JOURNAL_FILENAME, append_event
+    from .tasks import load_tasks
+
+    if event not in EVENTS:
+        fail(f"unknown event '{event}' (choose from {', '.join(EVENTS)})")
+    repo_root = repo_root or find_repo_root() or Path.cwd()
+    feature_dir = resolve_feature_dir(repo_root, feature)
+    if feature_dir is None:
+        fail("could not determine a feature directory")
+    tasks_path = feature_dir / "tasks.md"
+    if tasks_path.is_file() and task not in load_tasks(tasks_path).tasks:
+        fail(f"{task} is not a task in {tasks_path}")
+
+    record = append_event(feature_dir, task, event, note)
+    if json_output:
+        typer.echo(json.dumps(dict(record, feature_dir=str(feature_dir))))
+    else:
+        typer.echo(f"{feature_dir.name}/{JOURNAL_FILENAME}: {task} {event}")
+
+
+@app.command()
+def status(
+    pattern: Optional[str] = typer.Option(
+        None, "--features", help="Only features whose name matches GLOB"
+    ),
+    days: int = typer.Option(
+        14, "--days", help="Days of throughput history to show", min=1
+    ),
+    repo_root: Optional[Path] = typer.Option(
+        None, "--repo-root", help="Repository root (default: detected from cwd)"
+    ),
+    json_output: bool = json_option("Output in JSON format"),
+):
+    """Progress rollup across features from their task journals"""
+    import json
+
+    from .fanout import select_features
+    from .features import find_repo_root
+    from .journal import StatusTracker, rollup
+
+    start = time.perf_counter()
+    repo_root = repo_root or find_repo_root() or Path.cwd()
+    entries = StatusTracker(repo_root).update(select_features(repo_root, pattern))
+    result = rollup(entries, days=days)
+    result["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    if json_output:
+        typer.echo(json.dumps(result))
+        return
+
+    for feature in result["features"]:
+        if not feature["tasks"]:
+            continue
+        counts = feature["counts"]
+        typer.echo(
+            f"{feature['feature_name']}: {feature['percent_done']:.0f}% done "
+            f"({counts.get('done', 0)}/{feature['tasks']}), "
+            f"{counts.get('in_progress', 0)} in progress, "
+            f"{len(feature['blocked'])} blocked"
+        )
+        for blocked in feature["blocked"]:
+            note = f" - {blocked['note']}" if blocked["note"] else ""
+            typer.echo(f"  blocked: {blocked['task']}{note}")
+    summary = result["summary"]
+    done = summary["percent_done"]
+    typer.echo(
+        f"{summary['features']} feature(s), {summary['tasks']} task(s), "
+        f"{'n/a' if done is None else f'{done:.0f}%'} done, "
+        f"{summary['blocked']} blocked"
+    )
+    throughput = result["throughput"]
+    typer.echo(
+        f"Finished per day (last {days}): "
+        + " ".join(str(count) for count in throughput.values())
+        + f"  [{sum(throughput.values())} total]"
+    )
+
+
+@app.command()
+def build(
+    feature_dir: Optional[str] = typer.Argument(
+        None,
+        help="Feature directory or name (default: $D3_FEATURE, cwd, or most recent)",
+    ),
+    all_features: bool = typer.Option(
+        False, "--all", help="Build every feature in d3-features/"
+    ),
+    pattern: Optional[str] = typer.Option(
+        None, "--features", help="Build features whose name matches GLOB"
+    ),
+    explain: bool = typer.Option(
+        False, "--explain", help="Show why each step ran or was skipped"
+    ),
+    force: bool = typer.Option(
+        False, "--force", help="Rerun every step, overwriting edited outputs"
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Report stale steps without running them"
+    ),
+    workers: int = typer.Option(4, "--workers", help="Steps to run at once", min=1),
+    repo_root: Optional[Path] = typer.Option(
+        None, "--repo-root", help="Repository root (default: detected from cwd)"
+    ),
+    json_output: bool = json_option("Output in JSON format"),
+):
+    """Regenerate only the out-of-date artifacts of features"""
+    import json
+
+    from .build import Builder
+    from .context import resolve_feature_dir
+    from .fanout import select_features
+    from .features import find_repo_root
+
+    repo_root = (repo_root or find_repo_root() or Path.cwd()).resolve()
+    if all_features or pattern is not None:
+        if feature_dir:
+            fail("--all/--features cannot be combined with a feature")
+        feature_dirs = select_features(repo_root, None if all_features else pattern)
+    else:
+        resolved = resolve_feature_dir(repo_root, feature_dir)
+        if resolved is None:
+            fail("could not determine a feature directory")
+        feature_dirs = [resolved]
+    if not feature_dirs:
+        fail("no matching feature directories")
+
+    result = Builder(repo_root).run(
+        feature_dirs, workers=workers, force=force, dry_run=dry_run
+    )
+    if json_output:
+        typer.echo(json.dumps(result))
+    else:
+        for outcome in result["steps"]:
+            # Features without a spec yet show up as missing/blocked
+            quiet = outcome["action"] in ("fresh", "adopted", "missing", "blocked")
+            if quiet and not explain:
+                continue
+            reasons = "; ".join(outcome["reasons"])
+            line = f"{outcome['action']:>8} {outcome['step']}"
+            if reasons and (explain or outcome["action"] != "rebuilt"):
+                line += f": {reasons}"
+            typer.echo(line)
+        counts = result["counts"]
+        summary = ", ".join(f"{n} {action}" for action, n in sorted(counts.items()))
+        typer.echo(
+            f"{len(result['steps'])} step(s) in {result['features']} feature(s): "
+            f"{summary} ({result['elapsed_seconds']:.2f}s)"
+        )
+    if result["failed"]:
+        raise typer.Exit(1)
+
+
+@app.command()
+def watch(
+    feature: Optional[str] = typer.Argument(
+        None,
+        help="Pin the context file to this feature (default: the last one edited)",
+    ),
+    context_file: str = typer.Option(
+        ".d3-context.md",
+        "--context-file",
+        help="Context file, relative to the repo root",
+    ),
+    max_bytes: Optional[int] = typer.Option(
+        None, "--max-bytes", help="Trim lowest-priority context sections to fit"
+    ),
+    debounce_ms: int = typer.Option(
+        300, "--debounce", help="Quiet period in ms before a batch is processed"
+    ),
+    poll: bool = typer.Option(
+        False, "--poll", help="Poll with stat() instead of native file events"
+    ),
+    interval: float = typer.Option(
+        0.5, "--interval", help="Polling interval in seconds"
+    ),
+    repo_root: Optional[Path] = typer.Option(
+        None, "--repo-root", help="Repository root (default: detected from cwd)"
+    ),
+    json_output: bool = json_option("Print one JSON object per batch"),
+):
+    """Watch d3-features/ and refresh context and analysis on every change"""
+    import json
+
+    from .context import resolve_feature_dir
+    from .features import find_repo_root
+    from .watch import ArtifactWatcher
+
+    repo_root = (repo_root or find_repo_root() or Path.cwd()).resolve()
+    pinned = None
+    if feature:
+        pinned = resolve_feature_dir(repo_root, feature)
+        if pinned is None:
+            fail(f"feature not found: {feature}")
+
+    watcher = ArtifactWatcher(
+        repo_root, repo_root / context_file, feature=pinned, max_bytes=max_bytes
+    )
+    batches = watcher.changes(
+        debounce=debounce_ms / 1000, polling=poll, interval=interval
+    )
+    primed = watcher.prime()
+    if json_output:
+        typer.echo(json.dumps(dict(primed, event="ready", backend=watcher.backend)))
+    else:
+        typer.echo(
+            f"Watching {watcher.features_dir} ({watcher.backend}), "
+            f"{primed['features']} feature(s) analyzed. Press Ctrl+C to stop."
+        )
+
+    try:
+        for paths in batches:
+            event = watcher.handle(paths)
+            if event is None:
+                continue
+            if json_output:
+                typer.echo(json.dumps(dict(event, event="batch")))
+                continue
+            for name, analysis in event["analysis"].items():
+                issues = analysis["issues"]
+                typer.echo(
+                    f"[{event['time']}] {name}: "
+                    + (f"{len(issues)} issue(s)" if issues else "no issues")
+                )
+                for issue in issues:
+                    typer.echo(f"    - {issue}")
+            for name in event["removed"]:
+                typer.echo(f"[{event['time']}] {name}: removed")
+            context = event["context"]
+            if context and context["written"]:
+                rendered = ", ".join(context["rendered"])
+                typer.echo(
+                    f"[{event['time']}] context updated"
+                    + (f" ({rendered})" if rendered else "")
+                )
+    except KeyboardInterrupt:
+        pass
+    if not json_output:
+        typer.echo("Stopped watching.")
+
+
+@app.command("render-template")
+def render_template(
+    name: str = typer.Argument(
+        ..., help="Template file name, e.g. d3-spec-template.md"
+    ),
+    values: list[str] = typer.Option(
+        [], "--set", help="Placeholder value as KEY=VALUE (repeatable)"
+    ),
+    body_only: bool = typer.Option(
+        False, "--body-only", help="Drop the YAML frontmatter"
+    ),
+    output: Optional[Path] = typer.Option(
+        None, "--output", "-o", help="Write to this file instead of stdout"
+    ),
+    repo_root: Optional[Path] = typer.Option(
+        None, "--repo-root", help="Repository root (default: detected from cwd)"
+    ),
+):
+    """Render a D3 template with placeholder values"""
+    from .features import find_repo_root
+    from .templates import get_index
+    from .utils import atomic_write_text
+
+    mapping = {}
+    for item in values:
+        key, sep, value = item.partition("=")
+        if not sep:
+            fail(f"--set expects KEY=VALUE, got '{item}'")
+        mapping[key.strip("{}")] = value
+
+    root = repo_root or find_repo_root() or Path.cwd()
+    try:
+        template = get_index(root).get(name)
+    except FileNotFoundError as e:
+        fail(str(e))
+    rendered = template.render(mapping, body_only=body_only)
+    if output:
+        atomic_write_text(output, rendered)
+    else:
+        typer.echo(rendered, nl=False)
+
+
+@app.command()
+def bench(
+    runs: int = typer.Option(5, "--runs", help="Samples per metric", min=1),
+    files: int = typer.Option(
+        200, "--files", help="Files in the synthetic template archive", min=1
+    ),
+    archive_kb: int = typer.Option(
+        2048, "--archive-kb", help="Uncompressed size of the synthetic archive", min=1
+    ),
+    features: int = typer.Option(
+        50, "--features", help="Features in the generated repository", min=1
+    ),
+    only: Optional[str] = typer.Option(
+        None, "--only", help="Comma-separated groups: init, phases, startup, scripts"
+    ),
+    output: Optional[Path] = typer.Option(
+        None, "--output", "-o", help="Write the JSON results to this file"
+    ),
+    compare: Optional[Path] = typer.Option(
+        None,
+        "--compare",
+        help="Baseline results file; exit 1 when a median regressed",
+        exists=True,
+        dir_okay=False,
+    ),
+    tolerance: float = typer.Option(
+        0.2, "--tolerance", help="Median slowdown allowed by --compare (0.2 = 20%)"
+    ),
+    json_output: bool = json_option("Output in JSON format"),
+):
+    """Benchmark init, template extraction, startup and script workflows"""
+    import json
+
+    from .bench import SUITE_GROUPS, compare_results, run_suite
+    from .utils import atomic_write_text
+
+    groups = [g.strip() for g in only.split(",")] if only else list(SUITE_GROUPS)
+    unknown = [g for g in groups if g not in SUITE_GROUPS]
+    if unknown:
+        fail(
+            f"unknown group(s) {', '.join(unknown)}; "
+            f"choose from {', '.join(SUITE_GROUPS)}"
+        )
+
+    results = run_suite(runs, files, archive_kb * 1024, features, groups)
+    if output:
+        atomic_write_text(output, json.dumps(results, indent=2))
+    if json_output:
+        typer.echo(json.dumps(results))
+    else:
+        for name, stats in results["metrics"].items():
+            typer.echo(
+                f"{name:<40} p50 {stats['p50']:>9.1f} ms   "
+                f"p90 {stats['p90']:>9.1f} ms   max {stats['max']:>9.1f} ms"
+            )
+
+    if compare:
+        baseline = json.loads(compare.read_text(encoding="utf-8"))
+        regressions = compare_results(baseline, results, tolerance)
+        for regression in regressions:
+            typer.echo(f"REGRESSION: {regression}", err=True)
+        if regressions:
+            raise typer.Exit(1)
+
+
+@app.command("feature-number")
+def feature_number(
+    repo_root: Optional[Path] = typer.Option(
+        None, "--repo-root", help="Repository root (default: detected from cwd)"
+    ),
+    peek: bool = typer.Option(
+        False, "--peek", help="Print the highest number in use without allocating"
+    ),
+):
+    """Atomically allocate the next feature number (used by create-new-feature)"""
+    from .features import FeatureAllocator, find_repo_root
+
+    root = repo_root or find_repo_root()
+    if root is None:
+        fail("could not determine repository root")
+    allocator = FeatureAllocator(root)
+    typer.echo(allocator.highest() if peek else allocator.allocate())
+
+
 @app.command()
 def check():
     """Check for installed tools and D3-Kit setup"""
+    if machine.enabled():
+        machine.emit(
+            "result",
+            command="check",
+            ok=True,
+            message="This is a placeholder for the D3-Kit check command.",
+        )
+        return
     show_banner()
     console.print("[bold]Checking D3-Kit installation...[/bold]\n")
     typer.echo("This is a placeholder for the D3-Kit check command.")
@@ -0,0 +1,406 @@
+"""Incremental agent-context builder.
+
+Python counterpart of ``scripts/bash/update-agent-context.sh``. The context
+file is assembled from the feature's spec, plan, data model, quickstart,
+tasks and contracts. Each source file is a cache unit remembered in
+``.d3/context-cache.json`` with its mtime, size, SHA-256 and rendered text:
+unchanged files are not even read, and the output is written atomically in
+one pass only when some unit actually changed.
+
+``write_project_context`` instead packs a short summary of every feature
+(``d3 context --all``) into one file under a size budget.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from .utils import atomic_write_text
+
+DEFAULT_CONTEXT_FILE = ".d3-context.md"
+CACHE_FILENAME = "context-cache.json"
+# Rough conversion used for --max-tokens budgets
+BYTES_PER_TOKEN = 4
+
+HEADER = "# D3 Feature Context\n\nAuto-generated from feature specifications. Last updated: {timestamp}\n\n"
+FOOTER = "\n<!-- AUTO-GENERATED CONTENT - DO NOT EDIT MANUALLY -->\n"
+TRUNCATION_NOTE = "\n\n*[... truncated to fit the context budget]*\n\n"
+
+# (key, heading, file, priority); lower priority is trimmed first
+SECTIONS = [
+    ("spec", "Feature Specification", "spec.md", 100),
+    ("plan", "Implementation Plan", "plan.md", 90),
+    ("data-model", "Data Model", "data-model.md", 70),
+    ("quickstart", "Quickstart Guide", "quickstart.md", 50),
+    ("tasks", "Task List", "tasks.md", 80),
+    ("contracts", "API Contracts", "contracts", 60),
+]
+
+
+def _read_text(path: Path) -> str:
+    return path.read_text(encoding="utf-8", errors="replace")
+
+
+def _truncate(text: str, max_bytes: int) -> str:
+    """Cut text to at most max_bytes (UTF-8), ending on a line boundary."""
+    keep = max(max_bytes - len(TRUNCATION_NOTE), 0)
+    cut = text.encode("utf-8")[:keep].decode("utf-8", errors="ignore")
+    if "\n" in cut:
+        cut = cut[: cut.rindex("\n")]
+    return cut + TRUNCATION_NOTE if cut else ""
+
+
+class ContextBuilder:
+    """Build a feature's agent context file, re-rendering only changed sources."""
+
+    def __init__(
+        self,
+        repo_root: Path,
+        feature_dir: Path,
+        context_path: Optional[Path] = None,
+        cache_path: Optional[Path] = None,
+    ):
+        self.repo_root = repo_root
+        self.feature_dir = feature_dir
+        self.context_path = context_path or repo_root / DEFAULT_CONTEXT_FILE
+        self.cache_path = cache_path or repo_root / ".d3" / CACHE_FILENAME
+        self._cache_data: Optional[dict[str, Any]] = None
+
+    def _units(self) -> list[tuple[str, str, Path]]:
+        """List (section, unit, path) for every source file that exists."""
+        units = []
+        for key, _, filename, _ in SECTIONS:
+            path = self.feature_dir / filename
+            if key == "contracts":
+                if path.is_dir():
+                    for contract in sorted(path.glob("*.md")):
+                        units.append((key, f"contracts/{contract.name}", contract))
+            elif path.is_file():
+                units.append((key, filename, path))
+        return units
+
+    def _read_cache_file(self) -> dict[str, Any]:
+        """Load the cache file once; a long-lived builder keeps it in memory."""
+        if self._cache_data is None:
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            self._cache_data = data if isinstance(data, dict) else {}
+        return self._cache_data
+
+    def _load_cache(self) -> dict[str, Any]:
+        entry = self._read_cache_file().get(str(self.context_path))
+        if not entry or entry.get("feature_dir") != str(self.feature_dir):
+            return {"units": {}}
+        return entry
+
+    def _save_cache(self, entry: dict[str, Any]):
+        data = self._read_cache_file()
+        data[str(self.context_path)] = entry
+        atomic_write_text(self.cache_path, json.dumps(data))
+
+    @staticmethod
+    def _render_unit(section: str, path: Path, content: str) -> str:
+        if section == "contracts":
+            return f"### {path.stem}\n\n{content}\n\n"
+        return f"{content}\n\n"
+
+    def build(
+        self, max_bytes: Optional[int] = None, force: bool = False
+    ) -> dict[str, Any]:
+        """Refresh the context file and return what was reused, rendered and trimmed."""
+        cache = self._load_cache()
+        cached_units: dict[str, Any] = cache.get("units", {})
+        units: dict[str, Any] = {}
+        rendered: list[str] = []
+        reused: list[str] = []
+
+        for section, unit, path in self._units():
+            stat = path.stat()
+            previous = cached_units.get(unit)
+            if (
+                previous is not None
+                and previous["mtime_ns"] == stat.st_mtime_ns
+                and previous["size"] == stat.st_size
+            ):
+                units[unit] = previous
+                reused.append(unit)
+                continue
+
+            content = _read_text(path)
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            if previous is not None and previous["sha256"] == digest:
+                units[unit] = dict(
+                    previous, mtime_ns=stat.st_mtime_ns, size=stat.st_size
+                )
+                reused.append(unit)
+                continue
+
+            units[unit] = {
+                "section": section,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": digest,
+                "text": self._render_unit(section, path, content),
+            }
+            rendered.append(unit)
+
+        unchanged = (
+            not rendered
+            and set(units) == set(cached_units)
+            and cache.get("max_bytes") == max_bytes
+            and self.context_path.exists()
+        )
+        result: dict[str, Any] = {
+            "context_file": str(self.context_path),
+            "feature_dir": str(self.feature_dir),
+            "rendered": rendered,
+            "reused": reused,
+            "trimmed": [],
+            "written": False,
+        }
+        if unchanged and not force:
+            if cache.get("units") != units:
+                self._save_cache(dict(cache, units=units))
+            result["trimmed"] = cache.get("trimmed", [])
+            return result
+
+        sections = self._assemble(units)
+        header = HEADER.format(timestamp=time.strftime("%Y-%m-%d %H:%M:%S"))
+        if max_bytes is not None:
+            fixed = len(header.encode("utf-8")) + len(FOOTER.encode("utf-8"))
+            result["trimmed"] = self._trim(sections, max_bytes - fixed)
+
+        buffer = [header]
+        buffer.extend(text for _, text, _ in sections if text)
+        buffer.append(FOOTER)
+        atomic_write_text(self.context_path, "".join(buffer))
+
+        self._save_cache(
+            {
+                "feature_dir": str(self.feature_dir),
+                "max_bytes": max_bytes,
+                "trimmed": result["trimmed"],
+                "units": units,
+            }
+        )
+        result["written"] = True
+        return result
+
+    @staticmethod
+    def _assemble(units: dict[str, Any]) -> list[list[Any]]:
+        """Group unit texts into [section, text, priority] in document order."""
+        sections = []
+        for key, heading, _, priority in SECTIONS:
+            parts = [u["text"] for u in units.values() if u["section"] == key]
+            if parts:
+                sections.append([key, f"## {heading}\n\n" + "".join(parts), priority])
+        return sections
+
+    @staticmethod
+    def _trim(sections: list[list[Any]], budget: int) -> list[str]:
+        """Drop or truncate the lowest-priority sections until they fit budget."""
+        total = sum(len(text.encode("utf-8")) for _, text, _ in sections)
+        trimmed = []
+        for section in sorted(sections, key=lambda s: s[2]):
+            excess = total - budget
+            if excess <= 0:
+                break
+            size = len(section[1].encode("utf-8"))
+            if size <= excess:
+                section[1] = ""
+                total -= size
+            else:
+                section[1] = _truncate(section[1], size - excess)
+                total -= size - len(section[1].encode("utf-8"))
+            trimmed.append(section[0])
+        return trimmed
+
+
+def resolve_feature_dir(
+    repo_root: Path, feature: Optional[str] = None
+) -> Optional[Path]:
+    """Pick the feature directory the same way update-agent-context.sh does.
+
+    An explicit path or name wins, then ``$D3_FEATURE``, then the current
+    directory if it holds a spec.md, then the most recently modified feature.
+    """
+    from .features import iter_feature_dirs
+
+    if feature:
+        path = Path(feature)
+        if not path.is_dir():
+            path = repo_root / "d3-features" / feature
+        return path.resolve() if path.is_dir() else None
+
+    env_feature = os.environ.get("D3_FEATURE")
+    if env_feature:
+        path = repo_root / "d3-features" / env_feature
+        return path if path.is_dir() else None
+
+    if (Path.cwd() / "spec.md").is_file():
+        return Path.cwd()
+
+    features = list(iter_feature_dirs(repo_root))
+    if not features:
+        return None
+    return max(features, key=lambda p: p.stat().st_mtime)
+
+
+# Project-wide context pack (d3 context --all)
+
+SUMMARY_ITEM_LIMIT = 10
+SUMMARY_LINE_LIMIT = 200
+# Bytes kept free for the list of features that did not fit
+OMITTED_NOTE_RESERVE = 512
+PROJECT_HEADER = "# D3 Project Context\n\nSummary of {count} feature(s). Last updated: {timestamp}\n\n"
+CLARIFICATION_MARKER = "[NEEDS CLARIFICATION:"
+_STORY_HEADINGS = ("user scenario", "user stor")
+
+
+def _iter_lines(path: Path) -> Iterator[str]:
+    """Yield lines of path lazily; missing files yield nothing."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                yield line.rstrip("\n")
+    except OSError:
+        return
+
+
+def _clip(text: str, limit: int) -> str:
+    """Shorten text to at most limit bytes (UTF-8), marking the cut."""
+    if len(text.encode("utf-8")) <= limit:
+        return text
+    return text.encode("utf-8")[: max(limit - 3, 0)].decode("utf-8", "ignore") + "..."
+
+
+def summarize_feature(feature_dir: Path) -> dict[str, Any]:
+    """Extract a compact summary of one feature, streaming each artifact once."""
+    summary: dict[str, Any] = {
+        "feature": feature_dir.name,
+        "title": feature_dir.name,
+        "purpose": "",
+        "user_stories": [],
+        "clarifications": [],
+        "pending_tasks": [],
+        "tasks_total": 0,
+    }
+
+    heading = ""
+    for line in _iter_lines(feature_dir / "spec.md"):
+        stripped = line.strip()
+        if stripped.startswith("# ") and summary["title"] == feature_dir.name:
+            summary["title"] = stripped[2:].split(":", 1)[-1].strip() or stripped[2:]
+        elif stripped.startswith("## "):
+            heading = stripped[3:].lower()
+        elif heading == "purpose" and stripped and not summary["purpose"]:
+            summary["purpose"] = stripped
+        elif any(h in heading for h in _STORY_HEADINGS) and stripped.startswith("- "):
+            summary["user_stories"].append(stripped[2:])
+        if CLARIFICATION_MARKER in line:
+            summary["clarifications"].append(f"spec: {stripped}")
+
+    for name in ("plan.md", "data-model.md"):
+        for line in _iter_lines(feature_dir / name):
+            if CLARIFICATION_MARKER in line:
+                summary["clarifications"].append(f"{name[:-3]}: {line.strip()}")
+
+    for line in _iter_lines(feature_dir / "tasks.md"):
+        stripped = line.strip()
+        if stripped.startswith(("- [ ]", "- [x]", "- [X]")):
+            summary["tasks_total"] += 1
+            if stripped.startswith("- [ ]"):
+                summary["pending_tasks"].append(stripped[5:].strip())
+    return summary
+
+
+def render_summary(summary: dict[str, Any], limit: int = SUMMARY_ITEM_LIMIT) -> str:
+    """Render one feature summary as a markdown section."""
+    lines = [f"## {summary['feature']}: {summary['title']}", ""]
+    if summary["purpose"]:
+        lines += [summary["purpose"], ""]
+
+    def add_list(title: str, items: list[str]):
+        if not items:
+            return
+        lines.append(f"**{title}** ({len(items)})")
+        lines.extend(f"- {_clip(item, SUMMARY_LINE_LIMIT)}" for item in items[:limit])
+        if len(items) > limit:
+            lines.append(f"- ... {len(items) - limit} more")
+        lines.append("")
+
+    add_list("User stories", summary["user_stories"])
+    add_list("Open clarifications", summary["clarifications"])
+    if summary["tasks_total"]:
+        done = summary["tasks_total"] - len(summary["pending_tasks"])
+        lines += [f"**Tasks**: {done}/{summary['tasks_total']} done", ""]
+    add_list("Pending tasks", summary["pending_tasks"])
+    return "\n".join(lines) + "\n"
+
+
+def write_project_context(
+    repo_root: Path,
+    context_path: Optional[Path] = None,
+    max_bytes: Optional[int] = None,
+    workers: int = 8,
+) -> dict[str, Any]:
+    """Pack summaries of every feature into one context file.
+
+    Features are summarized in a thread pool and rendered in feature order
+    (newest first); the file is replaced atomically, so concurrent writers
+    such as ``d3 watch`` never see or leave a partial file. Once the budget
+    would be exceeded, the remaining features are listed by name only.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .features import feature_number, iter_feature_dirs
+
+    context_path = context_path or repo_root / DEFAULT_CONTEXT_FILE
+    features = sorted(
+        iter_feature_dirs(repo_root),
+        key=lambda p: (feature_number(p.name), p.name),
+        reverse=True,
+    )
+    header = PROJECT_HEADER.format(
+        count=len(features), timestamp=time.strftime("%Y-%m-%d %H:%M:%S")
+    )
+    written = len(header.encode("utf-8")) + len(FOOTER.encode("utf-8"))
+    included: list[str] = []
+    omitted: list[str] = []
+
+    parts = [header]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for summary in pool.map(summarize_feature, features):
+            text = render_summary(summary)
+            size = len(text.encode("utf-8"))
+            if omitted or (
+                max_bytes is not None
+                and written + size + OMITTED_NOTE_RESERVE > max_bytes
+            ):
+                omitted.append(summary["feature"])
+                continue
+            parts.append(text)
+            written += size
+            included.append(summary["feature"])
+    if omitted:
+        note = (
+            "## Omitted to fit the context budget\n\n"
+            f"{len(omitted)} feature(s): " + ", ".join(omitted)
+        )
+        room = OMITTED_NOTE_RESERVE if max_bytes is None else max_bytes - written
+        parts.append(_clip(note, max(room - 1, 0)) + "\n")
+    parts.append(FOOTER)
+    atomic_write_text(context_path, "".join(parts))
+
+    return {
+        "context_file": str(context_path),
+        "features": len(features),
+        "included": included,
+        "omitted": omitted,
+    }
@@ -0,0 +1,150 @@
+"""Streaming, resumable HTTP downloads for template archives."""
+
+import atexit
+import importlib.util
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import httpx
+
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF = 0.5
+PROGRESS_INTERVAL = 0.1
+
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+_client: Optional[httpx.Client] = None
+
+
+def get_client() -> httpx.Client:
+    """Return the process-wide pooled HTTP client.
+
+    The version lookup and the archive download share one connection pool,
+    so a single init pays for each TLS handshake once. HTTP/2 is negotiated
+    when the optional ``h2`` package is installed (``pip install d3-kit[http2]``).
+    """
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            follow_redirects=True,
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            timeout=httpx.Timeout(30.0, connect=10.0),
+        )
+        atexit.register(_client.close)
+    return _client
+
+
+class DownloadResult:
+    """Outcome of a streamed download."""
+
+    def __init__(self, status_code: int, etag: Optional[str], size: int):
+        self.status_code = status_code
+        self.etag = etag
+        self.size = size
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
+def _total_size(response: httpx.Response, offset: int) -> Optional[int]:
+    content_range = response.headers.get("content-range", "")
+    if "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    length = response.headers.get("content-length")
+    if length is not None and length.isdigit():
+        return offset + int(length)
+    return None
+
+
+def stream_download(
+    client: httpx.Client,
+    url: str,
+    dest: Path,
+    headers: Optional[dict[str, str]] = None,
+    progress: Optional[ProgressCallback] = None,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    timeout: float = 30.0,
+) -> DownloadResult:
+    """Stream url into dest chunk by chunk, resuming with Range on failure.
+
+    Only one chunk is held in memory at a time. When the connection drops
+    mid-transfer the request is retried with exponential backoff, asking for
+    the remaining bytes with ``Range``/``If-Range``; a server that answers a
+    range request with a full 200 response restarts the file from scratch.
+    A 304 response leaves dest untouched.
+
+    Ranges count bytes of the encoded body, so the body is requested with
+    ``Accept-Encoding: identity`` and written raw. A server that compresses
+    it anyway is decoded, and a retry then starts over instead of resuming.
+    """
+    base_headers = {"Accept-Encoding": "identity", **(headers or {})}
+    written = 0
+    etag: Optional[str] = None
+    total: Optional[int] = None
+    encoded = False
+    attempt = 0
+
+    with open(dest, "wb") as f:
+        while True:
+            request_headers = dict(base_headers)
+            if encoded:
+                f.seek(0)
+                f.truncate()
+                written = 0
+            if written:
+                request_headers["Range"] = f"bytes={written}-"
+                if etag:
+                    request_headers["If-Range"] = etag
+            try:
+                with client.stream(
+                    "GET", url, headers=request_headers, timeout=timeout
+                ) as response:
+                    if response.status_code == 304:
+                        return DownloadResult(304, response.headers.get("etag"), 0)
+                    if response.status_code == 416 and written and written == total:
+                        return DownloadResult(200, etag, written)
+                    response.raise_for_status()
+
+                    if response.status_code != 206 and written:
+                        # Server ignored the range (or the asset changed): start over
+                        f.seek(0)
+                        f.truncate()
+                        written = 0
+
+                    etag = response.headers.get("etag", etag)
+                    encoding = response.headers.get("content-encoding", "")
+                    encoded = encoding.lower() not in ("", "identity")
+                    # Sizes and ranges of an encoded body say nothing about
+                    # the decoded bytes written to dest
+                    total = None if encoded else _total_size(response, written)
+                    last_report = 0.0
+                    # Chunks as they arrive: a fixed chunk size would hold back
+                    # a partial chunk and lose it when the connection drops
+                    chunks = response.iter_bytes() if encoded else response.iter_raw()
+                    for chunk in chunks:
+                        f.write(chunk)
+                        written += len(chunk)
+                        now = time.monotonic()
+                        if progress and now - last_report >= PROGRESS_INTERVAL:
+                            progress(written, total)
+                            last_report = now
+
+                if total is not None and written < total:
+                    raise httpx.RemoteProtocolError(
+                        f"connection closed after {written} of {total} bytes"
+                    )
+                if progress:
+                    progress(written, total)
+                return DownloadResult(200, etag, written)
+            except httpx.TransportError:
+                f.flush()
+                if attempt >= retries:
+                    raise
+                time.sleep(backoff * (2**attempt))
+                attempt += 1
@@ -0,0 +1,405 @@
+"""Single-pass extraction of template archives.
+
+Members are streamed straight from the archive to their final location, so
+each file costs one write. When every entry sits under one top-level
+directory (a ``name-v1.2.3/`` wrapper), that prefix is stripped while
+writing instead of moving the files afterwards. Hidden directories such as
+``.d3/`` are never treated as wrappers. Every member is validated before
+anything is written: absolute paths, drive letters and ``..`` components
+are rejected, as are paths that would resolve outside the destination.
+
+``merge_archive`` is the variant for existing trees (``d3 init --here``):
+it writes only files that are new or changed, and reports local edits as
+conflicts instead of overwriting them.
+
+Both accept several archives at once (``d3 init --ai claude,copilot``).
+The archives are planned together and a path is written once, from the
+first archive providing it; the same path in a later archive is skipped
+without being read when its size and CRC-32 from the zip directory match,
+so the shared ``.d3/`` tree costs one write however many agents there are.
+"""
+
+import hashlib
+import json
+import os
+import stat
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from .utils import atomic_write_text, sha256_file
+
+CHUNK_SIZE = 256 * 1024
+# Below this many files, thread start-up costs more than it saves
+POOL_THRESHOLD = 32
+DEFAULT_MAX_WORKERS = 8
+# Hashes of the files the template installed, used to tell template updates
+# from local edits when merging into an existing tree
+MANIFEST_PATH = ".d3/template-manifest.json"
+GITIGNORE_PATH = ".d3/.gitignore"
+# Machine-local state the d3 commands keep under .d3/, rebuilt when missing
+CACHE_PATTERNS = [
+    "/analyze-cache.json",
+    "/build-manifest.json",
+    "/context-cache.json",
+    "/feature-index.json",
+    "/feature-index.lock",
+    "/search-index.sqlite*",
+    "/status-snapshot.json",
+    "/.*.tmp",
+]
+
+T = TypeVar("T")
+# (archive, member, target path)
+Member = tuple[zipfile.ZipFile, zipfile.ZipInfo, Path]
+
+
+class UnsafeArchiveError(ValueError):
+    """An archive entry would be written outside the destination."""
+
+
+def _parts(name: str) -> list[str]:
+    """Path components of a member name, rejecting unsafe ones."""
+    normalized = name.replace("\\", "/")
+    parts = [p for p in normalized.split("/") if p not in ("", ".")]
+    if (
+        normalized.startswith("/")
+        or (parts and ":" in parts[0])
+        or ".." in parts
+        or "\0" in normalized
+    ):
+        raise UnsafeArchiveError(f"Unsafe path in archive: {name!r}")
+    return parts
+
+
+def wrapper_prefix(members: list[tuple[list[str], bool]]) -> Optional[str]:
+    """The single top-level directory every entry lives under, if any.
+
+    members are (path components, is_dir) pairs.
+    """
+    tops = {parts[0] for parts, _ in members if parts}
+    if len(tops) != 1:
+        return None
+    top = tops.pop()
+    if top.startswith(".") or any(
+        len(parts) == 1 and not is_dir for parts, is_dir in members
+    ):
+        # A file at the top level, or a hidden dir like .d3/, is content
+        return None
+    return top
+
+
+def plan_extraction(
+    zf: zipfile.ZipFile, dest: Path, strip: bool = True
+) -> tuple[list[tuple[zipfile.ZipInfo, Path]], set[Path], Optional[str]]:
+    """Map members to targets; returns (files, directories, stripped prefix)."""
+    members = [(info, _parts(info.filename)) for info in zf.infolist()]
+    prefix = (
+        wrapper_prefix([(parts, info.is_dir()) for info, parts in members])
+        if strip
+        else None
+    )
+    root = dest.resolve()
+    inside: dict[Path, bool] = {}
+    files: list[tuple[zipfile.ZipInfo, Path]] = []
+    directories: set[Path] = set()
+    for info, parts in members:
+        if prefix:
+            parts = parts[1:]
+        if not parts:
+            continue
+        target = dest.joinpath(*parts)
+        # Symlinks already present in dest (e.g. with init --here) could
+        # redirect a write; resolve each parent once and lstat the leaf
+        parent = target.parent
+        if parent not in inside:
+            inside[parent] = parent.resolve().is_relative_to(root)
+        if not inside[parent] or (
+            os.path.islink(target) and not target.resolve().is_relative_to(root)
+        ):
+            raise UnsafeArchiveError(f"Unsafe path in archive: {info.filename!r}")
+        if info.is_dir():
+            directories.add(target)
+        else:
+            files.append((info, target))
+            directories.add(target.parent)
+    return files, directories, prefix
+
+
+def plan_archives(
+    zfs: list[zipfile.ZipFile], dest: Path, strip: bool = True
+) -> tuple[list[Member], set[Path], Optional[str], int, list[str]]:
+    """Combine the plans of several archives into one.
+
+    Returns (files, directories, first stripped prefix, shared, clashes):
+    shared counts members skipped as identical to one already planned, and
+    clashes lists paths where a later archive has different content (the
+    first archive's copy is kept).
+    """
+    files: list[Member] = []
+    directories: set[Path] = set()
+    prefixes: list[Optional[str]] = []
+    planned: dict[Path, zipfile.ZipInfo] = {}
+    shared = 0
+    clashes: list[str] = []
+    for zf in zfs:
+        members, dirs, prefix = plan_extraction(zf, dest, strip)
+        directories |= dirs
+        prefixes.append(prefix)
+        for info, target in members:
+            first = planned.get(target)
+            if first is None:
+                planned[target] = info
+                files.append((zf, info, target))
+            elif (first.file_size, first.CRC) == (info.file_size, info.CRC):
+                shared += 1
+            else:
+                clashes.append(target.relative_to(dest).as_posix())
+    return files, directories, next((p for p in prefixes if p), None), shared, clashes
+
+
+def _paths(zip_paths: Union[Path, list[Path]]) -> list[Path]:
+    return [zip_paths] if isinstance(zip_paths, Path) else list(zip_paths)
+
+
+def _write_member(
+    zf: zipfile.ZipFile, info: zipfile.ZipInfo, target: Path
+) -> tuple[int, str]:
+    """Write one member to target; returns its size and SHA-256."""
+    digest = hashlib.sha256()
+    with zf.open(info) as src, open(target, "wb") as dst:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            dst.write(chunk)
+    mode = (info.external_attr >> 16) & 0o777
+    if os.name == "posix" and mode & stat.S_IXUSR:
+        os.chmod(target, mode)
+    return info.file_size, digest.hexdigest()
+
+
+def _hash_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> str:
+    digest = hashlib.sha256()
+    with zf.open(info) as src:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _run(func: Callable[[Any], T], items: list, max_workers: Optional[int]) -> list[T]:
+    """Map func over items, in a bounded thread pool when there are enough."""
+    if len(items) < POOL_THRESHOLD or max_workers == 1:
+        return [func(item) for item in items]
+    workers = min(max_workers or DEFAULT_MAX_WORKERS, len(items))
+    # ZipFile serializes reads of the shared handle; inflating, hashing and
+    # writing run in parallel
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, items))
+
+
+def load_manifest(dest: Path) -> dict[str, str]:
+    """Paths the template installed in dest, mapped to their SHA-256."""
+    try:
+        with open(dest / MANIFEST_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    files = data.get("files") if isinstance(data, dict) else None
+    return files if isinstance(files, dict) else {}
+
+
+def save_manifest(dest: Path, files: dict[str, str]) -> None:
+    """Record installed template files; skipped when dest has no .d3/."""
+    if (dest / MANIFEST_PATH).parent.is_dir():
+        atomic_write_text(
+            dest / MANIFEST_PATH,
+            json.dumps({"version": 1, "files": files}, indent=2, sort_keys=True),
+        )
+
+
+def save_gitignore(dest: Path) -> bool:
+    """Keep the .d3/ caches out of git; returns whether the file changed.
+
+    Patterns missing from an existing .d3/.gitignore are appended, so local
+    additions survive. Skipped when dest has no .d3/.
+    """
+    path = dest / GITIGNORE_PATH
+    if not path.parent.is_dir():
+        return False
+    try:
+        text = path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        text = "# Machine-local caches written by d3 commands; safe to delete\n"
+    present = {line.strip() for line in text.splitlines()}
+    missing = [p for p in CACHE_PATTERNS if p not in present]
+    if not missing:
+        return False
+    if text and not text.endswith("\n"):
+        text += "\n"
+    atomic_write_text(path, text + "".join(f"{p}\n" for p in missing))
+    return True
+
+
+def extract_archive(
+    zip_paths: Union[Path, list[Path]],
+    dest: Path,
+    strip: bool = True,
+    max_workers: Optional[int] = None,
+) -> dict:
+    """Extract one or more archives into dest in one pass.
+
+    Returns the files and bytes written, the stripped prefix, how many
+    shared members were skipped and any clashing paths. Raises
+    UnsafeArchiveError before writing anything when a member would escape
+    dest. The hashes of the written files are recorded in the template
+    manifest for later merges.
+    """
+    with ExitStack() as stack:
+        zfs = [
+            stack.enter_context(zipfile.ZipFile(path, "r"))
+            for path in _paths(zip_paths)
+        ]
+        files, directories, prefix, shared, clashes = plan_archives(zfs, dest, strip)
+        for directory in sorted(directories):
+            directory.mkdir(parents=True, exist_ok=True)
+        results = _run(lambda item: _write_member(*item), files, max_workers)
+    save_manifest(
+        dest,
+        {
+            target.relative_to(dest).as_posix(): sha
+            for (_, _, target), (_, sha) in zip(files, results)
+        },
+    )
+    return {
+        "files": len(files),
+        "bytes": sum(size for size, _ in results),
+        "stripped": prefix,
+        "shared": shared,
+        "clashes": clashes,
+    }
+
+
+def _classify(
+    zf: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+    target: Path,
+    recorded: Optional[str],
+    blocked: set[Path],
+) -> tuple[str, str, str]:
+    """(action, incoming sha, conflict reason) for one member.
+
+    "blocked" conflicts cannot be resolved by overwriting the file.
+    """
+    incoming = _hash_member(zf, info)
+    if blocked.intersection(target.parents):
+        return "blocked", incoming, "a file is in the way of its directory"
+    try:
+        st = os.stat(target)
+    except FileNotFoundError:
+        return "create", incoming, ""
+    except NotADirectoryError:
+        return "blocked", incoming, "a file is in the way of its directory"
+    if stat.S_ISDIR(st.st_mode):
+        return "blocked", incoming, "a directory is in the way"
+    existing = None
+    if st.st_size == info.file_size:
+        existing = sha256_file(target)
+        if existing == incoming:
+            return "unchanged", incoming, ""
+    if recorded is None:
+        return "conflict", incoming, "existing file differs from the template"
+    if (existing or sha256_file(target)) == recorded:
+        # Untouched since the template installed it: safe to replace
+        return "update", incoming, ""
+    return "conflict", incoming, "modified since the template installed it"
+
+
+def merge_archive(
+    zip_paths: Union[Path, list[Path]],
+    dest: Path,
+    dry_run: bool = False,
+    overwrite_conflicts: bool = False,
+    max_workers: Optional[int] = None,
+) -> dict:
+    """Merge a template archive into an existing tree, writing only changes.
+
+    Every member is hashed against the file it would replace, in parallel.
+    New files are created and files still matching the manifest of the
+    previous install are updated. Identical files are not touched, so their
+    mtimes stay put. Files edited since the last install (or never
+    installed by the template) are conflicts. They are kept and reported
+    unless overwrite_conflicts is set. With dry_run nothing is written and
+    the result is the plan. Manifest entries of files outside these
+    archives (another agent installed earlier) are kept.
+    """
+    manifest = load_manifest(dest)
+    with ExitStack() as stack:
+        zfs = [
+            stack.enter_context(zipfile.ZipFile(path, "r"))
+            for path in _paths(zip_paths)
+        ]
+        files, directories, prefix, shared, clashes = plan_archives(zfs, dest)
+        # Every directory a member needs, not just the immediate parents
+        ancestors: set[Path] = set()
+        for path in [target for _, _, target in files] + list(directories):
+            parent = path.parent
+            while parent != dest and parent not in ancestors:
+                ancestors.add(parent)
+                parent = parent.parent
+        ancestors.update(directories)
+        blocked = {d for d in ancestors if d.exists() and not d.is_dir()}
+        rels = [target.relative_to(dest).as_posix() for _, _, target in files]
+        plan = _run(
+            lambda i: _classify(
+                files[i][0], files[i][1], files[i][2], manifest.get(rels[i]), blocked
+            ),
+            list(range(len(files))),
+            max_workers,
+        )
+
+        actions: dict[str, list[str]] = {"create": [], "update": [], "unchanged": []}
+        conflicts: list[dict[str, Any]] = []
+        to_write: list[Member] = []
+        incoming = set(rels)
+        installed = {
+            rel: sha
+            for rel, sha in manifest.items()
+            if rel not in incoming and (dest / rel).is_file()
+        }
+        for (zf, info, target), rel, (action, sha, reason) in zip(files, rels, plan):
+            if action in ("conflict", "blocked"):
+                replace = overwrite_conflicts and action == "conflict"
+                conflicts.append(
+                    {"path": rel, "reason": reason, "overwritten": replace}
+                )
+                if not replace:
+                    if rel in manifest:
+                        installed[rel] = manifest[rel]
+                    continue
+                action = "update"
+            actions[action].append(rel)
+            installed[rel] = sha
+            if action != "unchanged":
+                to_write.append((zf, info, target))
+
+        written = 0
+        if not dry_run and to_write:
+            for directory in sorted({target.parent for _, _, target in to_write}):
+                directory.mkdir(parents=True, exist_ok=True)
+            results = _run(lambda item: _write_member(*item), to_write, max_workers)
+            written = sum(size for size, _ in results)
+    if not dry_run:
+        save_manifest(dest, installed)
+    return {
+        "dry_run": dry_run,
+        "files": len(files),
+        "created": actions["create"],
+        "updated": actions["update"],
+        "unchanged": actions["unchanged"],
+        "conflicts": conflicts,
+        "bytes": written,
+        "stripped": prefix,
+        "shared": shared,
+        "clashes": clashes,
+    }
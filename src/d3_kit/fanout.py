@@ -0,0 +1,130 @@
+"""Run a per-feature command across many features on a worker pool.
+
+``d3 plan --all`` (or ``--features GLOB``) runs the command's
+``scripts/bash/d3-<command>.sh`` once per matching feature directory,
+several at a time, and folds the ``output_json`` blob each run prints into
+one report. A failing feature is recorded and does not stop the others.
+"""
+
+import fnmatch
+import json
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .features import iter_feature_dirs
+
+DEFAULT_WORKERS = 4
+SCRIPT_TIMEOUT = 300
+
+# Commands with a per-feature script, and the script that implements each
+FEATURE_SCRIPTS = {
+    "plan": "d3-plan.sh",
+    "tasks": "d3-tasks.sh",
+    "data": "d3-data.sh",
+    "contracts": "d3-contracts.sh",
+    "quickstart": "d3-quickstart.sh",
+    "checklist": "d3-checklist.sh",
+    "clarify": "d3-clarify.sh",
+}
+
+
+def select_features(repo_root: Path, pattern: Optional[str] = None) -> list[Path]:
+    """Feature directories whose name matches pattern (all when None)."""
+    return [
+        path
+        for path in iter_feature_dirs(repo_root)
+        if pattern is None or fnmatch.fnmatch(path.name, pattern)
+    ]
+
+
+def script_path(repo_root: Path, name: str) -> Optional[Path]:
+    """The project's copy of a bash script (.d3/scripts or scripts/)."""
+    for base in (repo_root / ".d3" / "scripts", repo_root / "scripts"):
+        path = base / "bash" / name
+        if path.is_file():
+            return path
+    return None
+
+
+def find_script(repo_root: Path, command: str) -> Optional[Path]:
+    """The project's copy of a command's script."""
+    return script_path(repo_root, FEATURE_SCRIPTS[command])
+
+
+def run_script(script: Path, feature_dir: Path, cwd: Path) -> dict[str, Any]:
+    """Run script for one feature; returns its parsed result."""
+    start = time.perf_counter()
+    result: dict[str, Any] = {
+        "feature_dir": str(feature_dir),
+        "feature_name": feature_dir.name,
+    }
+    try:
+        proc = subprocess.run(
+            ["bash", str(script), str(feature_dir)],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            timeout=SCRIPT_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        result.update(status="error", message=str(e), exit_code=None)
+    else:
+        try:
+            payload = json.loads(proc.stdout)
+        except ValueError:
+            payload = {}
+        if not isinstance(payload, dict):
+            payload = {}
+        status = payload.get("status") or (
+            "success" if proc.returncode == 0 else "error"
+        )
+        if proc.returncode != 0 and status == "success":
+            status = "error"
+        result.update(
+            status=status,
+            message=payload.get("message") or proc.stderr.strip()[-500:],
+            exit_code=proc.returncode,
+        )
+        if payload.get("data"):
+            result["data"] = payload["data"]
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_for_features(
+    command: str,
+    script: Path,
+    feature_dirs: list[Path],
+    cwd: Path,
+    workers: int = DEFAULT_WORKERS,
+    on_result: Optional[Callable[[dict[str, Any], int, int], None]] = None,
+) -> dict[str, Any]:
+    """Run script for every feature directory; returns the combined report.
+
+    on_result is called as (result, completed, total) after each feature.
+    """
+    start = time.perf_counter()
+    results: dict[Path, dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(run_script, script, f, cwd): f for f in feature_dirs}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if on_result:
+                on_result(results[futures[future]], len(results), len(feature_dirs))
+
+    ordered = [results[f] for f in feature_dirs]
+    counts: dict[str, int] = {}
+    for result in ordered:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {
+        "command": command,
+        "script": str(script),
+        "features": len(ordered),
+        "counts": counts,
+        "failed": [r["feature_name"] for r in ordered if r["status"] == "error"],
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+        "results": ordered,
+    }
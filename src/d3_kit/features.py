@@ -0,0 +1,170 @@
+"""Feature directory discovery and feature-number allocation.
+
+Feature numbers are handed out from an index in ``.d3/feature-index.json``
+that records the highest number seen in ``d3-features/`` and in git branch
+names, plus the highest number already allocated. The index is rebuilt (one
+directory listing and a single ``git for-each-ref``) only when the features
+directory or the git refs have changed since the last rebuild, and every
+allocation happens under an exclusive file lock, so concurrent runs on the
+same checkout always receive distinct numbers.
+"""
+
+import json
+import os
+import re
+import subprocess
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from .utils import atomic_write_text, file_lock
+
+FEATURES_DIRNAME = "d3-features"
+INDEX_FILENAME = "feature-index.json"
+LOCK_FILENAME = "feature-index.lock"
+
+_NUMBER_PREFIX = re.compile(r"^(\d+)-")
+_REF_PREFIX = re.compile(r"^refs/(?:heads/|remotes/[^/]+/)")
+
+
+def find_repo_root(start: Optional[Path] = None) -> Optional[Path]:
+    """Walk up from start looking for .git, .d3 or d3-features."""
+    current = (start or Path.cwd()).resolve()
+    for candidate in (current, *current.parents):
+        if any(
+            (candidate / marker).exists()
+            for marker in (".git", ".d3", FEATURES_DIRNAME)
+        ):
+            return candidate
+    return None
+
+
+def iter_feature_dirs(repo_root: Path) -> Iterator[Path]:
+    """Yield feature directories under d3-features/, sorted by name."""
+    features_dir = repo_root / FEATURES_DIRNAME
+    try:
+        entries = sorted(os.scandir(features_dir), key=lambda e: e.name)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir() and not entry.name.startswith("."):
+            yield Path(entry.path)
+
+
+def feature_number(name: str) -> int:
+    """Return the leading number of a feature or branch name, or 0."""
+    match = _NUMBER_PREFIX.match(name)
+    return int(match.group(1)) if match else 0
+
+
+def _git_common_dir(repo_root: Path) -> Optional[Path]:
+    """Locate the shared git directory without spawning git (handles worktrees)."""
+    dot_git = repo_root / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    if not dot_git.is_file():
+        return None
+    content = dot_git.read_text(encoding="utf-8").strip()
+    if not content.startswith("gitdir:"):
+        return None
+    git_dir = (repo_root / content[len("gitdir:") :].strip()).resolve()
+    commondir = git_dir / "commondir"
+    if commondir.is_file():
+        return (git_dir / commondir.read_text(encoding="utf-8").strip()).resolve()
+    return git_dir
+
+
+class FeatureAllocator:
+    """Hands out sequential feature numbers for one repository."""
+
+    def __init__(self, repo_root: Path):
+        self.repo_root = repo_root
+        self.features_dir = repo_root / FEATURES_DIRNAME
+        self.index_path = repo_root / ".d3" / INDEX_FILENAME
+        self.lock_path = repo_root / ".d3" / LOCK_FILENAME
+        self.git_dir = _git_common_dir(repo_root)
+
+    def _signature(self) -> list[int]:
+        """Cheap change detector: mtimes of the directories that hold numbers.
+
+        Numbered branches live directly under refs/heads or
+        refs/remotes/<remote>, and packed refs in packed-refs, so stat-ing
+        those is enough to notice new branches without listing them.
+        """
+        paths = [self.features_dir]
+        if self.git_dir is not None:
+            paths += [self.git_dir / "packed-refs", self.git_dir / "refs" / "heads"]
+            remotes = self.git_dir / "refs" / "remotes"
+            if remotes.is_dir():
+                paths += sorted(p for p in remotes.iterdir() if p.is_dir())
+        signature = []
+        for path in paths:
+            try:
+                signature.append(path.stat().st_mtime_ns)
+            except OSError:
+                signature.append(0)
+        return signature
+
+    def _scan_features(self) -> int:
+        return max(
+            (feature_number(p.name) for p in iter_feature_dirs(self.repo_root)),
+            default=0,
+        )
+
+    def _scan_branches(self) -> int:
+        if self.git_dir is None:
+            return 0
+        try:
+            result = subprocess.run(
+                [
+                    "git",
+                    "for-each-ref",
+                    "--format=%(refname)",
+                    "refs/heads",
+                    "refs/remotes",
+                ],
+                cwd=self.repo_root,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return 0
+        highest = 0
+        for ref in result.stdout.splitlines():
+            highest = max(highest, feature_number(_REF_PREFIX.sub("", ref)))
+        return highest
+
+    def _load_index(self) -> dict[str, Any]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _refresh(self, index: dict[str, Any]) -> dict[str, Any]:
+        signature = self._signature()
+        if index.get("signature") != signature:
+            index["scanned"] = max(self._scan_features(), self._scan_branches())
+            index["signature"] = signature
+        return index
+
+    def highest(self) -> int:
+        """Highest number in use or already allocated."""
+        with file_lock(self.lock_path):
+            index = self._load_index()
+            signature = index.get("signature")
+            self._refresh(index)
+            if index["signature"] != signature:
+                # Keep the rescan for the next caller
+                atomic_write_text(self.index_path, json.dumps(index, indent=2))
+        return max(index.get("scanned", 0), index.get("allocated", 0))
+
+    def allocate(self) -> int:
+        """Reserve and return the next feature number."""
+        with file_lock(self.lock_path):
+            index = self._refresh(self._load_index())
+            number = max(index.get("scanned", 0), index.get("allocated", 0)) + 1
+            index["allocated"] = number
+            atomic_write_text(self.index_path, json.dumps(index, indent=2))
+        return number
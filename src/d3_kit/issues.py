@@ -0,0 +1,428 @@
+"""Create and update GitHub issues from tasks.md.
+
+Every task becomes one issue. A ledger next to tasks.md
+(``issues-ledger.json``) maps task IDs to issue numbers together with a
+hash of what was last pushed, so a re-run creates only missing issues and
+patches only those whose task changed. The ledger is saved as soon as an
+issue is created, so a run that fails partway never forgets issues it made.
+Each issue body carries a hidden ``<!-- d3-task: ID -->`` marker; when the
+ledger is missing, existing issues are matched by that marker instead of
+being created twice. An issue deleted on GitHub is created again.
+
+Requests run concurrently on an ``httpx.AsyncClient``. The client honours
+``X-RateLimit-Remaining``/``X-RateLimit-Reset`` by pausing new requests
+until the window resets, and retries 403/429 responses after
+``Retry-After``.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import httpx
+
+from .tasks import Task, load_tasks
+from .utils import atomic_write_text
+
+DEFAULT_API_URL = "https://api.github.com"
+DEFAULT_CONCURRENCY = 4
+LEDGER_FILENAME = "issues-ledger.json"
+REPORT_FILENAME = "created-issues.md"
+MAX_RETRIES = 3
+# Stop issuing requests while fewer than this many remain in the window
+RATE_LIMIT_RESERVE = 2
+# How the API answers for an issue that was deleted or transferred away
+GONE_STATUSES = (404, 410)
+
+_MARKER = re.compile(r"<!-- d3-task: ([\w-]+) -->")
+_REMOTE = re.compile(r"github\.com[:/]([^/]+)/(.+?)(?:\.git)?/?$")
+
+
+class IssueSyncError(RuntimeError):
+    """The issues API could not be used (auth, repository, network)."""
+
+
+def detect_repo(repo_root: Path) -> Optional[str]:
+    """owner/name of the origin remote, if it points at GitHub."""
+    try:
+        url = subprocess.run(
+            ["git", "remote", "get-url", "origin"],
+            cwd=repo_root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    match = _REMOTE.search(url)
+    return f"{match.group(1)}/{match.group(2)}" if match else None
+
+
+def detect_token() -> Optional[str]:
+    """GITHUB_TOKEN/GH_TOKEN, falling back to the GitHub CLI's login."""
+    token = os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
+    if token:
+        return token
+    try:
+        result = subprocess.run(
+            ["gh", "auth", "token"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def issue_payload(
+    task: Task,
+    feature_name: str,
+    numbers: dict[str, int],
+    done: frozenset[str] = frozenset(),
+) -> dict[str, Any]:
+    """Title, body, labels and state for a task's issue.
+
+    ``done`` holds the IDs of completed tasks; the ``blocked`` label is set
+    only while one of the task's dependencies is still open.
+    """
+    lines = [task.description or task.id, ""]
+    if task.story is not None:
+        lines.append(f"- **User Story**: {task.story}")
+    if task.parallel:
+        lines.append("- **Parallel**: yes")
+    if task.depends_on:
+        refs = [
+            f"{dep} (#{numbers[dep]})" if dep in numbers else dep
+            for dep in task.depends_on
+        ]
+        lines.append(f"- **Depends on**: {', '.join(refs)}")
+    for line in task.body[1:]:
+        stripped = line.strip()
+        if stripped.startswith(("- **Dependencies**", "* **Dependencies**")):
+            continue
+        lines.append(stripped)
+    lines += ["", f"<!-- d3-task: {task.id} -->"]
+
+    labels = [f"feature/{feature_name}", "task"]
+    if task.parallel:
+        labels.append("parallelizable")
+    if any(dep not in done for dep in task.depends_on):
+        labels.append("blocked")
+    return {
+        "title": f"[{task.id}] {task.description or task.id}",
+        "body": "\n".join(lines),
+        "labels": labels,
+        "state": "closed" if task.done else "open",
+    }
+
+
+def _payload_hash(payload: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class RateLimiter:
+    """Bounds concurrency and pauses while the API's rate limit is exhausted."""
+
+    def __init__(self, concurrency: int, reserve: int = RATE_LIMIT_RESERVE):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.reserve = reserve
+        self.resume_at = 0.0
+        self.waited = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        delay = self.resume_at - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+    def pause_until(self, when: float) -> None:
+        """Hold back new requests until the given epoch time."""
+        start = max(self.resume_at, time.time())
+        if when > start:
+            self.waited += when - start
+            self.resume_at = when
+
+    def observe(self, response: httpx.Response) -> None:
+        remaining = response.headers.get("x-ratelimit-remaining")
+        reset = response.headers.get("x-ratelimit-reset")
+        if remaining is not None and reset is not None:
+            if int(remaining) <= self.reserve:
+                self.pause_until(float(reset))
+
+    def retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        retry_after = response.headers.get("retry-after")
+        if retry_after is not None and retry_after.isdigit():
+            return float(retry_after)
+        reset = response.headers.get("x-ratelimit-reset")
+        if reset is not None:
+            return max(0.0, float(reset) - time.time())
+        return float(2**attempt)
+
+
+class IssueSync:
+    """Push the tasks of one feature to a GitHub repository."""
+
+    def __init__(
+        self,
+        feature_dir: Path,
+        repo: str,
+        token: Optional[str],
+        api_url: str = DEFAULT_API_URL,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        on_event: Optional[Callable[[str, str, str], None]] = None,
+    ):
+        self.feature_dir = feature_dir
+        self.feature_name = re.sub(r"^\d+-", "", feature_dir.name)
+        self.repo = repo
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.concurrency = concurrency
+        self.transport = transport
+        self.emit = on_event or (lambda tid, status, detail: None)
+        self.ledger_path = feature_dir / LEDGER_FILENAME
+
+    def _load_ledger(self) -> dict[str, Any]:
+        try:
+            with open(self.ledger_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("repo") != self.repo:
+            return {}
+        return data.get("issues", {})
+
+    def _save_ledger(self, issues: dict[str, Any]) -> None:
+        atomic_write_text(
+            self.ledger_path,
+            json.dumps({"repo": self.repo, "issues": issues}, indent=2, sort_keys=True),
+        )
+
+    async def _request(
+        self,
+        client: httpx.AsyncClient,
+        limiter: RateLimiter,
+        method: str,
+        path: str,
+        gone_ok: bool = False,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a request, waiting out rate limits.
+
+        With gone_ok a 404/410 is returned instead of raised, for requests
+        on one issue that may have been deleted.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            async with limiter:
+                response = await client.request(method, path, **kwargs)
+            limiter.observe(response)
+            limited = response.status_code == 429 or (
+                response.status_code == 403
+                and (
+                    response.headers.get("x-ratelimit-remaining") == "0"
+                    or "retry-after" in response.headers
+                )
+            )
+            if not limited or attempt == MAX_RETRIES:
+                break
+            limiter.pause_until(time.time() + limiter.retry_delay(response, attempt))
+        if gone_ok and response.status_code in GONE_STATUSES:
+            return response
+        if response.status_code in (401, 404):
+            raise IssueSyncError(
+                f"{method} {path} returned {response.status_code}: "
+                "check the repository name and token"
+            )
+        response.raise_for_status()
+        return response
+
+    async def _recover(
+        self, client: httpx.AsyncClient, limiter: RateLimiter
+    ) -> dict[str, dict[str, Any]]:
+        """Ledger entries for issues created earlier, found by their markers."""
+        found: dict[str, dict[str, Any]] = {}
+        page = 1
+        while True:
+            response = await self._request(
+                client,
+                limiter,
+                "GET",
+                f"/repos/{self.repo}/issues",
+                params={
+                    "labels": f"feature/{self.feature_name}",
+                    "state": "all",
+                    "per_page": 100,
+                    "page": page,
+                },
+            )
+            items = response.json()
+            for item in items:
+                match = _MARKER.search(item.get("body") or "")
+                if match and "pull_request" not in item:
+                    # Hash what the issue holds now, so matching tasks are skipped
+                    remote = {
+                        "title": item.get("title"),
+                        "body": item.get("body"),
+                        "labels": [
+                            label["name"] if isinstance(label, dict) else label
+                            for label in item.get("labels", [])
+                        ],
+                        "state": item.get("state", "open"),
+                    }
+                    found.setdefault(
+                        match.group(1),
+                        {"number": item["number"], "hash": _payload_hash(remote)},
+                    )
+            if len(items) < 100:
+                return found
+            page += 1
+
+    async def _sync(self, tasks: list[Task], dry_run: bool) -> dict[str, Any]:
+        ledger = self._load_ledger()
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        limiter = RateLimiter(self.concurrency)
+        outcome: dict[str, str] = {}
+        failed: dict[str, str] = {}
+        done = frozenset(task.id for task in tasks if task.done)
+
+        async with httpx.AsyncClient(
+            base_url=self.api_url,
+            headers=headers,
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            transport=self.transport,
+        ) as client:
+            if not ledger and not dry_run:
+                ledger.update(await self._recover(client, limiter))
+                for task_id, entry in ledger.items():
+                    self.emit(task_id, "recovered", f"#{entry['number']}")
+
+            async def push(task: Task) -> None:
+                numbers = {tid: e["number"] for tid, e in ledger.items()}
+                payload = issue_payload(task, self.feature_name, numbers, done)
+                digest = _payload_hash(payload)
+                entry = ledger.get(task.id)
+                if entry and entry.get("hash") == digest:
+                    outcome.setdefault(task.id, "unchanged")
+                    return
+                action = "updated" if entry else "created"
+                if dry_run:
+                    outcome[task.id] = f"would be {action}"
+                    return
+                try:
+                    number = None
+                    if entry:
+                        response = await self._request(
+                            client,
+                            limiter,
+                            "PATCH",
+                            f"/repos/{self.repo}/issues/{entry['number']}",
+                            json=payload,
+                            gone_ok=True,
+                        )
+                        if response.status_code in GONE_STATUSES:
+                            # Deleted on GitHub; the entry is replaced on create
+                            self.emit(task.id, "gone", f"#{entry['number']}")
+                            action = "recreated"
+                        else:
+                            number = entry["number"]
+                    if number is None:
+                        create = {k: v for k, v in payload.items() if k != "state"}
+                        response = await self._request(
+                            client,
+                            limiter,
+                            "POST",
+                            f"/repos/{self.repo}/issues",
+                            json=create,
+                        )
+                        number = response.json()["number"]
+                        # Record it now: a later failure must not orphan it.
+                        # No hash yet, so a failed close is retried next run.
+                        ledger[task.id] = {"number": number, "hash": None}
+                        self._save_ledger(ledger)
+                        if payload["state"] == "closed":
+                            await self._request(
+                                client,
+                                limiter,
+                                "PATCH",
+                                f"/repos/{self.repo}/issues/{number}",
+                                json={"state": "closed"},
+                            )
+                except (httpx.HTTPError, IssueSyncError) as e:
+                    failed[task.id] = str(e)
+                    self.emit(task.id, "failed", str(e))
+                    return
+                ledger[task.id] = {"number": number, "hash": digest}
+                failed.pop(task.id, None)
+                # A create followed by a link update is still a create
+                if outcome.get(task.id, "unchanged") == "unchanged":
+                    outcome[task.id] = action
+                self.emit(task.id, action, f"#{number}")
+
+            async def push_all(batch: list[Task]) -> None:
+                try:
+                    await asyncio.gather(*(push(task) for task in batch))
+                finally:
+                    if not dry_run:
+                        self._save_ledger(ledger)
+
+            before = {tid: e["number"] for tid, e in ledger.items()}
+            await push_all(tasks)
+            # Second pass links dependencies to issues (re)created in the first
+            renumbered = {
+                tid for tid, e in ledger.items() if before.get(tid) != e["number"]
+            }
+            relink = [t for t in tasks if renumbered.intersection(t.depends_on)]
+            if relink:
+                await push_all(relink)
+
+        counts: dict[str, int] = {}
+        for status in outcome.values():
+            counts[status] = counts.get(status, 0) + 1
+        return {
+            "repo": self.repo,
+            "feature_dir": str(self.feature_dir),
+            "ledger": str(self.ledger_path),
+            "issues": {tid: ledger[tid]["number"] for tid in ledger},
+            "outcome": outcome,
+            "counts": counts,
+            "failed": failed,
+            "rate_limit_wait_seconds": round(limiter.waited, 3),
+        }
+
+    def run(self, dry_run: bool = False) -> dict[str, Any]:
+        """Create or update one issue per task; returns what happened."""
+        tasks_path = self.feature_dir / "tasks.md"
+        tasks = list(load_tasks(tasks_path).tasks.values())
+        result = asyncio.run(self._sync(tasks, dry_run))
+        if not dry_run:
+            self._write_report(tasks, result["issues"])
+        return result
+
+    def _write_report(self, tasks: list[Task], numbers: dict[str, int]) -> None:
+        rows = [
+            f"| #{numbers[t.id]} | {t.id} | {t.description} | "
+            f"{'Closed' if t.done else 'Open'} | "
+            f"https://github.com/{self.repo}/issues/{numbers[t.id]} |"
+            for t in tasks
+            if t.id in numbers
+        ]
+        atomic_write_text(
+            self.feature_dir / REPORT_FILENAME,
+            "# Created GitHub Issues\n\n"
+            "| Issue # | Task | Title | Status | Link |\n"
+            "|---------|------|-------|--------|------|\n"
+            + "\n".join(rows)
+            + f"\n\n---\nUpdated: {time.strftime('%Y-%m-%d')}\n",
+        )
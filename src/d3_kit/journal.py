@@ -0,0 +1,335 @@
+"""Append-only task progress journal and incremental status rollups.
+
+Each feature has ``journal.jsonl`` next to its tasks.md: one JSON object per
+line recording a task event (``start``, ``finish``, ``fail``, ``block`` or
+``unblock``) with its task ID and a UTC timestamp. Lines are only ever
+appended, each with a single ``write`` on an ``O_APPEND`` descriptor, so
+concurrent writers never interleave.
+
+``d3 status`` never re-reads whole journals. ``.d3/status-snapshot.json``
+keeps, per feature, the journal byte offset already folded in, the latest
+state of every task and finishes per day. A run stats every journal and
+tasks.md, reads only the bytes appended since the snapshot (a journal that
+shrank or was replaced is read again from the start, and large backlogs are
+folded in a process pool) and re-parses tasks.md only when it changed.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from .features import FEATURES_DIRNAME
+from .tasks import load_tasks
+from .utils import atomic_write_text
+
+JOURNAL_FILENAME = "journal.jsonl"
+SNAPSHOT_FILENAME = "status-snapshot.json"
+SNAPSHOT_VERSION = 1
+DEFAULT_WORKERS = 8
+# Below this many unread journal bytes a process pool costs more than it saves
+POOL_THRESHOLD_BYTES = 4 * 1024 * 1024
+EVENTS = ("start", "finish", "fail", "block", "unblock")
+# Task state after each event
+EVENT_STATES = {
+    "start": "in_progress",
+    "finish": "done",
+    "fail": "failed",
+    "block": "blocked",
+    "unblock": "pending",
+}
+# How run_graph statuses are journaled; others are not recorded
+RUN_EVENTS = {
+    "running": "start",
+    "passed": "finish",
+    "failed": "fail",
+    "blocked": "block",
+}
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def append_events(feature_dir: Path, events: Iterable[dict[str, Any]]) -> int:
+    """Append events to the feature's journal; returns how many were written.
+
+    Every event gets a ``ts`` if it has none. Each event is one ``write``,
+    so concurrent appenders cannot split each other's lines.
+    """
+    fd = os.open(
+        feature_dir / JOURNAL_FILENAME, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+    )
+    written = 0
+    try:
+        for event in events:
+            if event.get("event") not in EVENTS:
+                raise ValueError(f"Unknown journal event: {event.get('event')!r}")
+            record = {"ts": event.get("ts") or _now(), **event}
+            line = json.dumps(record, separators=(",", ":")) + "\n"
+            os.write(fd, line.encode("utf-8"))
+            written += 1
+    finally:
+        os.close(fd)
+    return written
+
+
+def append_event(
+    feature_dir: Path, task: str, event: str, note: Optional[str] = None
+) -> dict[str, Any]:
+    """Record one event for task and return it."""
+    record: dict[str, Any] = {"ts": _now(), "task": task, "event": event}
+    if note:
+        record["note"] = note
+    append_events(feature_dir, [record])
+    return record
+
+
+def read_journal(path: str, offset: int, size: int) -> dict[str, Any]:
+    """Fold the journal bytes in [offset, size) into a delta for a snapshot.
+
+    A trailing line without its newline is still being written and is left
+    for the next run. Module-level so it can run in a worker process.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(size - offset)
+    end = data.rfind(b"\n") + 1
+    delta: dict[str, Any] = {
+        "consumed": end,
+        "events": 0,
+        "invalid_lines": 0,
+        "last_event": None,
+        "tasks": {},
+        "finished_per_day": {},
+    }
+    tasks = delta["tasks"]
+    per_day = delta["finished_per_day"]
+    for raw in data[:end].splitlines():
+        try:
+            record = json.loads(raw)
+            task, event, ts = record["task"], record["event"], record["ts"]
+            state = EVENT_STATES[event]
+        except (ValueError, KeyError, TypeError):
+            delta["invalid_lines"] += 1
+            continue
+        tasks[task] = {"state": state, "since": ts, "note": record.get("note")}
+        if event == "finish":
+            day = ts[:10]
+            per_day[day] = per_day.get(day, 0) + 1
+        delta["events"] += 1
+        if delta["last_event"] is None or ts > delta["last_event"]:
+            delta["last_event"] = ts
+    return delta
+
+
+def _read_star(args: tuple[str, int, int]) -> dict[str, Any]:
+    return read_journal(*args)
+
+
+def _merge(entry: dict[str, Any], delta: dict[str, Any]) -> None:
+    """Apply a delta from read_journal to a snapshot entry."""
+    entry["offset"] += delta["consumed"]
+    entry["events"] += delta["events"]
+    entry["invalid_lines"] += delta["invalid_lines"]
+    entry["tasks"].update(delta["tasks"])
+    per_day = entry["finished_per_day"]
+    for day, count in delta["finished_per_day"].items():
+        per_day[day] = per_day.get(day, 0) + count
+    if delta["last_event"] and (
+        entry["last_event"] is None or delta["last_event"] > entry["last_event"]
+    ):
+        entry["last_event"] = delta["last_event"]
+
+
+def _empty_entry() -> dict[str, Any]:
+    return {
+        "journal": None,
+        "offset": 0,
+        "events": 0,
+        "invalid_lines": 0,
+        "last_event": None,
+        "tasks": {},
+        "finished_per_day": {},
+        "tasks_md": None,
+        "task_ids": [],
+        "checked": [],
+    }
+
+
+class StatusTracker:
+    """Maintain the status snapshot of one repository."""
+
+    def __init__(self, repo_root: Path, snapshot_path: Optional[Path] = None):
+        self.repo_root = repo_root
+        self.snapshot_path = snapshot_path or repo_root / ".d3" / SNAPSHOT_FILENAME
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            return {}
+        return data.get("features", {})
+
+    def _refresh(
+        self, feature_dir: Path, entry: dict[str, Any]
+    ) -> tuple[bool, Optional[tuple[str, int, int]]]:
+        """Check one feature against its snapshot entry.
+
+        Returns whether the entry changed, and the journal range still to be
+        read as (path, offset, size) if there is one.
+        """
+        changed = False
+        try:
+            st = os.stat(feature_dir / "tasks.md")
+            tasks_key: Optional[list[int]] = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            tasks_key = None
+        if tasks_key != entry["tasks_md"]:
+            graph = load_tasks(feature_dir / "tasks.md") if tasks_key else None
+            entry["task_ids"] = list(graph.order) if graph else []
+            entry["checked"] = (
+                [tid for tid in graph.order if graph.tasks[tid].done] if graph else []
+            )
+            entry["tasks_md"] = tasks_key
+            changed = True
+
+        path = feature_dir / JOURNAL_FILENAME
+        keep = {k: entry[k] for k in ("tasks_md", "task_ids", "checked")}
+        try:
+            st = os.stat(path)
+        except OSError:
+            if entry["journal"] is None:
+                return changed, None
+            entry.update(_empty_entry(), **keep)
+            return True, None
+        identity = [st.st_dev, st.st_ino]
+        if entry["journal"] != identity or st.st_size < entry["offset"]:
+            # Replaced or truncated: fold it again from the start
+            entry.update(_empty_entry(), **keep, journal=identity)
+            changed = True
+        if st.st_size > entry["offset"]:
+            return changed, (str(path), entry["offset"], st.st_size)
+        return changed, None
+
+    def update(
+        self, feature_dirs: list[Path], workers: int = DEFAULT_WORKERS
+    ) -> dict[str, dict[str, Any]]:
+        """Refresh and return the snapshot entries of feature_dirs.
+
+        Journal bytes not yet in the snapshot are read in a process pool
+        when there is enough of them to pay for it.
+        """
+        snapshot = self._load()
+        dirty = not self.snapshot_path.exists()
+        entries: dict[str, dict[str, Any]] = {}
+        jobs: list[tuple[str, int, int]] = []
+        job_keys: list[str] = []
+        for feature_dir in feature_dirs:
+            key = feature_dir.name
+            entry = snapshot.get(key) or _empty_entry()
+            changed, job = self._refresh(feature_dir, entry)
+            dirty = dirty or changed
+            if job:
+                jobs.append(job)
+                job_keys.append(key)
+            snapshot[key] = entries[key] = entry
+
+        pending = sum(size - offset for _, offset, size in jobs)
+        if pending >= POOL_THRESHOLD_BYTES and len(jobs) > 1 and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunksize = max(1, len(jobs) // (workers * 4))
+                deltas = list(pool.map(_read_star, jobs, chunksize=chunksize))
+        else:
+            deltas = [read_journal(*job) for job in jobs]
+        for key, delta in zip(job_keys, deltas):
+            if delta["consumed"]:
+                _merge(entries[key], delta)
+                dirty = True
+        # Forget features that no longer exist on disk
+        features_dir = self.repo_root / FEATURES_DIRNAME
+        for key in [k for k in snapshot if not (features_dir / k).is_dir()]:
+            del snapshot[key]
+            dirty = True
+        if dirty:
+            atomic_write_text(
+                self.snapshot_path,
+                json.dumps(
+                    {"version": SNAPSHOT_VERSION, "features": snapshot},
+                    separators=(",", ":"),
+                ),
+            )
+        return entries
+
+
+def feature_status(name: str, entry: dict[str, Any]) -> dict[str, Any]:
+    """Rollup of one feature's snapshot entry."""
+    states = {tid: "pending" for tid in entry["task_ids"]}
+    for tid in entry["checked"]:
+        states[tid] = "done"
+    for tid, info in entry["tasks"].items():
+        if entry["task_ids"] and tid not in states:
+            continue  # no longer in tasks.md
+        if info["state"] != "pending" or states.get(tid) != "done":
+            states[tid] = info["state"]
+    counts: dict[str, int] = {}
+    for state in states.values():
+        counts[state] = counts.get(state, 0) + 1
+    total = len(states)
+    return {
+        "feature_name": name,
+        "tasks": total,
+        "counts": counts,
+        "percent_done": (
+            round(100 * counts.get("done", 0) / total, 1) if total else None
+        ),
+        "blocked": [
+            {
+                "task": tid,
+                "since": entry["tasks"].get(tid, {}).get("since"),
+                "note": entry["tasks"].get(tid, {}).get("note"),
+            }
+            for tid, state in states.items()
+            if state in ("blocked", "failed")
+        ],
+        "events": entry["events"],
+        "last_event": entry["last_event"],
+    }
+
+
+def rollup(entries: dict[str, dict[str, Any]], days: int = 14) -> dict[str, Any]:
+    """Project-wide status: per-feature rollups, totals and daily throughput."""
+    features = [feature_status(name, entry) for name, entry in entries.items()]
+    totals: dict[str, int] = {}
+    per_day: dict[str, int] = {}
+    for status in features:
+        for state, count in status["counts"].items():
+            totals[state] = totals.get(state, 0) + count
+    for entry in entries.values():
+        for day, count in entry["finished_per_day"].items():
+            per_day[day] = per_day.get(day, 0) + count
+    today = time.time()
+    window = [
+        time.strftime("%Y-%m-%d", time.gmtime(today - 86400 * i))
+        for i in reversed(range(days))
+    ]
+    tasks = sum(s["tasks"] for s in features)
+    return {
+        "features": features,
+        "summary": {
+            "features": len(features),
+            "tasks": tasks,
+            "counts": totals,
+            "percent_done": (
+                round(100 * totals.get("done", 0) / tasks, 1) if tasks else None
+            ),
+            "blocked": sum(len(s["blocked"]) for s in features),
+            "events": sum(s["events"] for s in features),
+        },
+        "throughput": {day: per_day.get(day, 0) for day in window},
+    }
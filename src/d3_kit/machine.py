@@ -0,0 +1,82 @@
+"""Machine mode: NDJSON events on stdout instead of Rich rendering.
+
+Enabled with ``d3 --json`` (or ``D3_JSON=1``), and automatically when
+stdout is not a terminal; ``--no-json`` forces the Rich output back. In
+machine mode the commands that otherwise draw banners, panels and live
+step trees (``init``, ``check``) import no Rich modules at all and write
+one JSON object per line instead. Commands whose output is already plain
+text keep it when merely piped; their ``--json`` flag, or an explicit
+``d3 --json``, switches them to their JSON report.
+
+Every event has the same envelope, and fields are only ever added::
+
+    {"v": 1, "ts": 1760659200.123, "event": "step", ...}
+
+``step``
+    A ``StepTracker`` step changed status: ``tracker``, ``key``, ``label``,
+    ``status`` (running, done, error, skipped), ``detail``, ``bytes``,
+    ``files`` and ``seconds`` (set once the step has finished).
+``result``
+    The outcome of a command: ``command``, ``ok`` and command fields.
+``warning`` / ``error``
+    A ``message``; an error is followed by a non-zero exit status.
+"""
+
+import json
+import sys
+import threading
+import time
+from typing import Any, Optional
+
+SCHEMA_VERSION = 1
+
+_forced: Optional[bool] = None
+_lock = threading.Lock()
+
+
+def configure(enabled: Optional[bool]) -> None:
+    """Force machine mode on or off; None means on when stdout is not a TTY."""
+    global _forced
+    _forced = enabled
+
+
+def requested() -> bool:
+    """Whether machine mode was asked for explicitly (--json or D3_JSON)."""
+    return _forced is True
+
+
+def enabled() -> bool:
+    if _forced is not None:
+        return _forced
+    try:
+        return not sys.stdout.isatty()
+    except (AttributeError, ValueError):
+        return True
+
+
+def emit(event: str, **fields: Any) -> None:
+    """Write one event line to stdout and flush it."""
+    record = {"v": SCHEMA_VERSION, "ts": round(time.time(), 3), "event": event}
+    record.update(fields)
+    line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+    with _lock:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+
+def step_event(tracker: Any, step: dict[str, Any]) -> None:
+    """Emit a step event for a StepTracker step."""
+    seconds = None
+    if step["start"] is not None and step["end"] is not None:
+        seconds = round(step["end"] - step["start"], 4)
+    emit(
+        "step",
+        tracker=tracker.title,
+        key=step["key"],
+        label=step["label"],
+        status=step["status"],
+        detail=step["detail"],
+        bytes=step["bytes"],
+        files=step["files"],
+        seconds=seconds,
+    )
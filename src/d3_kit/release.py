@@ -0,0 +1,255 @@
+"""Build the per-agent template release archives.
+
+Python replacement for ``.github/workflows/scripts/create-release-packages.sh``.
+Every ``d3-commands/d3.*.md`` template is parsed once through
+``d3_kit.templates``; each agent/script variant is then rendered from the
+compiled form, and the archives are built in memory in a process pool.
+Archives are byte-reproducible: entries are sorted, timestamps come from
+``SOURCE_DATE_EPOCH`` (default 1980-01-01) and permissions are fixed.
+
+Run with ``python -m d3_kit.release v1.2.3``.
+"""
+
+import argparse
+import io
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+from . import AGENT_CONFIG, SCRIPT_TYPE_CHOICES
+from .templates import TEMPLATES_DIRNAME, Template, TemplateIndex
+from .utils import atomic_write_bytes
+
+DEFAULT_OUTPUT_DIR = ".genreleases"
+AGENT_PREFIX = "d3"
+
+# Where each agent looks for its command files
+COMMAND_DIRS = {
+    "amp": ".agents/commands",
+    "auggie": ".augment/rules",
+    "bob": ".bob/commands",
+    "claude": ".claude/commands",
+    "codebuddy": ".codebuddy/commands",
+    "codex": ".codex/commands",
+    "copilot": ".github/agents",
+    "cursor-agent": ".cursor/commands",
+    "gemini": ".gemini/commands",
+    "kilocode": ".kilocode/rules",
+    "opencode": ".opencode/command",
+    "q": ".amazonq/prompts",
+    "qoder": ".qoder/commands",
+    "qwen": ".qwen/commands",
+    "roo": ".roo/rules",
+    "shai": ".shai/commands",
+    "windsurf": ".windsurf/workflows",
+}
+# Agents that read TOML prompts with {{args}} instead of Markdown with $ARGUMENTS
+TOML_AGENTS = {"gemini", "qwen"}
+
+CONFIG_TOML = """\
+# D3-Kit Configuration
+# This file configures the D3-Kit development environment
+
+[project]
+name = "my-d3-project"
+features_dir = "d3-features"
+contracts_dir = "contracts"
+
+[directories]
+features = "d3-features"
+contracts = "contracts"
+templates = "D3-templates"
+scripts = "scripts"
+
+[commands]
+intend = "D3-templates/d3-commands/d3.intend.md"
+plan = "D3-templates/d3-commands/d3.plan.md"
+tasks = "D3-templates/d3-commands/d3.tasks.md"
+specify = "D3-templates/d3-commands/d3.intend.md"
+implement = "D3-templates/d3-commands/d3.implement.md"
+clarify = "D3-templates/d3-commands/d3.clarify.md"
+analyze = "D3-templates/d3-commands/d3.analyze.md"
+checklist = "D3-templates/d3-commands/d3.checklist.md"
+constitution = "D3-templates/d3-commands/d3.constitution.md"
+research = "D3-templates/d3-commands/d3.research.md"
+data = "D3-templates/d3-commands/d3.data.md"
+contracts = "D3-templates/d3-commands/d3.contracts.md"
+quickstart = "D3-templates/d3-commands/d3.quickstart.md"
+"""
+
+SCRIPT_PLACEHOLDERS = {
+    "sh": ("scripts/bash/example.sh", "#!/bin/bash\n# Add your bash scripts here\n"),
+    "ps": (
+        "scripts/powershell/example.ps1",
+        "# Add your PowerShell scripts here\n",
+    ),
+}
+
+_REWRITES = [
+    (re.compile(r"/?D3-templates/"), ".d3/D3-templates/"),
+    (re.compile(r"/?scripts/"), ".d3/scripts/"),
+]
+
+
+def rewrite_paths(text: str) -> str:
+    """Point repository-relative paths at the copies installed under .d3/."""
+    for pattern, replacement in _REWRITES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def render_command(template: Template, script: str, arg_format: str, toml: bool) -> str:
+    """Render one command file for a script variant and argument syntax.
+
+    template must already have its ``scripts``/``agent_scripts`` blocks
+    removed; their commands are read from its metadata.
+    """
+    scripts = template.meta.get("scripts") or {}
+    agent_scripts = template.meta.get("agent_scripts") or {}
+    command = scripts.get(script, f"(Missing script command for {script})")
+    values = {"SCRIPT": command.replace("{ARGS}", arg_format), "ARGS": arg_format}
+    if agent_scripts.get(script):
+        values["AGENT_SCRIPT"] = agent_scripts[script].replace("{ARGS}", arg_format)
+    body = template.render(values).rstrip("\n").replace("__AGENT__", AGENT_PREFIX)
+    body = rewrite_paths(body)
+    if toml:
+        body = body.replace("\\", "\\\\")
+        description = template.meta.get("description") or ""
+        return f'description = "{description}"\n\nprompt = """\n{body}\n"""\n'
+    return body + "\n"
+
+
+def load_sources(source_root: Path) -> dict[str, Any]:
+    """Read everything the archives are built from, once."""
+    templates_dir = source_root / TEMPLATES_DIRNAME
+    static: list[tuple[str, bytes]] = []
+    for path in sorted(templates_dir.rglob("*")):
+        if path.is_file():
+            rel = path.relative_to(source_root).as_posix()
+            static.append((f".d3/{rel}", path.read_bytes()))
+    commands = []
+    for template in TemplateIndex([templates_dir]).commands():
+        commands.append(template.without_frontmatter_keys("scripts", "agent_scripts"))
+    return {"commands": commands, "static": static}
+
+
+def variant_files(agent: str, script: str, sources: dict[str, Any]) -> dict[str, bytes]:
+    """All files of one agent/script package, keyed by archive path."""
+    files: dict[str, bytes] = {".d3/config.toml": CONFIG_TOML.encode("utf-8")}
+    toml = agent in TOML_AGENTS
+    ext, arg_format = ("toml", "{{args}}") if toml else ("md", "$ARGUMENTS")
+    commands_dir = COMMAND_DIRS[agent]
+    for template in sources["commands"]:
+        text = render_command(template, script, arg_format, toml)
+        files[f"{commands_dir}/{template.name}.{ext}"] = text.encode("utf-8")
+    files.update(sources["static"])
+    placeholder, content = SCRIPT_PLACEHOLDERS[script]
+    files[f".d3/{placeholder}"] = content.encode("utf-8")
+    return files
+
+
+def _zip_date_time() -> tuple[int, int, int, int, int, int]:
+    epoch = int(os.environ.get("SOURCE_DATE_EPOCH", "315532800"))
+    # ZIP timestamps cannot predate 1980
+    return time.gmtime(max(epoch, 315532800))[:6]
+
+
+def deterministic_zip(files: dict[str, bytes]) -> bytes:
+    """Zip files with sorted entries, fixed timestamps and fixed permissions."""
+    date_time = _zip_date_time()
+    directories = {
+        "/".join(name.split("/")[:i]) + "/"
+        for name in files
+        for i in range(1, name.count("/") + 1)
+    }
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name in sorted(directories | set(files)):
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.create_system = 3
+            if name.endswith("/"):
+                info.external_attr = (0o40755 << 16) | 0x10
+                zf.writestr(info, b"")
+            else:
+                mode = 0o755 if name.endswith(".sh") else 0o644
+                info.external_attr = (0o100000 | mode) << 16
+                info.compress_type = zipfile.ZIP_DEFLATED
+                zf.writestr(info, files[name], compresslevel=9)
+    return buffer.getvalue()
+
+
+def archive_name(agent: str, script: str, version: str) -> str:
+    return f"d3-kit-template-{agent}-{script}-{version}.zip"
+
+
+def _build_one(args: tuple[str, str, str, str, dict[str, Any]]) -> tuple[str, int]:
+    agent, script, version, out_dir, sources = args
+    data = deterministic_zip(variant_files(agent, script, sources))
+    dest = Path(out_dir) / archive_name(agent, script, version)
+    atomic_write_bytes(dest, data)
+    return str(dest), len(data)
+
+
+def build_release(
+    version: str,
+    source_root: Path,
+    out_dir: Path,
+    agents: Optional[list[str]] = None,
+    scripts: Optional[list[str]] = None,
+    workers: Optional[int] = None,
+) -> list[tuple[str, int]]:
+    """Build every agent/script archive; returns (path, size) per archive."""
+    sources = load_sources(source_root)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for stale in out_dir.glob("d3-kit-template-*.zip"):
+        stale.unlink()
+    jobs = [
+        (agent, script, version, str(out_dir), sources)
+        for agent in sorted(agents or COMMAND_DIRS)
+        for script in (scripts or list(SCRIPT_TYPE_CHOICES))
+    ]
+    if workers == 1:
+        return [_build_one(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_build_one, jobs))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build D3-Kit release archives")
+    parser.add_argument("version", help="Release version, e.g. v1.2.3")
+    parser.add_argument("--source", type=Path, default=Path.cwd())
+    parser.add_argument("--out", type=Path, default=Path(DEFAULT_OUTPUT_DIR))
+    parser.add_argument("--agents", help="Comma-separated agents (default: all)")
+    parser.add_argument("--scripts", help="Comma-separated script types")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if not re.fullmatch(r"v\d+\.\d+\.\d+", args.version):
+        print("Version must look like v0.0.0", file=sys.stderr)
+        return 1
+    agents = args.agents.split(",") if args.agents else None
+    scripts = args.scripts.split(",") if args.scripts else None
+    unknown = [a for a in agents or [] if a not in AGENT_CONFIG]
+    unknown += [s for s in scripts or [] if s not in SCRIPT_TYPE_CHOICES]
+    if unknown:
+        print(f"Unknown agent or script type: {', '.join(unknown)}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    built = build_release(
+        args.version, args.source, args.out, agents, scripts, args.workers
+    )
+    elapsed = time.perf_counter() - start
+    for path, size in built:
+        print(f"{path} ({size} bytes)")
+    print(f"Built {len(built)} archive(s) in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""Full-text search over feature artifacts (``d3 search``).
+
+Every artifact under ``d3-features/`` (markdown, plus JSON/YAML contracts)
+is split into sections at its markdown headings and stored in a SQLite
+FTS5 index at ``.d3/search-index.sqlite``. Before each search the index is
+brought up to date incrementally: files whose mtime and size are unchanged
+are skipped, files that changed on disk are re-hashed and only re-split when
+their SHA-256 differs, and files that disappeared (including whole removed
+features) are dropped. Hits are ranked with BM25, weighting headings above
+body text, and returned per section with a snippet.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from .features import iter_feature_dirs
+
+INDEX_FILENAME = "search-index.sqlite"
+# Bump when the schema or the section splitting changes; the index is rebuilt
+SCHEMA_VERSION = 1
+SUFFIXES = (".md", ".json", ".yaml", ".yml")
+DEFAULT_LIMIT = 20
+# BM25 column weights: heading, body
+HEADING_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_TERM = re.compile(r"\w+(?:[-./:]\w+)*")
+
+_SCHEMA = """
+CREATE TABLE files (
+    path TEXT PRIMARY KEY,
+    feature TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE sections (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    heading TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX sections_path ON sections (path);
+CREATE VIRTUAL TABLE sections_fts USING fts5 (
+    heading, body, content='sections', content_rowid='id',
+    tokenize='porter unicode61'
+);
+CREATE TRIGGER sections_ai AFTER INSERT ON sections BEGIN
+    INSERT INTO sections_fts (rowid, heading, body)
+    VALUES (new.id, new.heading, new.body);
+END;
+CREATE TRIGGER sections_ad AFTER DELETE ON sections BEGIN
+    INSERT INTO sections_fts (sections_fts, rowid, heading, body)
+    VALUES ('delete', old.id, old.heading, old.body);
+END;
+"""
+
+
+class SearchError(RuntimeError):
+    """The index cannot be opened or the query is invalid."""
+
+
+def split_sections(text: str) -> list[tuple[str, int, str]]:
+    """Split markdown into (heading trail, first line, body) sections.
+
+    The trail joins the enclosing headings with " > ". Headings inside
+    fenced code blocks are ignored; text before the first heading gets an
+    empty trail.
+    """
+    sections: list[tuple[str, int, str]] = []
+    trail: list[tuple[int, str]] = []
+    line_no, body = 1, []
+    in_fence = False
+    for i, line in enumerate(text.splitlines(), 1):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING.match(line)
+        if match is None:
+            body.append(line)
+            continue
+        if trail or any(b.strip() for b in body):
+            sections.append((_join(trail), line_no, "\n".join(body).strip()))
+        level = len(match.group(1))
+        while trail and trail[-1][0] >= level:
+            trail.pop()
+        trail.append((level, match.group(2)))
+        line_no, body = i, []
+    if trail or any(b.strip() for b in body):
+        sections.append((_join(trail), line_no, "\n".join(body).strip()))
+    return sections
+
+
+def _join(trail: list[tuple[int, str]]) -> str:
+    return " > ".join(text for _, text in trail)
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching every term.
+
+    Each term is quoted, so identifiers such as FR-001 or /api/users match
+    as phrases instead of being parsed as query syntax.
+    """
+    terms = _TERM.findall(text)
+    if not terms:
+        raise SearchError("Search query has no searchable terms")
+    return " ".join(f'"{term}"' for term in terms)
+
+
+class SearchIndex:
+    """The artifact index of one repository."""
+
+    def __init__(self, repo_root: Path, index_path: Optional[Path] = None):
+        self.repo_root = repo_root
+        self.index_path = index_path or repo_root / ".d3" / INDEX_FILENAME
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is not None:
+            return self._db
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                db.executescript(
+                    "DROP TABLE IF EXISTS sections_fts;"
+                    "DROP TABLE IF EXISTS sections;"
+                    "DROP TABLE IF EXISTS files;"
+                    + _SCHEMA
+                    + f"PRAGMA user_version = {SCHEMA_VERSION};"
+                )
+        except sqlite3.DatabaseError as e:
+            db.close()
+            raise SearchError(f"Cannot open search index {self.index_path}: {e}")
+        db.execute("PRAGMA journal_mode = WAL")
+        self._db = db
+        return db
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _artifacts(self) -> Iterator[tuple[str, str, os.stat_result]]:
+        """(relative path, feature name, stat) of every indexable file."""
+        for feature_dir in iter_feature_dirs(self.repo_root):
+            for dirpath, dirnames, filenames in os.walk(feature_dir):
+                dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+                for name in sorted(filenames):
+                    if name.endswith(SUFFIXES):
+                        path = os.path.join(dirpath, name)
+                        try:
+                            st = os.stat(path)
+                        except OSError:
+                            # Deleted mid-walk or a dangling symlink
+                            continue
+                        rel = Path(path).relative_to(self.repo_root).as_posix()
+                        yield rel, feature_dir.name, st
+
+    def update(self, rebuild: bool = False) -> dict[str, Any]:
+        """Bring the index in line with the files on disk; returns counts."""
+        start = time.perf_counter()
+        db = self._connect()
+        counts: dict[str, Any] = {"files": 0, "indexed": 0, "touched": 0, "removed": 0}
+        with db:
+            if rebuild:
+                db.execute("DELETE FROM sections")
+                db.execute("DELETE FROM files")
+            known = {
+                row[0]: row[1:]
+                for row in db.execute("SELECT path, mtime_ns, size, sha256 FROM files")
+            }
+            for rel, feature, st in self._artifacts():
+                counts["files"] += 1
+                previous = known.pop(rel, None)
+                if previous and previous[:2] == (st.st_mtime_ns, st.st_size):
+                    continue
+                data = (self.repo_root / rel).read_bytes()
+                digest = hashlib.sha256(data).hexdigest()
+                db.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                    (rel, feature, st.st_mtime_ns, st.st_size, digest),
+                )
+                if previous and previous[2] == digest:
+                    counts["touched"] += 1
+                    continue
+                db.execute("DELETE FROM sections WHERE path = ?", (rel,))
+                text = data.decode("utf-8", errors="replace")
+                sections = (
+                    split_sections(text)
+                    if rel.endswith(".md")
+                    else [("", 1, text.strip())]
+                )
+                db.executemany(
+                    "INSERT INTO sections (path, feature, heading, line, body)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    [(rel, feature, h, line, body) for h, line, body in sections],
+                )
+                counts["indexed"] += 1
+            for rel in known:
+                db.execute("DELETE FROM sections WHERE path = ?", (rel,))
+                db.execute("DELETE FROM files WHERE path = ?", (rel,))
+            counts["removed"] = len(known)
+        counts["seconds"] = round(time.perf_counter() - start, 4)
+        return counts
+
+    def search(
+        self,
+        query: str,
+        limit: int = DEFAULT_LIMIT,
+        feature: Optional[str] = None,
+        raw: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Ranked section hits for query, best first.
+
+        feature is a glob over feature names; raw passes query to FTS5
+        unchanged (AND/OR/NOT, prefix*, "phrases", column filters).
+        """
+        db = self._connect()
+        sql = (
+            "SELECT s.feature, s.path, s.heading, s.line,"
+            " snippet(sections_fts, 1, '**', '**', ' ... ', 16),"
+            f" bm25(sections_fts, {HEADING_WEIGHT}, {BODY_WEIGHT}) AS score"
+            " FROM sections_fts JOIN sections s ON s.id = sections_fts.rowid"
+            " WHERE sections_fts MATCH ?"
+        )
+        params: list[Any] = [query if raw else fts_query(query)]
+        if feature:
+            sql += " AND s.feature GLOB ?"
+            params.append(feature)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        try:
+            rows = db.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise SearchError(f"Invalid search query: {e}")
+        return [
+            {
+                "feature": feature_name,
+                "path": path,
+                "heading": heading,
+                "line": line,
+                "snippet": snippet,
+                "score": round(-score, 4),
+            }
+            for feature_name, path, heading, line, snippet, score in rows
+        ]
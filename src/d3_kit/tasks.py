@@ -0,0 +1,386 @@
+"""Parse tasks.md into a dependency graph and run it on a worker pool.
+
+Tasks follow the layout of ``d3-tasks-template.md``::
+
+    1. **[ID-001]** [P] **User Story 1** - Create models in src/models.py - 2h
+       - **Dependencies**: ID-000
+       - **Command**: `pytest tests/test_models.py`
+
+The checklist form ``- [ ] T001 [P] [US1] Description`` is accepted too. A
+task's dependencies are its explicit **Dependencies** plus the file order:
+a task without ``[P]`` is a barrier that waits for everything listed before
+it, and everything listed after it waits for the barrier. Later mentions of
+an already defined ID (the phase checklists) only update its done state.
+"""
+
+import heapq
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+DEFAULT_WORKERS = 4
+
+_TASK_LINE = re.compile(
+    r"^\s*(?:\d+\.|[-*])\s+(?:\[(?P<done>[ xX])\]\s+)?"
+    r"(?:\*\*)?\[?(?P<id>(?:ID-|T)\d+)(?:\]\*\*|\]|\*\*|(?=\s)|$)(?!-)"
+    r"(?P<rest>.*)$"
+)
+_FIELD_LINE = re.compile(r"^\s+[-*]\s+\*\*(?P<name>[^*]+?)\*\*:?\s*(?P<value>.*)$")
+_TASK_REF = re.compile(r"\b(?:ID-|T)\d+\b")
+_STORY = re.compile(r"\*\*User Story (\d+)\*\*|\[US(\d+)\]")
+_ESTIMATE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(m|mins?|minutes?|h|hrs?|hours?|d|days?)\b", re.IGNORECASE
+)
+_ESTIMATE_MINUTES = {"m": 1, "h": 60, "d": 8 * 60}
+
+
+class TaskCycleError(ValueError):
+    """The dependency graph contains a cycle."""
+
+    def __init__(self, cycle: list[str]):
+        self.cycle = cycle
+        super().__init__("Dependency cycle: " + " -> ".join(cycle))
+
+
+class Task:
+    """One task from tasks.md."""
+
+    __slots__ = (
+        "id",
+        "description",
+        "parallel",
+        "story",
+        "estimate",
+        "command",
+        "depends_on",
+        "done",
+        "line",
+        "body",
+    )
+
+    def __init__(self, task_id: str, line: int):
+        self.id = task_id
+        self.line = line
+        self.description = ""
+        self.parallel = False
+        self.story: Optional[int] = None
+        self.estimate: Optional[float] = None
+        self.command: Optional[str] = None
+        self.depends_on: list[str] = []
+        self.done = False
+        self.body: list[str] = []
+
+    def to_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _parse_estimate(text: str) -> Optional[float]:
+    """Minutes for a trailing estimate like ``2h`` or ``30 min``."""
+    match = _ESTIMATE.search(text)
+    if not match:
+        return None
+    unit = match.group(2)[0].lower()
+    return float(match.group(1)) * _ESTIMATE_MINUTES[unit]
+
+
+def _parse_heading(task: Task, rest: str) -> None:
+    task.parallel = "[P]" in rest
+    story = _STORY.search(rest)
+    if story:
+        task.story = int(story.group(1) or story.group(2))
+    parts = [p.strip() for p in rest.split(" - ")]
+    if len(parts) > 2 and _parse_estimate(parts[-1]) is not None:
+        task.estimate = _parse_estimate(parts.pop())
+    description = " - ".join(parts)
+    description = _STORY.sub("", description.replace("[P]", ""))
+    task.description = description.strip(" -")
+
+
+def parse_tasks(text: str) -> "TaskGraph":
+    """Parse the contents of a tasks.md file."""
+    tasks: dict[str, Task] = {}
+    current: Optional[Task] = None
+    for lineno, line in enumerate(text.splitlines(), 1):
+        match = _TASK_LINE.match(line)
+        if match:
+            task_id = match.group("id")
+            done = (match.group("done") or " ").lower() == "x"
+            if task_id in tasks:
+                tasks[task_id].done = tasks[task_id].done or done
+                current = None
+                continue
+            current = Task(task_id, lineno)
+            current.done = done
+            current.body.append(line)
+            _parse_heading(current, match.group("rest"))
+            tasks[task_id] = current
+            continue
+        if current is None:
+            continue
+        if line.strip() and line.startswith((" ", "\t")):
+            current.body.append(line)
+        field = _FIELD_LINE.match(line)
+        if field:
+            name = field.group("name").strip().lower()
+            value = field.group("value").strip()
+            if name == "dependencies":
+                current.depends_on = [
+                    ref for ref in _TASK_REF.findall(value) if ref != current.id
+                ]
+            elif name == "command" and not value.startswith("["):
+                current.command = value.strip("`").strip() or None
+        elif line.strip() and not line.startswith((" ", "\t")):
+            current = None
+    return TaskGraph(list(tasks.values()))
+
+
+def load_tasks(path: Path) -> "TaskGraph":
+    return parse_tasks(path.read_text(encoding="utf-8"))
+
+
+class TaskGraph:
+    """Tasks plus the edges implied by dependencies and file order."""
+
+    def __init__(self, tasks: list[Task]):
+        self.tasks = {task.id: task for task in tasks}
+        self.order = [task.id for task in tasks]
+        self.deps: dict[str, set[str]] = {}
+        self.missing: dict[str, list[str]] = {}
+
+        barrier: Optional[str] = None
+        since_barrier: list[str] = []
+        for task in tasks:
+            deps = {d for d in task.depends_on if d in self.tasks}
+            unknown = [d for d in task.depends_on if d not in self.tasks]
+            if unknown:
+                self.missing[task.id] = unknown
+            if task.parallel:
+                if barrier:
+                    deps.add(barrier)
+                since_barrier.append(task.id)
+            else:
+                deps.update(since_barrier)
+                if barrier:
+                    deps.add(barrier)
+                barrier, since_barrier = task.id, []
+            self.deps[task.id] = deps
+
+        self.dependents: dict[str, list[str]] = {tid: [] for tid in self.order}
+        for tid in self.order:
+            for dep in self.deps[tid]:
+                self.dependents[dep].append(tid)
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def topological_order(self) -> list[str]:
+        """Kahn's algorithm, ties broken by file order; raises TaskCycleError."""
+        position = {tid: i for i, tid in enumerate(self.order)}
+        indegree = {tid: len(deps) for tid, deps in self.deps.items()}
+        # (file position, id) heap: the earliest ready task comes out first
+        ready = [(i, tid) for i, tid in enumerate(self.order) if indegree[tid] == 0]
+        heapq.heapify(ready)
+        result: list[str] = []
+        while ready:
+            _, tid = heapq.heappop(ready)
+            result.append(tid)
+            for child in self.dependents[tid]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    heapq.heappush(ready, (position[child], child))
+        if len(result) != len(self.order):
+            raise TaskCycleError(self._find_cycle(set(self.order) - set(result)))
+        return result
+
+    def _find_cycle(self, remaining: set[str]) -> list[str]:
+        """Walk unresolved dependencies until a task repeats."""
+        start = next(tid for tid in self.order if tid in remaining)
+        path = [start]
+        seen = {start: 0}
+        while True:
+            nxt = next(d for d in sorted(self.deps[path[-1]]) if d in remaining)
+            if nxt in seen:
+                cycle = path[seen[nxt] :] + [nxt]
+                return list(reversed(cycle))
+            seen[nxt] = len(path)
+            path.append(nxt)
+
+    def levels(self) -> list[list[str]]:
+        """Group tasks into waves that can each run fully in parallel."""
+        depth: dict[str, int] = {}
+        for tid in self.topological_order():
+            depth[tid] = max((depth[d] + 1 for d in self.deps[tid]), default=0)
+        waves: list[list[str]] = [
+            [] for _ in range(max(depth.values(), default=-1) + 1)
+        ]
+        for tid in self.order:
+            waves[depth[tid]].append(tid)
+        return waves
+
+    def critical_path(
+        self, durations: Optional[dict[str, float]] = None
+    ) -> tuple[list[str], float]:
+        """Longest path through the graph and its length.
+
+        Weights come from durations when given, else from each task's
+        estimate in minutes, with unestimated tasks counting as 1. Ties
+        between equally long chains go to the task earliest in the file.
+        """
+
+        def weight(tid: str) -> float:
+            if durations is not None:
+                return durations.get(tid, 0.0)
+            estimate = self.tasks[tid].estimate
+            return estimate if estimate is not None else 1.0
+
+        position = {tid: i for i, tid in enumerate(self.order)}
+        finish: dict[str, float] = {}
+        via: dict[str, Optional[str]] = {}
+        for tid in self.topological_order():
+            deps = sorted(self.deps[tid], key=position.__getitem__)
+            prev = max(deps, key=lambda d: finish[d], default=None)
+            finish[tid] = weight(tid) + (finish[prev] if prev else 0.0)
+            via[tid] = prev
+        if not finish:
+            return [], 0.0
+        end: Optional[str] = max(self.order, key=lambda t: finish[t])
+        length = finish[end] if end else 0.0
+        path: list[str] = []
+        while end is not None:
+            path.append(end)
+            end = via[end]
+        return list(reversed(path)), length
+
+
+def run_shell(task: Task, cwd: Path, env: dict[str, str]) -> int:
+    """Default task runner: execute the task's command through the shell."""
+    assert task.command is not None
+    return subprocess.run(task.command, shell=True, cwd=cwd, env=env).returncode
+
+
+def run_graph(
+    graph: TaskGraph,
+    cwd: Path,
+    workers: int = DEFAULT_WORKERS,
+    runner: Callable[[Task, Path, dict[str, str]], int] = run_shell,
+    on_event: Optional[Callable[[str, str, str], None]] = None,
+    skip_done: bool = True,
+) -> dict[str, Any]:
+    """Run every task's command as soon as its dependencies have succeeded.
+
+    Tasks without a command, and tasks already checked off, complete
+    immediately. A failing task marks everything downstream of it as
+    blocked while independent branches keep running. Returns per-task
+    status and timings plus the achieved parallelism and the wall-clock
+    time saved against running the same commands one after another.
+    """
+    graph.topological_order()  # fail fast on cycles
+    emit = on_event or (lambda tid, status, detail: None)
+    remaining = {tid: len(deps) for tid, deps in graph.deps.items()}
+    status: dict[str, str] = {}
+    durations: dict[str, float] = {}
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def execute(tid: str) -> tuple[str, int]:
+        nonlocal running, peak
+        task = graph.tasks[tid]
+        env = dict(os.environ, D3_TASK_ID=tid)
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        start = time.perf_counter()
+        try:
+            code = runner(task, cwd, env)
+        except OSError:
+            code = 127
+        finally:
+            durations[tid] = time.perf_counter() - start
+            with lock:
+                running -= 1
+        return tid, code
+
+    def block(tid: str, cause: str) -> None:
+        # Explicit stack: long dependency chains would exhaust the recursion limit
+        stack = list(reversed(graph.dependents[tid]))
+        while stack:
+            child = stack.pop()
+            if child not in status:
+                status[child] = "blocked"
+                emit(child, "blocked", f"after {cause}")
+                stack.extend(reversed(graph.dependents[child]))
+
+    pending: set[Future] = set()
+    ready = [tid for tid in graph.order if remaining[tid] == 0]
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while ready or pending:
+            released: list[str] = []
+            for tid in ready:
+                task = graph.tasks[tid]
+                if (skip_done and task.done) or not task.command:
+                    status[tid] = "done" if task.done else "skipped"
+                    emit(tid, status[tid], "" if task.done else "no command")
+                    released.append(tid)
+                else:
+                    emit(tid, "running", task.command)
+                    pending.add(pool.submit(execute, tid))
+            ready = []
+            if pending and not released:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    tid, code = future.result()
+                    elapsed = f"{durations[tid]:.2f}s"
+                    if code == 0:
+                        status[tid] = "passed"
+                        emit(tid, "passed", elapsed)
+                        released.append(tid)
+                    else:
+                        status[tid] = "failed"
+                        emit(tid, "failed", f"exit {code} after {elapsed}")
+                        block(tid, tid)
+            for tid in released:
+                for child in graph.dependents[tid]:
+                    remaining[child] -= 1
+                    if remaining[child] == 0 and child not in status:
+                        ready.append(child)
+    wall = time.perf_counter() - wall_start
+
+    serial = sum(durations.values())
+    path, path_seconds = graph.critical_path(durations)
+    return {
+        "tasks": {tid: status.get(tid, "blocked") for tid in graph.order},
+        "durations": {tid: round(s, 3) for tid, s in durations.items()},
+        "workers": workers,
+        "wall_seconds": round(wall, 3),
+        "serial_seconds": round(serial, 3),
+        "saved_seconds": round(max(0.0, serial - wall), 3),
+        "parallelism": round(serial / wall, 2) if wall > 0 else 1.0,
+        "peak_concurrency": peak,
+        "critical_path": path,
+        "critical_path_seconds": round(path_seconds, 3),
+        "failed": [tid for tid, s in status.items() if s == "failed"],
+    }
+
+
+def plan_summary(graph: TaskGraph) -> dict[str, Any]:
+    """Static view of the graph: waves, critical path and unresolved references."""
+    path, length = graph.critical_path()
+    waves = graph.levels()
+    return {
+        "tasks": len(graph),
+        "parallel": sum(1 for t in graph.tasks.values() if t.parallel),
+        "with_command": sum(1 for t in graph.tasks.values() if t.command),
+        "done": sum(1 for t in graph.tasks.values() if t.done),
+        "waves": waves,
+        "max_width": max((len(w) for w in waves), default=0),
+        "critical_path": path,
+        "critical_path_minutes": length,
+        "missing_dependencies": graph.missing,
+    }
@@ -0,0 +1,204 @@
+"""Compiled D3 templates with a cached, mtime-invalidated index.
+
+A template is parsed once into its frontmatter (a small YAML subset:
+scalars, one level of nested mappings and lists of mappings, which is all
+the command templates use) and its body, and the text is pre-split at every
+``{PLACEHOLDER}``, so rendering is a single join with no scanning.
+``TemplateIndex`` keeps parsed templates keyed by path and re-parses a file
+only when its mtime or size changes.
+"""
+
+import re
+import threading
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+TEMPLATES_DIRNAME = "D3-templates"
+COMMANDS_DIRNAME = "d3-commands"
+
+# Upper-case names only, so {{args}} and JSON examples are left alone
+PLACEHOLDER = re.compile(r"\{([A-Z][A-Z0-9_]*)\}")
+
+
+def _scalar(value: str) -> Any:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value in ("true", "false"):
+        return value == "true"
+    return value
+
+
+def parse_frontmatter(lines: list[str]) -> dict[str, Any]:
+    """Parse the YAML subset used by template frontmatter."""
+    meta: dict[str, Any] = {}
+    key: Optional[str] = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if not line[0].isspace():
+            name, _, value = line.partition(":")
+            key = name.strip()
+            meta[key] = _scalar(value.strip()) if value.strip() else None
+            continue
+        if key is None:
+            continue
+        container = meta[key]
+        if stripped.startswith("- "):
+            if container is None:
+                container = meta[key] = []
+            if isinstance(container, list):
+                item = stripped[2:]
+                name, sep, value = item.partition(":")
+                if sep and " " not in name.strip():
+                    container.append({name.strip(): _scalar(value.strip())})
+                else:
+                    container.append(_scalar(item))
+            continue
+        name, _, value = stripped.partition(":")
+        if container is None:
+            container = meta[key] = {}
+        if isinstance(container, list) and container:
+            if isinstance(container[-1], dict):
+                container[-1][name.strip()] = _scalar(value.strip())
+        elif isinstance(container, dict):
+            container[name.strip()] = _scalar(value.strip())
+    return meta
+
+
+class Template:
+    """One parsed template, ready to render."""
+
+    __slots__ = ("name", "path", "text", "meta", "body", "_parts", "_body_parts")
+
+    def __init__(self, text: str, name: str = "", path: Optional[Path] = None):
+        self.text = text.replace("\r", "")
+        self.name = name
+        self.path = path
+        lines = self.text.split("\n")
+        frontmatter: list[str] = []
+        body = self.text
+        if lines and lines[0] == "---" and "---" in lines[1:]:
+            end = lines.index("---", 1)
+            frontmatter = lines[1:end]
+            body = "\n".join(lines[end + 1 :])
+        self.meta = parse_frontmatter(frontmatter)
+        self.body = body
+        self._parts = PLACEHOLDER.split(self.text)
+        self._body_parts = PLACEHOLDER.split(body)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "Template":
+        return cls(path.read_text(encoding="utf-8"), path.stem, path)
+
+    @property
+    def placeholders(self) -> list[str]:
+        return sorted(set(self._parts[1::2]))
+
+    def render(self, values: Mapping[str, str], body_only: bool = False) -> str:
+        """Substitute values; placeholders without a value are left as is."""
+        parts = self._body_parts if body_only else self._parts
+        out = []
+        for i, part in enumerate(parts):
+            if i % 2:
+                out.append(values[part] if part in values else "{" + part + "}")
+            else:
+                out.append(part)
+        return "".join(out)
+
+    def without_frontmatter_keys(self, *keys: str) -> "Template":
+        """Copy with the given top-level frontmatter blocks removed from the text.
+
+        ``meta`` still describes the original frontmatter, so the removed
+        values stay available for substitution.
+        """
+        kept = []
+        dashes = 0
+        skipping = False
+        for line in self.text.split("\n"):
+            if line == "---":
+                dashes += 1
+                skipping = False
+            elif dashes == 1:
+                if line.endswith(":") and line[:-1] in keys:
+                    skipping = True
+                    continue
+                if skipping and line[:1].isalpha() and ":" in line:
+                    skipping = False
+                if skipping and line[:1].isspace():
+                    continue
+            kept.append(line)
+        stripped = Template("\n".join(kept), self.name, self.path)
+        stripped.meta = self.meta
+        return stripped
+
+
+class TemplateIndex:
+    """Parsed templates from a search path, re-parsed only when files change."""
+
+    def __init__(self, search_path: list[Path]):
+        self.search_path = search_path
+        self._entries: dict[Path, tuple[int, int, Template]] = {}
+        self._lock = threading.Lock()
+
+    def find(self, name: str) -> Optional[Path]:
+        for root in self.search_path:
+            path = root / name
+            if path.is_file():
+                return path
+        return None
+
+    def load(self, path: Path) -> Template:
+        stat = path.stat()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                return entry[2]
+        template = Template.from_file(path)
+        with self._lock:
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, template)
+        return template
+
+    def get(self, name: str) -> Template:
+        """Template by file name, e.g. ``d3-spec-template.md``."""
+        path = self.find(name)
+        if path is None:
+            searched = " or ".join(str(root) for root in self.search_path)
+            raise FileNotFoundError(f"Template not found: {name} in {searched}")
+        return self.load(path)
+
+    def commands(self) -> list[Template]:
+        """The ``d3-commands/d3.*.md`` templates of the first root that has them."""
+        for root in self.search_path:
+            commands_dir = root / COMMANDS_DIRNAME
+            if commands_dir.is_dir():
+                return [self.load(p) for p in sorted(commands_dir.glob("d3.*.md"))]
+        return []
+
+    def names(self) -> list[str]:
+        """Every template name reachable through the search path."""
+        names: set[str] = set()
+        for root in self.search_path:
+            if root.is_dir():
+                names.update(p.relative_to(root).as_posix() for p in root.rglob("*.md"))
+        return sorted(names)
+
+
+def default_search_path(repo_root: Path) -> list[Path]:
+    """Project templates first, then the repository copy, then the bundled set."""
+    return [
+        repo_root / ".d3" / TEMPLATES_DIRNAME,
+        repo_root / TEMPLATES_DIRNAME,
+        Path(__file__).resolve().parent / TEMPLATES_DIRNAME,
+    ]
+
+
+_indexes: dict[Path, TemplateIndex] = {}
+
+
+def get_index(repo_root: Path) -> TemplateIndex:
+    """Process-wide index for a repository."""
+    index = _indexes.get(repo_root)
+    if index is None:
+        index = _indexes[repo_root] = TemplateIndex(default_search_path(repo_root))
+    return index
@@ -0,0 +1,120 @@
+"""Export step timings as Chrome trace-event JSON (``d3 --trace FILE``).
+
+The file loads in ``chrome://tracing``, Perfetto and other tools that read
+the trace-event format. The whole command is one span on thread 0; every
+``StepTracker`` gets its own thread, named after its title, with one
+complete ("X") event per step that ran. Step args carry the status, detail,
+bytes and files processed.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from . import __version__
+from .utils import atomic_write_text
+
+
+class TraceRecorder:
+    """Collect the trackers created during one command and write their trace."""
+
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+        self.trackers: list[Any] = []
+        self._lock = threading.Lock()
+
+    def register(self, tracker: Any) -> None:
+        with self._lock:
+            self.trackers.append(tracker)
+
+    def _us(self, timestamp: float) -> float:
+        return round((timestamp - self.origin) * 1_000_000, 3)
+
+    def events(self, command: str, end: Optional[float] = None) -> list[dict]:
+        end = time.perf_counter() if end is None else end
+        pid = os.getpid()
+        events: list[dict] = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": 0,
+                "args": {"name": "d3"},
+            },
+            {
+                "name": f"d3 {command}",
+                "cat": "command",
+                "ph": "X",
+                "pid": pid,
+                "tid": 0,
+                "ts": 0,
+                "dur": self._us(end),
+            },
+        ]
+        with self._lock:
+            trackers = list(self.trackers)
+        for tid, tracker in enumerate(trackers, 1):
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": tracker.title},
+                }
+            )
+            for step in tracker.steps:
+                if step["start"] is None:
+                    continue
+                finish = step["end"] if step["end"] is not None else end
+                args = {"key": step["key"], "status": step["status"]}
+                if step["detail"]:
+                    args["detail"] = step["detail"]
+                for field in ("bytes", "files"):
+                    if step[field] is not None:
+                        args[field] = step[field]
+                events.append(
+                    {
+                        "name": step["label"],
+                        "cat": "step",
+                        "ph": "X",
+                        "pid": pid,
+                        "tid": tid,
+                        "ts": self._us(step["start"]),
+                        "dur": round(self._us(finish) - self._us(step["start"]), 3),
+                        "args": args,
+                    }
+                )
+        return events
+
+    def write(self, path: Path, command: str) -> None:
+        trace = {
+            "traceEvents": self.events(command),
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "command": command,
+                "version": __version__,
+                "started_at": time.strftime(
+                    "%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started_at)
+                ),
+            },
+        }
+        atomic_write_text(path, json.dumps(trace))
+
+
+_recorder: Optional[TraceRecorder] = None
+
+
+def start_recording() -> TraceRecorder:
+    """Begin collecting trackers for this process."""
+    global _recorder
+    _recorder = TraceRecorder()
+    return _recorder
+
+
+def active_recorder() -> Optional[TraceRecorder]:
+    return _recorder
@@ -0,0 +1,223 @@
+"""Watch d3-features/ and keep the agent context and analysis up to date.
+
+Changes are batched: a batch is handed over once the tree has been quiet
+for the debounce period, so an editor's write-rename-chmod sequence (or an
+agent rewriting several artifacts) triggers one refresh. Native file events
+come from the optional ``watchfiles`` package (``pip install d3-kit[watch]``);
+without it, or with ``--poll``, the tree is polled with ``os.scandir``,
+which works on every filesystem including network mounts.
+
+One ``ContextBuilder`` and one ``Analyzer`` live for the whole session, so
+their caches stay in memory and each batch only re-reads the files that
+changed.
+"""
+
+import importlib.util
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from .analyze import Analyzer
+from .context import SECTIONS, ContextBuilder
+from .features import FEATURES_DIRNAME, iter_feature_dirs
+
+DEFAULT_DEBOUNCE_MS = 300
+DEFAULT_POLL_INTERVAL = 0.5
+
+ARTIFACT_FILES = {filename for _, _, filename, _ in SECTIONS if "." in filename}
+
+
+def _snapshot(root: Path) -> dict[str, tuple[int, int]]:
+    """Map every file under root to (mtime_ns, size), skipping dot entries."""
+    snapshot: dict[str, tuple[int, int]] = {}
+    stack = [str(root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+    return snapshot
+
+
+def poll_changes(
+    root: Path,
+    debounce: float,
+    interval: float = DEFAULT_POLL_INTERVAL,
+    stop: Optional[threading.Event] = None,
+) -> Iterator[set[Path]]:
+    """Yield batches of changed paths by comparing periodic snapshots."""
+    stop = stop or threading.Event()
+    previous = _snapshot(root)
+    pending: set[str] = set()
+    last_change = 0.0
+    while not stop.wait(interval):
+        current = _snapshot(root)
+        changed = {
+            path
+            for path in current.keys() | previous.keys()
+            if current.get(path) != previous.get(path)
+        }
+        previous = current
+        now = time.monotonic()
+        if changed:
+            pending |= changed
+            last_change = now
+        elif pending and now - last_change >= debounce:
+            yield {Path(path) for path in pending}
+            pending = set()
+
+
+def native_changes(
+    root: Path, debounce: float, stop: Optional[threading.Event] = None
+) -> Iterator[set[Path]]:
+    """Yield batches of changed paths from OS file events via watchfiles."""
+    import watchfiles
+
+    for changes in watchfiles.watch(
+        root,
+        debounce=int(debounce * 1000),
+        stop_event=stop,
+        raise_interrupt=False,
+    ):
+        yield {Path(path) for _, path in changes}
+
+
+class ArtifactWatcher:
+    """Refresh context and analysis for the features touched by each batch."""
+
+    def __init__(
+        self,
+        repo_root: Path,
+        context_path: Path,
+        feature: Optional[Path] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.repo_root = repo_root
+        self.features_dir = repo_root / FEATURES_DIRNAME
+        self.pinned = feature
+        self.max_bytes = max_bytes
+        self.analyzer = Analyzer(repo_root)
+        self.builder = ContextBuilder(repo_root, feature or repo_root, context_path)
+        self.context_feature: Optional[Path] = feature
+        self.reports: dict[str, dict[str, Any]] = {}
+        self.backend = "polling"
+
+    def changes(
+        self,
+        debounce: float = DEFAULT_DEBOUNCE_MS / 1000,
+        polling: bool = False,
+        interval: float = DEFAULT_POLL_INTERVAL,
+        stop: Optional[threading.Event] = None,
+    ) -> Iterator[set[Path]]:
+        """Batches of changes, from native events when available."""
+        self.features_dir.mkdir(parents=True, exist_ok=True)
+        if not polling and importlib.util.find_spec("watchfiles") is not None:
+            self.backend = "native"
+            return self._native_or_poll(debounce, interval, stop)
+        self.backend = "polling"
+        return poll_changes(self.features_dir, debounce, interval, stop)
+
+    def _native_or_poll(
+        self, debounce: float, interval: float, stop: Optional[threading.Event]
+    ) -> Iterator[set[Path]]:
+        try:
+            yield from native_changes(self.features_dir, debounce, stop)
+        except OSError:
+            # The platform refused a watch (e.g. inotify limits): poll instead
+            self.backend = "polling"
+            yield from poll_changes(self.features_dir, debounce, interval, stop)
+
+    def _affected(self, paths: set[Path]) -> list[Path]:
+        """Feature directories with at least one relevant artifact in paths."""
+        features: dict[str, Path] = {}
+        for path in paths:
+            try:
+                parts = path.relative_to(self.features_dir).parts
+            except ValueError:
+                continue
+            if not parts:
+                continue
+            relevant = (
+                len(parts) == 1
+                or (len(parts) == 2 and parts[1] in ARTIFACT_FILES)
+                or (len(parts) == 3 and parts[1] == "contracts")
+            )
+            if relevant and path.suffix in ("", ".md"):
+                features[parts[0]] = self.features_dir / parts[0]
+        return [features[name] for name in sorted(features)]
+
+    def _refresh_context(self, feature_dir: Path) -> dict[str, Any]:
+        self.builder.feature_dir = feature_dir
+        self.context_feature = feature_dir
+        return self.builder.build(max_bytes=self.max_bytes)
+
+    def prime(self) -> dict[str, Any]:
+        """Analyze every feature and build the context once at start-up."""
+        result = self.analyzer.run(list(iter_feature_dirs(self.repo_root)))
+        self.reports = {r["feature_name"]: r for r in result["features"]}
+        target = self.pinned
+        if target is None and result["features"]:
+            target = max(
+                (Path(r["feature_dir"]) for r in result["features"]),
+                key=lambda p: p.stat().st_mtime,
+            )
+        context = None
+        if target is not None and (target / "spec.md").is_file():
+            context = self._refresh_context(target)
+        return {"features": len(self.reports), "context": context}
+
+    def handle(self, paths: set[Path]) -> Optional[dict[str, Any]]:
+        """Process one batch; returns None when nothing relevant changed."""
+        features = self._affected(paths)
+        if not features:
+            return None
+        start = time.perf_counter()
+        present = [f for f in features if f.is_dir()]
+        for removed in set(features) - set(present):
+            self.reports.pop(removed.name, None)
+
+        result = self.analyzer.run(present) if present else {"features": []}
+        for report in result["features"]:
+            self.reports[report["feature_name"]] = report
+
+        # The context follows the pinned feature, else the latest edited one
+        target = self.pinned
+        if target is None:
+            edited = [f for f in present if (f / "spec.md").is_file()]
+            if edited:
+                target = max(edited, key=lambda p: p.stat().st_mtime)
+        context = None
+        if target is not None and (target in present or target != self.context_feature):
+            if (target / "spec.md").is_file():
+                context = self._refresh_context(target)
+
+        return {
+            "time": time.strftime("%H:%M:%S"),
+            "changed": sorted(
+                str(p.relative_to(self.repo_root))
+                for p in paths
+                if p.is_relative_to(self.repo_root)
+            ),
+            "features": [f.name for f in features],
+            "removed": [f.name for f in features if f not in present],
+            "analysis": {
+                r["feature_name"]: {"coverage": r["coverage"], "issues": r["issues"]}
+                for r in result["features"]
+            },
+            "context": context,
+            "elapsed_seconds": round(time.perf_counter() - start, 3),
+        }
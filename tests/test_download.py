@@ -0,0 +1,250 @@
+"""stream_download against a local HTTP server that drops connections."""
+
+import gzip
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+import pytest
+
+from d3_kit import download
+from d3_kit.download import stream_download
+
+BODY = bytes(range(256)) * 1024  # 256 KiB, several network reads
+ETAG = '"v1"'
+CUT = 100_000
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.headers)
+        self.server.respond(self)
+
+    def send(self, status, start=0, cut=None, headers=None):
+        """Send BODY[start:] with status, closing the socket after cut bytes."""
+        data = BODY[start:]
+        self.send_response(status)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(data)))
+        if status == 206:
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(BODY) - 1}/{len(BODY)}"
+            )
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data if cut is None else data[:cut])
+        if cut is not None:
+            self.drop()
+
+    def send_empty(self, status):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def drop(self):
+        self.wfile.flush()
+        self.connection.shutdown(socket.SHUT_RDWR)
+        self.close_connection = True
+
+    def range_start(self):
+        value = self.headers.get("Range")
+        if value is None or self.headers.get("If-Range", ETAG) != ETAG:
+            return None
+        return int(value.removeprefix("bytes=").rstrip("-"))
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}/archive.zip"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client():
+    with httpx.Client() as c:
+        yield c
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    delays = []
+    monkeypatch.setattr(download.time, "sleep", delays.append)
+    return delays
+
+
+def drop_first(then):
+    """Cut the first response at CUT bytes, answer later ones with then."""
+
+    def respond(handler):
+        if len(handler.server.requests) == 1:
+            handler.send(200, cut=CUT)
+        else:
+            then(handler)
+
+    return respond
+
+
+def test_resumes_with_range_after_drop(server, client, tmp_path: Path):
+    def resume(handler):
+        handler.send(206, start=handler.range_start())
+
+    server.respond = drop_first(resume)
+    dest = tmp_path / "archive.zip"
+    result = stream_download(client, server.url, dest)
+
+    assert dest.read_bytes() == BODY
+    assert result.status_code == 200 and result.etag == ETAG
+    assert result.size == len(BODY)
+    assert len(server.requests) == 2
+    assert server.requests[1]["Range"] == f"bytes={CUT}-"
+    assert server.requests[1]["If-Range"] == ETAG
+
+
+def test_full_reply_to_range_restarts_from_zero(server, client, tmp_path: Path):
+    server.respond = drop_first(lambda handler: handler.send(200))
+    dest = tmp_path / "archive.zip"
+    result = stream_download(client, server.url, dest)
+
+    assert server.requests[1]["Range"] == f"bytes={CUT}-"
+    assert dest.read_bytes() == BODY
+    assert result.size == len(BODY)
+
+
+def test_not_modified_reuses_cached_archive(server, tmp_path: Path, monkeypatch):
+    from d3_kit.cache import TemplateCache
+    from d3_kit.cli import RELEASES_URL_ENV, fetch_template_archive
+
+    def respond(handler):
+        if handler.headers.get("If-None-Match") == ETAG:
+            handler.send_empty(304)
+        else:
+            handler.send(200)
+
+    server.respond = respond
+    monkeypatch.setenv(RELEASES_URL_ENV, f"http://127.0.0.1:{server.server_port}")
+    cache = TemplateCache(tmp_path / "cache", revalidate_seconds=0)
+
+    first = fetch_template_archive("claude", "sh", "v1.0.0", cache)
+    second = fetch_template_archive("claude", "sh", "v1.0.0", cache)
+
+    assert second == first and first.read_bytes() == BODY
+    assert [r.get("If-None-Match") for r in server.requests] == [None, ETAG]
+    assert list(cache.blobs_dir.glob("*.part")) == []
+
+
+def test_range_not_satisfiable_after_full_body_is_complete(
+    server, client, tmp_path: Path
+):
+    def respond(handler):
+        if len(handler.server.requests) > 1:
+            handler.send_empty(416)
+            return
+        # The whole body arrives but the chunked stream is never terminated
+        handler.send_response(200)
+        handler.send_header("ETag", ETAG)
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.send_header("Content-Range", f"bytes 0-{len(BODY) - 1}/{len(BODY)}")
+        handler.end_headers()
+        handler.wfile.write(b"%x\r\n%s\r\n" % (len(BODY), BODY))
+        handler.drop()
+
+    server.respond = respond
+    dest = tmp_path / "archive.zip"
+    result = stream_download(client, server.url, dest)
+
+    assert server.requests[1]["Range"] == f"bytes={len(BODY)}-"
+    assert result.status_code == 200 and result.size == len(BODY)
+    assert dest.read_bytes() == BODY
+
+
+def test_range_not_satisfiable_mid_transfer_raises(server, client, tmp_path: Path):
+    server.respond = drop_first(lambda handler: handler.send_empty(416))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        stream_download(client, server.url, tmp_path / "archive.zip")
+    assert len(server.requests) == 2
+
+
+def test_gives_up_after_retries_with_backoff(server, client, tmp_path: Path, no_sleep):
+    def respond(handler):
+        start = handler.range_start() or 0
+        handler.send(206 if start else 200, start=start, cut=1000)
+
+    server.respond = respond
+
+    with pytest.raises(httpx.TransportError):
+        stream_download(
+            client, server.url, tmp_path / "archive.zip", retries=3, backoff=0.5
+        )
+    assert len(server.requests) == 4
+    assert no_sleep == [0.5, 1.0, 2.0]
+    # Every retry resumed from the bytes already on disk
+    assert [r.get("Range") for r in server.requests] == [
+        None,
+        "bytes=1000-",
+        "bytes=2000-",
+        "bytes=3000-",
+    ]
+
+
+def test_body_is_requested_and_written_unencoded(server, client, tmp_path: Path):
+    server.respond = drop_first(lambda h: h.send(206, start=h.range_start()))
+    dest = tmp_path / "archive.zip"
+    stream_download(client, server.url, dest)
+
+    assert [r["Accept-Encoding"] for r in server.requests] == ["identity"] * 2
+    assert dest.read_bytes() == BODY
+
+
+def test_compressed_body_restarts_instead_of_resuming(server, client, tmp_path: Path):
+    compressed = gzip.compress(BODY)
+
+    def respond(handler):
+        # Ignores Accept-Encoding: identity and Range alike
+        handler.send_response(200)
+        handler.send_header("ETag", ETAG)
+        handler.send_header("Content-Encoding", "gzip")
+        handler.send_header("Content-Length", str(len(compressed)))
+        handler.end_headers()
+        if len(handler.server.requests) == 1:
+            handler.wfile.write(compressed[: len(compressed) // 2])
+            handler.drop()
+        else:
+            handler.wfile.write(compressed)
+
+    server.respond = respond
+    dest = tmp_path / "archive.zip"
+    result = stream_download(client, server.url, dest)
+
+    assert server.requests[1].get("Range") is None
+    assert dest.read_bytes() == BODY and result.size == len(BODY)
+
+
+def test_interrupted_download_leaves_no_partial_file(tmp_path: Path, monkeypatch):
+    from d3_kit.cache import TemplateCache
+    from d3_kit.cli import fetch_template_archive
+
+    def interrupted(client, url, dest, **kwargs):
+        dest.write_bytes(BODY[:CUT])
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(download, "stream_download", interrupted)
+    cache = TemplateCache(tmp_path / "cache")
+
+    with pytest.raises(KeyboardInterrupt):
+        fetch_template_archive("claude", "sh", "v1.0.0", cache)
+    assert list(cache.blobs_dir.iterdir()) == []
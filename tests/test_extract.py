@@ -0,0 +1,137 @@
+"""merge_archive: updating an existing tree from a template archive."""
+
+import os
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from d3_kit.extract import extract_archive, load_manifest, merge_archive
+
+V1 = {
+    ".d3/memory/constitution.md": "# Constitution v1\n",
+    ".d3/scripts/check.sh": "echo v1\n",
+    "docs/guide.md": "Guide\n",
+}
+
+
+def make_zip(path: Path, files: dict[str, str]) -> Path:
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, content in files.items():
+            zf.writestr(f"template-v1/{name}", content)
+    return path
+
+
+def snapshot(root: Path) -> dict[str, tuple[bytes, int]]:
+    return {
+        p.relative_to(root).as_posix(): (p.read_bytes(), p.stat().st_mtime_ns)
+        for p in root.rglob("*")
+        if p.is_file()
+    }
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    dest = tmp_path / "project"
+    dest.mkdir()
+    extract_archive(make_zip(tmp_path / "v1.zip", V1), dest)
+    # Keep mtimes from v1 distinguishable from anything written later
+    for path in dest.rglob("*"):
+        if path.is_file():
+            os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    return dest
+
+
+def test_unchanged_and_updated_files(project: Path, tmp_path: Path):
+    v2 = make_zip(
+        tmp_path / "v2.zip",
+        {**V1, ".d3/scripts/check.sh": "echo v2\n", "docs/new.md": "New\n"},
+    )
+    before = snapshot(project)
+
+    result = merge_archive(v2, project)
+
+    assert result["updated"] == [".d3/scripts/check.sh"]
+    assert result["created"] == ["docs/new.md"]
+    assert sorted(result["unchanged"]) == [
+        ".d3/memory/constitution.md",
+        "docs/guide.md",
+    ]
+    assert result["conflicts"] == []
+    assert (project / ".d3/scripts/check.sh").read_text() == "echo v2\n"
+    after = snapshot(project)
+    for rel in result["unchanged"]:
+        assert after[rel] == before[rel]
+    assert set(load_manifest(project)) == set(V1) | {"docs/new.md"}
+
+
+def test_locally_edited_file_is_a_conflict(project: Path, tmp_path: Path):
+    (project / ".d3/memory/constitution.md").write_text("# Ours\n")
+    v2 = make_zip(
+        tmp_path / "v2.zip", {**V1, ".d3/memory/constitution.md": "# Constitution v2\n"}
+    )
+    manifest = load_manifest(project)
+
+    result = merge_archive(v2, project)
+
+    assert result["conflicts"] == [
+        {
+            "path": ".d3/memory/constitution.md",
+            "reason": "modified since the template installed it",
+            "overwritten": False,
+        }
+    ]
+    assert result["updated"] == []
+    assert (project / ".d3/memory/constitution.md").read_text() == "# Ours\n"
+    # Still the hash of what the template installed, so the edit stays visible
+    assert load_manifest(project) == manifest
+
+    result = merge_archive(v2, project, overwrite_conflicts=True)
+
+    assert result["conflicts"][0]["overwritten"] is True
+    assert result["updated"] == [".d3/memory/constitution.md"]
+    assert (project / ".d3/memory/constitution.md").read_text() == (
+        "# Constitution v2\n"
+    )
+
+
+def test_members_under_a_file_are_conflicts(project: Path, tmp_path: Path):
+    (project / "docs/guide.md").unlink()
+    (project / "docs").rmdir()
+    (project / "docs").write_text("not a directory\n")
+    v2 = make_zip(tmp_path / "v2.zip", {**V1, "docs/api/ref.md": "Ref\n"})
+
+    result = merge_archive(v2, project, overwrite_conflicts=True)
+
+    assert sorted(c["path"] for c in result["conflicts"]) == [
+        "docs/api/ref.md",
+        "docs/guide.md",
+    ]
+    assert all(not c["overwritten"] for c in result["conflicts"])
+    assert (project / "docs").read_text() == "not a directory\n"
+    assert sorted(result["unchanged"]) == [
+        ".d3/memory/constitution.md",
+        ".d3/scripts/check.sh",
+    ]
+
+
+def test_dry_run_writes_nothing(project: Path, tmp_path: Path):
+    (project / "docs/guide.md").write_text("Edited\n")
+    v2 = make_zip(
+        tmp_path / "v2.zip",
+        {
+            **V1,
+            ".d3/scripts/check.sh": "echo v2\n",
+            "docs/guide.md": "Guide v2\n",
+            "docs/new.md": "New\n",
+        },
+    )
+    before = snapshot(project)
+
+    result = merge_archive(v2, project, dry_run=True, overwrite_conflicts=True)
+
+    assert result["dry_run"] is True and result["bytes"] == 0
+    assert result["created"] == ["docs/new.md"]
+    assert sorted(result["updated"]) == [".d3/scripts/check.sh", "docs/guide.md"]
+    assert [c["path"] for c in result["conflicts"]] == ["docs/guide.md"]
+    assert snapshot(project) == before
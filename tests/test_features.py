@@ -0,0 +1,72 @@
+"""Feature-number allocation from the locked .d3 index."""
+
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from d3_kit.features import FEATURES_DIRNAME, FeatureAllocator
+
+
+def allocate_many(repo_root: str, count: int) -> list[int]:
+    allocator = FeatureAllocator(Path(repo_root))
+    return [allocator.allocate() for _ in range(count)]
+
+
+def test_concurrent_processes_get_distinct_numbers(tmp_path: Path):
+    (tmp_path / FEATURES_DIRNAME / "003-existing").mkdir(parents=True)
+
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        batches = list(pool.map(allocate_many, [str(tmp_path)] * 4, [10] * 4))
+
+    numbers = [n for batch in batches for n in batch]
+    assert sorted(numbers) == list(range(4, 44))
+    # Each process saw its own numbers strictly increase
+    assert all(batch == sorted(batch) for batch in batches)
+
+
+def test_concurrent_threads_get_distinct_numbers(tmp_path: Path):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        numbers = list(
+            pool.map(lambda _: FeatureAllocator(tmp_path).allocate(), range(40))
+        )
+
+    assert sorted(numbers) == list(range(1, 41))
+
+
+def test_index_rescanned_only_when_signature_changes(tmp_path: Path, monkeypatch):
+    features = tmp_path / FEATURES_DIRNAME
+    features.mkdir()
+    allocator = FeatureAllocator(tmp_path)
+    scans = []
+    scan_features = allocator._scan_features
+    monkeypatch.setattr(
+        allocator, "_scan_features", lambda: scans.append(1) or scan_features()
+    )
+
+    assert allocator.allocate() == 1
+    assert allocator.allocate() == 2
+    assert len(scans) == 1
+
+    # A feature created behind the index's back changes the directory mtime
+    (features / "007-manual").mkdir()
+    assert allocator.highest() == 7
+    assert allocator.allocate() == 8
+    assert len(scans) == 2
+
+
+def test_numbered_branches_are_counted(tmp_path: Path):
+    def git(*args: str) -> None:
+        subprocess.run(
+            ["git", "-c", "user.name=t", "-c", "user.email=t@example.com", *args],
+            cwd=tmp_path,
+            check=True,
+            capture_output=True,
+        )
+
+    git("init", "-q")
+    git("commit", "-q", "--allow-empty", "-m", "init")
+    allocator = FeatureAllocator(tmp_path)
+    assert allocator.allocate() == 1
+
+    git("branch", "012-from-a-branch")
+    assert allocator.allocate() == 13
@@ -0,0 +1,198 @@
+"""IssueSync against an in-memory issues API behind httpx.MockTransport."""
+
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from d3_kit.issues import LEDGER_FILENAME, IssueSync
+
+REPO = "octo/app"
+TASKS_MD = """\
+# Tasks
+
+- [ ] T001 [P] Create models - src/models.py
+- [ ] T002 [P] Add the API - src/api.py
+  - **Dependencies**: T001
+- [x] T003 [P] Write docs - README.md
+"""
+
+
+class FakeGitHub:
+    """Just enough of the issues API; failures[key] lists canned replies."""
+
+    def __init__(self):
+        self.issues: dict[int, dict] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.failures: dict[tuple[str, str], list[httpx.Response]] = {}
+        self.next_number = 1
+
+    def fail(self, method: str, title_or_number, *responses: httpx.Response):
+        self.failures[(method, str(title_or_number))] = list(responses)
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        method, path = request.method, request.url.path
+        self.requests.append((method, path))
+        data = json.loads(request.content) if request.content else {}
+        if method == "POST":
+            key = data["title"].split("]")[0].strip("[")
+        else:
+            key = path.rsplit("/", 1)[-1]
+        canned = self.failures.get((method, key))
+        if canned:
+            return canned.pop(0)
+
+        if method == "GET":
+            return httpx.Response(200, json=list(self.issues.values()))
+        if method == "POST":
+            number = self.next_number
+            self.next_number += 1
+            self.issues[number] = {"number": number, "state": "open", **data}
+            return httpx.Response(201, json=self.issues[number])
+        number = int(key)
+        if number not in self.issues:
+            return httpx.Response(404, json={"message": "Not Found"})
+        self.issues[number].update(data)
+        return httpx.Response(200, json=self.issues[number])
+
+    def by_task(self, task_id: str) -> dict:
+        (issue,) = [
+            i for i in self.issues.values() if i["title"].startswith(f"[{task_id}]")
+        ]
+        return issue
+
+
+@pytest.fixture
+def github():
+    return FakeGitHub()
+
+
+@pytest.fixture
+def feature_dir(tmp_path: Path) -> Path:
+    path = tmp_path / "001-shop"
+    path.mkdir()
+    (path / "tasks.md").write_text(TASKS_MD, encoding="utf-8")
+    return path
+
+
+def sync(feature_dir: Path, github: FakeGitHub, **kwargs) -> dict:
+    transport = httpx.MockTransport(github.handler)
+    return IssueSync(feature_dir, REPO, "token", transport=transport, **kwargs).run()
+
+
+def ledger(feature_dir: Path) -> dict:
+    return json.loads((feature_dir / LEDGER_FILENAME).read_text())["issues"]
+
+
+def test_create_update_then_unchanged(feature_dir: Path, github: FakeGitHub):
+    result = sync(feature_dir, github)
+
+    assert result["outcome"] == {t: "created" for t in ("T001", "T002", "T003")}
+    assert result["failed"] == {}
+    t001 = github.by_task("T001")
+    assert f"T001 (#{t001['number']})" in github.by_task("T002")["body"]
+    assert "blocked" in github.by_task("T002")["labels"]
+    assert github.by_task("T003")["state"] == "closed"
+    assert {t: e["number"] for t, e in ledger(feature_dir).items()} == result["issues"]
+
+    tasks = feature_dir / "tasks.md"
+    tasks.write_text(
+        TASKS_MD.replace("- [ ] T001", "- [x] T001").replace("Add the", "Add an"),
+        encoding="utf-8",
+    )
+    result = sync(feature_dir, github)
+
+    assert result["outcome"] == {
+        "T001": "updated",
+        "T002": "updated",
+        "T003": "unchanged",
+    }
+    assert github.by_task("T002")["title"].startswith("[T002] Add an API")
+    # Its only dependency is done now
+    assert "blocked" not in github.by_task("T002")["labels"]
+    assert len(github.issues) == 3
+
+    github.requests.clear()
+    result = sync(feature_dir, github)
+
+    assert set(result["outcome"].values()) == {"unchanged"}
+    assert github.requests == []
+
+
+def test_deleted_issue_is_recreated_and_relinked(feature_dir: Path, github: FakeGitHub):
+    first = sync(feature_dir, github)
+    for task_id in ("T001", "T002"):
+        del github.issues[first["issues"][task_id]]
+    (feature_dir / "tasks.md").write_text(
+        TASKS_MD.replace("Create models", "Create the models"), encoding="utf-8"
+    )
+    # Transferred issues answer 410 rather than 404
+    github.fail(
+        "PATCH", first["issues"]["T002"], httpx.Response(410, json={"message": "Gone"})
+    )
+
+    result = sync(feature_dir, github)
+
+    assert result["outcome"]["T001"] == "recreated"
+    assert result["outcome"]["T002"] == "recreated"
+    assert result["failed"] == {}
+    number = result["issues"]["T001"]
+    assert number != first["issues"]["T001"]
+    assert ledger(feature_dir)["T001"]["number"] == number
+    assert f"T001 (#{number})" in github.by_task("T002")["body"]
+
+
+def test_failed_push_keeps_ledger_consistent(feature_dir: Path, github: FakeGitHub):
+    github.fail("POST", "T001", httpx.Response(500))
+    # T003 becomes #2, but closing it fails
+    github.fail("PATCH", 2, httpx.Response(500))
+
+    result = sync(feature_dir, github)
+
+    assert set(result["failed"]) == {"T001", "T003"}
+    entries = ledger(feature_dir)
+    assert "T001" not in entries
+    assert entries["T003"] == {"number": 2, "hash": None}
+    assert entries["T002"]["number"] == result["issues"]["T002"]
+
+    result = sync(feature_dir, github)
+
+    assert result["failed"] == {}
+    assert result["outcome"] == {
+        "T001": "created",
+        "T002": "updated",
+        "T003": "updated",
+    }
+    # Nothing was created twice
+    assert len(github.issues) == 3
+    assert github.by_task("T003")["state"] == "closed"
+    assert all(entry["hash"] for entry in ledger(feature_dir).values())
+
+
+def test_rate_limited_request_is_retried(feature_dir: Path, github: FakeGitHub):
+    github.fail(
+        "POST",
+        "T001",
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(403, headers={"X-RateLimit-Remaining": "0", "Retry-After": "0"}),
+    )
+
+    result = sync(feature_dir, github)
+
+    assert result["failed"] == {}
+    assert result["outcome"]["T001"] == "created"
+    assert github.requests.count(("POST", f"/repos/{REPO}/issues")) == 5
+
+
+def test_failure_retried_in_the_link_pass_is_cleared(
+    feature_dir: Path, github: FakeGitHub
+):
+    # The second pass retries T002 because T001 got a number in the first
+    github.fail("POST", "T002", httpx.Response(500))
+
+    result = sync(feature_dir, github)
+
+    assert result["failed"] == {}
+    assert result["outcome"]["T002"] == "created"
+    assert f"T001 (#{result['issues']['T001']})" in github.by_task("T002")["body"]
@@ -0,0 +1,127 @@
+"""tasks.md parsing, the task DAG and the parallel runner."""
+
+from pathlib import Path
+
+import pytest
+
+from d3_kit.tasks import Task, TaskCycleError, TaskGraph, parse_tasks, run_graph
+
+TASKS_MD = """\
+# Tasks
+
+- [ ] T001 Set up the project - pyproject.toml - 10 min
+- [ ] T002 [P] Create models - src/models.py - 30 min
+- [ ] T003 [P] Create schemas - src/schemas.py - 20 min
+- [ ] T004 Wire the API - src/api.py - 15 min
+- [ ] T005 [P] Write docs - README.md - 5 min
+- [ ] T006 [P] Add CLI - src/cli.py - 25 min
+  - **Dependencies**: T002
+"""
+
+
+def fake_runner(failing=()):
+    ran = []
+
+    def runner(task: Task, cwd: Path, env: dict[str, str]) -> int:
+        ran.append(task.id)
+        return 1 if task.id in failing else 0
+
+    return runner, ran
+
+
+def with_commands(graph: TaskGraph) -> TaskGraph:
+    for task in graph.tasks.values():
+        task.command = f"run {task.id}"
+    return graph
+
+
+def test_unmarked_tasks_are_barriers():
+    graph = parse_tasks(TASKS_MD)
+
+    assert graph.deps["T001"] == set()
+    # [P] tasks after a barrier wait only for it
+    assert graph.deps["T002"] == {"T001"} and graph.deps["T003"] == {"T001"}
+    # A barrier waits for everything since the previous barrier
+    assert graph.deps["T004"] == {"T001", "T002", "T003"}
+    assert graph.deps["T006"] == {"T002", "T004"}
+    assert graph.levels() == [["T001"], ["T002", "T003"], ["T004"], ["T005", "T006"]]
+
+
+def test_cycle_is_reported():
+    text = TASKS_MD.replace(
+        "src/models.py - 30 min", "src/models.py - 30 min\n  - **Dependencies**: T006"
+    )
+    graph = parse_tasks(text)
+
+    with pytest.raises(TaskCycleError) as excinfo:
+        graph.topological_order()
+    cycle = excinfo.value.cycle
+    assert cycle[0] == cycle[-1]
+    assert set(cycle) == {"T002", "T006"}
+
+
+def test_topological_order_breaks_ties_by_file_order():
+    tasks = [Task(f"T{i:03d}", i) for i in range(1, 6)]
+    for task in tasks:
+        task.parallel = True
+    tasks[0].depends_on = ["T005"]
+
+    assert TaskGraph(tasks).topological_order() == [
+        "T002",
+        "T003",
+        "T004",
+        "T005",
+        "T001",
+    ]
+
+
+def test_failure_blocks_only_downstream_tasks(tmp_path: Path):
+    graph = with_commands(parse_tasks(TASKS_MD))
+    runner, ran = fake_runner(failing={"T002"})
+    events = []
+
+    result = run_graph(
+        graph,
+        tmp_path,
+        workers=2,
+        runner=runner,
+        on_event=lambda tid, status, detail: events.append((tid, status)),
+    )
+
+    assert result["tasks"] == {
+        "T001": "passed",
+        "T002": "failed",
+        "T003": "passed",
+        "T004": "blocked",
+        "T005": "blocked",
+        "T006": "blocked",
+    }
+    assert sorted(ran) == ["T001", "T002", "T003"]
+    assert ("T006", "blocked") in events
+
+
+def test_blocking_a_long_chain_does_not_recurse(tmp_path: Path):
+    tasks = [Task(f"T{i:05d}", i) for i in range(5000)]
+    graph = with_commands(TaskGraph(tasks))
+    runner, _ = fake_runner(failing={"T00000"})
+
+    result = run_graph(graph, tmp_path, workers=1, runner=runner)
+
+    blocked = [t for t, status in result["tasks"].items() if status == "blocked"]
+    assert len(blocked) == 4999
+
+
+def test_critical_path_follows_estimates():
+    graph = parse_tasks(TASKS_MD)
+
+    path, length = graph.critical_path()
+
+    assert path == ["T001", "T002", "T004", "T006"]
+    assert length == 10 + 30 + 15 + 25
+
+
+def test_critical_path_ties_go_to_the_earliest_task():
+    graph = parse_tasks(TASKS_MD)
+    durations = {tid: 1.0 for tid in graph.order}
+
+    assert graph.critical_path(durations) == (["T001", "T002", "T004", "T005"], 4.0)